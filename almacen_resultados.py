@@ -0,0 +1,147 @@
+# almacen_resultados.py
+
+import glob
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # pyarrow es opcional: sin él cada partición es un directorio de columnas .npy.
+    pa = None
+
+
+class AlmacenResultados:
+    """
+    Almacén columnar de resultados, particionado por escenario y día.
+
+    Cada tabla ('fase1', 'vrp', ...) se guarda como un archivo por día en
+    <directorio>/<tabla>/escenario=<nombre>/dia=<NNNN>.<ext>, escrito en cuanto el día
+    está disponible. Así una corrida interrumpida conserva los días ya resueltos y los
+    consumidores leen columnas tipadas en lugar de volver a parsear los CSV.
+
+    Con pyarrow los archivos son Arrow IPC sin comprimir y se leen con memory-map (sin
+    copias, ver leer_arrow). Sin pyarrow cada partición es un directorio dia=<NNNN>.columnas
+    con un .npy por columna (ver _escribir_columnas), que también se abre con memory-map;
+    las columnas de texto se guardan como Unicode de ancho fijo con su máscara de nulos.
+    """
+
+    def __init__(self, directorio, escenario):
+        self.directorio = directorio
+        self.escenario = escenario
+        self.extension = 'arrow' if pa is not None else 'columnas'
+        if pa is not None:
+            print(f"[Almacén] Escenario '{escenario}': formato Arrow IPC (pyarrow) en {directorio}")
+        else:
+            print(f"[Almacén] Escenario '{escenario}': pyarrow no está instalado; formato de columnas .npy "
+                  f"con memory-map en {directorio}")
+
+    def _directorio_tabla(self, tabla):
+        return os.path.join(self.directorio, tabla, f"escenario={self.escenario}")
+
+    def _ruta_particion(self, tabla, dia):
+        return os.path.join(self._directorio_tabla(tabla), f"dia={int(dia):04d}.{self.extension}")
+
+    def limpiar(self):
+        """Elimina las particiones de este escenario (p. ej. al iniciar una corrida nueva)."""
+        for ruta in glob.glob(os.path.join(self.directorio, '*', f"escenario={self.escenario}")):
+            shutil.rmtree(ruta)
+
+    def agregar(self, tabla, dia, df):
+        """Escribe (o reemplaza) la partición de un día de forma atómica."""
+        ruta = self._ruta_particion(tabla, dia)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        ruta_temporal = f"{ruta}.{os.getpid()}.tmp"
+        if pa is not None:
+            tabla_arrow = pa.Table.from_pandas(df, preserve_index=False)
+            with pa.OSFile(ruta_temporal, 'wb') as f, pa.ipc.new_file(f, tabla_arrow.schema) as escritor:
+                escritor.write_table(tabla_arrow)
+            os.replace(ruta_temporal, ruta)
+            return
+        _escribir_columnas(df, ruta_temporal)
+        # Un directorio no puede reemplazarse si ya existe: el anterior se aparta y se borra después.
+        ruta_anterior = None
+        if os.path.exists(ruta):
+            ruta_anterior = f"{ruta}.{os.getpid()}.old"
+            os.replace(ruta, ruta_anterior)
+        os.replace(ruta_temporal, ruta)
+        if ruta_anterior:
+            shutil.rmtree(ruta_anterior)
+
+    def dias(self, tabla):
+        """Días con partición escrita para la tabla, en orden."""
+        patron = os.path.join(self._directorio_tabla(tabla), f"dia=*.{self.extension}")
+        return sorted(int(os.path.basename(r)[4:-len(self.extension) - 1]) for r in glob.glob(patron))
+
+    def leer_arrow(self, tabla, dias=None):
+        """
+        Tabla de pyarrow con los días pedidos (todos por defecto). Los archivos se abren con
+        memory-map, por lo que las columnas apuntan directamente al disco sin copiarse.
+        """
+        if pa is None:
+            raise ImportError("leer_arrow requiere pyarrow; use leer() para obtener un DataFrame.")
+        dias = self.dias(tabla) if dias is None else dias
+        tablas = [pa.ipc.open_file(pa.memory_map(self._ruta_particion(tabla, dia))).read_all() for dia in dias]
+        if not tablas:
+            return None
+        # Los días pueden diferir en columnas completamente nulas; se unifican los esquemas.
+        return pa.concat_tables(tablas, promote_options='default')
+
+    def leer(self, tabla, dias=None):
+        """DataFrame con los días pedidos (todos por defecto), en orden de día."""
+        if pa is not None:
+            tabla_arrow = self.leer_arrow(tabla, dias)
+            return tabla_arrow.to_pandas() if tabla_arrow is not None else pd.DataFrame()
+        dias = self.dias(tabla) if dias is None else dias
+        partes = [_leer_columnas(self._ruta_particion(tabla, dia)) for dia in dias]
+        return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+
+    def exportar_csv(self, tabla, ruta_csv, columnas=None):
+        """Deriva el CSV de una tabla a partir de sus particiones."""
+        df = self.leer(tabla)
+        if columnas is not None:
+            df = df.reindex(columns=columnas)
+        os.makedirs(os.path.dirname(os.path.abspath(ruta_csv)), exist_ok=True)
+        df.to_csv(ruta_csv, index=False)
+        return ruta_csv
+
+
+def _escribir_columnas(df, directorio):
+    """
+    Guarda un DataFrame como un .npy por columna más un esquema JSON con nombres y tipos.
+    Las columnas numéricas se guardan tal cual; el resto como Unicode de ancho fijo con
+    una máscara de nulos aparte, para que todas puedan abrirse con memory-map.
+    """
+    os.makedirs(directorio)
+    esquema = []
+    for i, (nombre, serie) in enumerate(df.items()):
+        valores = serie.to_numpy()
+        if valores.dtype.kind in 'biufcmM':
+            np.save(os.path.join(directorio, f"c{i}.npy"), valores)
+            esquema.append({'nombre': nombre, 'tipo': 'numerico'})
+            continue
+        nulos = serie.isna().to_numpy()
+        texto = np.array(['' if nulo else str(v) for v, nulo in zip(valores, nulos)], dtype=str)
+        np.save(os.path.join(directorio, f"c{i}.npy"), texto.astype(texto.dtype if len(texto) else 'U1'))
+        np.save(os.path.join(directorio, f"c{i}.nulos.npy"), nulos)
+        esquema.append({'nombre': nombre, 'tipo': 'texto'})
+    with open(os.path.join(directorio, 'esquema.json'), 'w', encoding='utf-8') as f:
+        json.dump(esquema, f, ensure_ascii=False)
+
+
+def _leer_columnas(directorio):
+    """Lee una partición escrita por _escribir_columnas abriendo cada columna con memory-map."""
+    with open(os.path.join(directorio, 'esquema.json'), encoding='utf-8') as f:
+        esquema = json.load(f)
+    columnas = {}
+    for i, columna in enumerate(esquema):
+        valores = np.load(os.path.join(directorio, f"c{i}.npy"), mmap_mode='r')
+        if columna['tipo'] == 'texto':
+            nulos = np.load(os.path.join(directorio, f"c{i}.nulos.npy"))
+            valores = pd.Series(valores.astype(object)).mask(nulos)
+        columnas[columna['nombre']] = valores
+    return pd.DataFrame(columnas)
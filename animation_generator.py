@@ -1,8 +1,62 @@
+import hashlib
+import itertools
+import json
+import multiprocessing
 import os
-import numpy as np
-from PIL import Image, ImageDraw
+import shutil
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from PIL import GifImagePlugin, Image, ImageDraw
 
-def create_daily_route_gif(day_num, daily_routes_data, node_coords, map_path, truck_icon_path, output_dir):
+# Pasos intermedios (frames) del movimiento del camión en cada segmento de ruta.
+PASOS_POR_SEGMENTO = 20
+# Duración de cada frame en milisegundos (20 frames/seg).
+DURACION_FRAME_MS = 50
+# Colores para diferenciar las rutas de múltiples vehículos (GIF y replay vectorial).
+COLORES_RUTAS = ["#FF0000", "#0000FF", "#00FF00", "#FFA500", "#800080", "#00FFFF", "#FF00FF"]
+# Capas estáticas (mapa con rutas y nodos dibujados) que cada proceso conserva en memoria.
+MAX_CAPAS_EN_CACHE = 16
+
+# Cachés por proceso: activos de imagen por (mapa, ícono) y capas estáticas con su paleta.
+_ACTIVOS_PROCESO = {}
+_CAPAS_PROCESO = OrderedDict()
+
+def cargar_activos_imagen(map_path, truck_icon_path):
+    """
+    Carga el mapa y el ícono del camión ya preparados (RGBA, ícono a 40x40), para
+    reutilizarlos entre días y escenarios sin volver a leerlos de disco.
+
+    Returns:
+        tuple: (imagen del mapa, ícono del camión redimensionado).
+    """
+    map_img = Image.open(map_path).convert("RGBA")
+    truck_icon = Image.open(truck_icon_path).convert("RGBA")
+    truck_icon = truck_icon.resize((40, 40), Image.Resampling.LANCZOS)
+    return map_img, truck_icon
+
+
+def obtener_activos_imagen(map_path, truck_icon_path):
+    """Igual que cargar_activos_imagen, pero lee y prepara las imágenes una sola vez por proceso."""
+    clave = (os.path.abspath(map_path), os.path.abspath(truck_icon_path))
+    if clave not in _ACTIVOS_PROCESO:
+        _ACTIVOS_PROCESO[clave] = cargar_activos_imagen(map_path, truck_icon_path)
+    return _ACTIVOS_PROCESO[clave]
+
+
+def firma_rutas(daily_routes_data, node_coords):
+    """
+    Huella del conjunto de rutas de un día: las rutas en orden (el orden define el color
+    de cada una) y las coordenadas de sus nodos. Dos días con la misma firma producen
+    exactamente el mismo GIF.
+    """
+    rutas = [route_info['Ruta_Nodos_Str'] for route_info in daily_routes_data]
+    nodos = sorted({n for ruta in rutas for n in ruta.split(' -> ')})
+    coordenadas = [[n, list(map(float, node_coords[n])) if n in node_coords else None] for n in nodos]
+    return hashlib.sha256(json.dumps([rutas, coordenadas]).encode('utf-8')).hexdigest()
+
+
+def create_daily_route_gif(day_num, daily_routes_data, node_coords, map_path, truck_icon_path, output_dir, activos=None):
     """
     Genera un GIF animado de las rutas de VRP para un día específico.
 
@@ -14,6 +68,8 @@ def create_daily_route_gif(day_num, daily_routes_data, node_coords, map_path, tr
         map_path (str): Ruta a la imagen del mapa de fondo.
         truck_icon_path (str): Ruta al ícono del camión.
         output_dir (str): Directorio donde se guardará el GIF resultante.
+        activos (tuple, opcional): (mapa, ícono) precargados con cargar_activos_imagen.
+            Si se proporcionan, map_path y truck_icon_path no se leen de disco.
     
     Returns:
         str: La ruta completa al archivo GIF generado, o None si ocurrió un error.
@@ -28,101 +84,29 @@ def create_daily_route_gif(day_num, daily_routes_data, node_coords, map_path, tr
 
     try:
         # --- 1. Cargar y Preparar Activos de Imagen ---
-        # Carga la imagen del mapa y el ícono, convirtiéndolos a RGBA para soportar transparencias.
-        map_img_base = Image.open(map_path).convert("RGBA")
-        truck_icon = Image.open(truck_icon_path).convert("RGBA")
-        
-        # Redimensiona el ícono del camión a un tamaño manejable (ej. 40x40 pixeles)
-        truck_icon = truck_icon.resize((40, 40), Image.Resampling.LANCZOS)
+        # Carga la imagen del mapa y el ícono (RGBA para soportar transparencias, ícono a 40x40),
+        # salvo que ya vengan precargados o este proceso ya los haya preparado.
+        if activos is None:
+            activos = obtener_activos_imagen(map_path, truck_icon_path)
+        truck_icon = activos[1]
 
-        # Prepara el objeto para dibujar sobre la imagen
-        draw = ImageDraw.Draw(map_img_base)
-        
-        # Define una paleta de colores para diferenciar las rutas de múltiples vehículos
-        colors = ["#FF0000", "#0000FF", "#00FF00", "#FFA500", "#800080", "#00FFFF", "#FF00FF"]
-
-        # --- 2. Dibujar Elementos Estáticos (Nodos y Líneas de Ruta) ---
-        # Se dibuja sobre la imagen base del mapa para que aparezcan en todos los frames.
-        for idx, route_info in enumerate(daily_routes_data):
-            color = colors[idx % len(colors)]
-            
-            # Obtiene la ruta como texto y la divide en una lista de nodos
-            route_nodes = route_info['Ruta_Nodos_Str'].split(' -> ')
-            
-            # Dibuja las líneas que conectan los nodos de la ruta
-            for i in range(len(route_nodes) - 1):
-                start_node_name = route_nodes[i]
-                end_node_name = route_nodes[i+1]
-                
-                # Obtiene las coordenadas usando .get() para evitar errores si un nodo no existe
-                start_pos = node_coords.get(start_node_name)
-                end_pos = node_coords.get(end_node_name)
-                
-                if start_pos and end_pos:
-                    draw.line([start_pos, end_pos], fill=color, width=4)
-            
-            # Dibuja círculos para marcar la ubicación de cada nodo en la ruta
-            for node_name in route_nodes:
-                if node_name in node_coords:
-                    x, y = node_coords[node_name]
-                    # Dibuja un círculo exterior (borde) y uno interior para mejor visibilidad
-                    draw.ellipse((x-7, y-7, x+7, y+7), fill=color, outline="black")
-                    draw.ellipse((x-5, y-5, x+5, y+5), fill="white")
-
-        # --- 3. Generar los Frames de la Animación ---
-        frames = []
-        
-        # Itera sobre cada ruta del día
-        for idx, route_info in enumerate(daily_routes_data):
-            route_nodes = route_info['Ruta_Nodos_Str'].split(' -> ')
-
-            # Itera sobre cada segmento de la ruta (de un nodo al siguiente)
-            for i in range(len(route_nodes) - 1):
-                start_node_name = route_nodes[i]
-                end_node_name = route_nodes[i+1]
-                
-                start_pos_np = np.array(node_coords.get(start_node_name))
-                end_pos_np = np.array(node_coords.get(end_node_name))
+        # --- 2. Capa Estática (Nodos y Líneas de Ruta) ---
+        # Se reutiliza si este proceso ya dibujó el mismo conjunto de rutas sobre el mismo mapa.
+        map_img_base, paleta = _capa_estatica(activos, daily_routes_data, node_coords)
 
-                # Si falta alguna coordenada, salta este segmento
-                if start_pos_np is None or end_pos_np is None:
-                    continue
+        # --- 3. Frames Generados Bajo Demanda ---
+        # Todos los frames se cuantizan contra la paleta de la capa estática (el GIF lleva
+        # una única tabla de colores global).
+        rutas_nodos = [route_info['Ruta_Nodos_Str'].split(' -> ') for route_info in daily_routes_data]
+        posiciones = _posiciones_camion(rutas_nodos, node_coords, PASOS_POR_SEGMENTO)
+        frames = _frames_sucios(map_img_base, truck_icon, posiciones, paleta)
 
-                # Define cuántos pasos intermedios (frames) tendrá el movimiento del camión
-                num_frames_per_segment = 20
-                
-                # Usa numpy.linspace para calcular las posiciones intermedias suavemente
-                for j in range(num_frames_per_segment + 1):
-                    # Interpola la posición actual del camión
-                    current_pos = start_pos_np + (end_pos_np - start_pos_np) * (j / num_frames_per_segment)
-                    
-                    # Crea una copia del mapa con las rutas ya dibujadas para este frame
-                    frame = map_img_base.copy()
-                    
-                    # Pega el ícono del camión en la posición interpolada
-                    # Se resta la mitad del tamaño del ícono para centrarlo
-                    truck_x, truck_y = int(current_pos[0]), int(current_pos[1])
-                    frame.paste(truck_icon, (truck_x - 20, truck_y - 20), truck_icon)
-                    
-                    # Añade el frame terminado a la lista
-                    frames.append(frame)
-
-        # --- 4. Guardar la Secuencia de Frames como un Archivo GIF ---
-        if frames:
-            # Asegurarse de que el directorio de salida exista
-            os.makedirs(output_dir, exist_ok=True)
-            gif_path = os.path.join(output_dir, f"dia_{day_num}.gif")
-            
-            # Guarda el primer frame y luego añade el resto
-            frames[0].save(
-                gif_path,
-                save_all=True,
-                append_images=frames[1:],
-                duration=50,      # Duración de cada frame en milisegundos (20 frames/seg)
-                loop=0,           # 0 para que el GIF se repita indefinidamente
-                optimize=True     # Optimiza la paleta de colores para reducir el tamaño del archivo
-            )
-            print(f"[AnimGen] Día {day_num}: Animación guardada exitosamente en: {gif_path}")
+        # --- 4. Escribir el GIF a Medida que se Generan los Frames ---
+        os.makedirs(output_dir, exist_ok=True)
+        gif_path = os.path.join(output_dir, f"dia_{day_num}.gif")
+        num_frames = _escribir_gif_incremental(gif_path, frames, DURACION_FRAME_MS)
+        if num_frames:
+            print(f"[AnimGen] Día {day_num}: Animación guardada exitosamente en: {gif_path} ({num_frames} frames)")
             return gif_path
         else:
             print(f"[AnimGen] Día {day_num}: No se generaron frames, no se creará el archivo GIF.")
@@ -135,4 +119,468 @@ def create_daily_route_gif(day_num, daily_routes_data, node_coords, map_path, tr
         print(f"Error inesperado al crear la animación para el día {day_num}: {e}")
         import traceback
         traceback.print_exc()
-        return None
\ No newline at end of file
+        return None
+
+
+def generar_animaciones(rutas_por_dia, node_coords, map_path, truck_icon_path, output_dir, workers=1, activos=None):
+    """
+    Genera los GIF de varios días. Los días con la misma firma de rutas (ver firma_rutas)
+    se renderizan una sola vez y los demás enlazan (o copian) ese archivo. Con workers > 1
+    los días distintos se reparten en un pool de procesos; cada proceso prepara el mapa y
+    el ícono una sola vez y conserva en caché las capas estáticas que dibuja.
+
+    Args:
+        rutas_por_dia (dict): {día: lista de rutas del día, como en create_daily_route_gif}.
+        node_coords, map_path, truck_icon_path, output_dir: Igual que en create_daily_route_gif.
+        workers (int): Procesos para renderizar en paralelo (1 = secuencial).
+        activos (tuple, opcional): (mapa, ícono) precargados con cargar_activos_imagen.
+
+    Returns:
+        dict: {día: {'Ruta_GIF', 'Tiempo_s', 'Reutiliza_Dia', 'Estado'}}, en orden de día.
+            Estado es 'Renderizado', 'Reutilizado' o 'Fallido' (Ruta_GIF es None).
+    """
+    renderizador = RenderizadorAnimaciones(node_coords, map_path, truck_icon_path, output_dir,
+                                           workers=workers, activos=activos)
+    for dia, rutas in rutas_por_dia.items():
+        renderizador.agregar(dia, rutas)
+    return renderizador.cerrar()
+
+
+class RenderizadorAnimaciones:
+    """
+    Versión incremental de generar_animaciones: recibe los días de a uno, a medida que
+    se resuelven, y los va renderizando (en un pool de procesos si workers > 1) mientras
+    el productor sigue trabajando. A lo sumo 2 * workers renders quedan en vuelo; con
+    más, agregar() espera a que termine alguno. cerrar() espera los pendientes, enlaza
+    los días repetidos y devuelve lo mismo que generar_animaciones.
+
+    Un día sólo pasa a ser el original de su firma cuando su GIF quedó escrito. Los días
+    con la misma firma que llegan mientras se renderiza esperan a ese resultado; si el
+    render falla, se intentan por su cuenta en lugar de enlazar un archivo inexistente.
+    """
+
+    def __init__(self, node_coords, map_path, truck_icon_path, output_dir, workers=1, activos=None):
+        self.node_coords = node_coords
+        self.map_path = map_path
+        self.truck_icon_path = truck_icon_path
+        self.output_dir = output_dir
+        if activos is not None:
+            # Sólo lo aprovecha el render en serie: los workers 'spawn' cargan sus propias imágenes.
+            _ACTIVOS_PROCESO[(os.path.abspath(map_path), os.path.abspath(truck_icon_path))] = activos
+        self._pool = None
+        if workers > 1:
+            # Los workers se crean aquí, con 'spawn' y no en el primer submit: agregar() suele
+            # llamarse desde el hilo escritor, y un fork con otros hilos vivos puede dejar al
+            # hijo bloqueado en un candado heredado.
+            self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            for _ in range(workers):
+                self._pool.submit(_precalentar_worker, map_path, truck_icon_path)
+        self._max_en_vuelo = 2 * workers
+        self._en_vuelo = {}
+        self._dia_por_firma = {}
+        self._en_curso = {}
+        self._reintentos = []
+        self._reutiliza = {}
+        self.resultados = {}
+        if self._pool is not None:
+            print(f"[AnimGen] Renderizando días en paralelo con {workers} procesos.")
+
+    def agregar(self, dia, rutas):
+        """Renderiza (o programa) el GIF de un día; si ya hubo un día con las mismas rutas, sólo lo anota."""
+        firma = firma_rutas(rutas, self.node_coords)
+        if firma in self._dia_por_firma:
+            self._reutiliza[dia] = self._dia_por_firma[firma]
+            return
+        if firma in self._en_curso:
+            self._en_curso[firma].append((dia, rutas))
+            return
+        self._en_curso[firma] = []
+        tarea = (dia, rutas, self.node_coords, self.map_path, self.truck_icon_path, self.output_dir)
+        if self._pool is None:
+            self._registrar(firma, *_renderizar_dia(tarea))
+            return
+        if len(self._en_vuelo) >= self._max_en_vuelo:
+            self._esperar(FIRST_COMPLETED)
+        self._en_vuelo[self._pool.submit(_renderizar_dia, tarea)] = firma
+
+    def _esperar(self, condicion):
+        listos, _ = wait(list(self._en_vuelo), return_when=condicion)
+        for futuro in listos:
+            self._registrar(self._en_vuelo.pop(futuro), *futuro.result())
+        # Los reintentos se programan recién aquí: agregar() puede volver a llamar a
+        # _esperar() y no debe consumir futuros que este ciclo aún no registró.
+        while self._reintentos:
+            self.agregar(*self._reintentos.pop(0))
+
+    def _registrar(self, firma, dia, ruta, tiempo):
+        self.resultados[dia] = {'Ruta_GIF': ruta, 'Tiempo_s': tiempo, 'Reutiliza_Dia': None,
+                                'Estado': 'Renderizado' if ruta else 'Fallido'}
+        esperando = self._en_curso.pop(firma)
+        if ruta:
+            self._dia_por_firma[firma] = dia
+            for dia_esperando, _ in esperando:
+                self._reutiliza[dia_esperando] = dia
+        else:
+            # El GIF no se escribió: los días con las mismas rutas no tienen qué enlazar y
+            # se reintentan por su cuenta (ver _esperar).
+            self._reintentos.extend(esperando)
+
+    def cerrar(self):
+        """Espera los renders pendientes, enlaza los días repetidos y reporta el tiempo de cada día."""
+        if self._pool is not None:
+            # Un render fallido puede reprogramar días que lo esperaban, por eso se repite.
+            while self._en_vuelo:
+                self._esperar(FIRST_COMPLETED)
+            self._pool.shutdown()
+
+        for dia, dia_original in self._reutiliza.items():
+            inicio = time.perf_counter()
+            ruta = os.path.join(self.output_dir, f"dia_{dia}.gif")
+            _enlazar_o_copiar(self.resultados[dia_original]['Ruta_GIF'], ruta)
+            self.resultados[dia] = {'Ruta_GIF': ruta, 'Tiempo_s': time.perf_counter() - inicio,
+                                    'Reutiliza_Dia': dia_original, 'Estado': 'Reutilizado'}
+
+        resultados = dict(sorted(self.resultados.items()))
+        for dia, info in resultados.items():
+            if info['Estado'] == 'Fallido':
+                continue
+            origen = f" (mismas rutas que el día {info['Reutiliza_Dia']})" if info['Reutiliza_Dia'] is not None else ""
+            print(f"[AnimGen] Día {dia}: {info['Tiempo_s']:.2f} s{origen}")
+        fallidos = [dia for dia, info in resultados.items() if info['Estado'] == 'Fallido']
+        if fallidos:
+            print(f"[AnimGen] {len(fallidos)} día(s) sin GIF por error de render: {fallidos}")
+        return resultados
+
+
+def exportar_replay_vectorial(rutas_por_dia, node_coords, ruta_salida, matriz_tiempos=None, tiempo_servicio=0,
+                              escenario=None, segundos_por_dia=4.0, tamano_mapa=None, map_href=None):
+    """
+    Exporta todo el plan de rutas de un escenario como un único replay vectorial, en lugar
+    de un GIF por día. El formato se elige por la extensión de ruta_salida:
+
+    - '.json': coordenadas de los nodos, vehículos y, por día, las rutas con los tiempos
+      de llegada a cada nodo. Los conjuntos de rutas repetidos se guardan una sola vez
+      ('planes') y cada día referencia el suyo; el cliente anima a partir de los tiempos.
+    - '.svg': el mismo contenido como SVG con animación SMIL. Cada día ocupa
+      'segundos_por_dia' de reproducción y los camiones recorren sus rutas con
+      animateMotion, respetando las proporciones de tiempo (viaje y descarga).
+
+    Los tiempos salen de matriz_tiempos (minutos) si se proporciona; si no, de la
+    distancia euclidiana entre coordenadas.
+
+    Args:
+        rutas_por_dia (dict): {día: lista de rutas con 'Ruta_Nodos_Str' y 'Vehículo'}.
+        node_coords (dict): {nodo_id: (x, y)}.
+        ruta_salida (str): Archivo .json o .svg a escribir.
+        matriz_tiempos: MatrizDistancias o diccionario {(i, j): minutos}.
+        tiempo_servicio (float): Minutos de descarga en cada nodo distinto del depósito.
+        escenario (str): Nombre del escenario, sólo informativo.
+        segundos_por_dia (float): Duración de cada día en el SVG.
+        tamano_mapa (tuple): (ancho, alto) del lienzo SVG; por defecto, la caja de los nodos.
+        map_href (str): Imagen de fondo del SVG (ruta relativa o URL).
+
+    Returns:
+        str: La ruta del archivo escrito.
+    """
+    nodos = sorted(node_coords, key=lambda n: (len(n), n))
+    indice_nodo = {n: i for i, n in enumerate(nodos)}
+    vehiculos = []
+    planes, indice_plan, dias = [], {}, []
+    for dia, rutas in sorted(rutas_por_dia.items()):
+        plan = []
+        for route_info in rutas:
+            route_nodes = [n for n in route_info['Ruta_Nodos_Str'].split(' -> ') if n in indice_nodo]
+            if len(route_nodes) < 2:
+                continue
+            vehiculo = str(route_info.get('Vehículo', ''))
+            if vehiculo not in vehiculos:
+                vehiculos.append(vehiculo)
+            plan.append({'v': vehiculos.index(vehiculo), 'n': [indice_nodo[n] for n in route_nodes],
+                         't': _tiempos_llegada(route_nodes, node_coords, matriz_tiempos, tiempo_servicio)})
+        if not plan:
+            continue
+        clave = json.dumps(plan, sort_keys=True)
+        if clave not in indice_plan:
+            indice_plan[clave] = len(planes)
+            planes.append(plan)
+        dias.append([int(dia), indice_plan[clave]])
+
+    replay = {
+        'version': 1,
+        'escenario': escenario,
+        'unidad_tiempo': 'min',
+        'tiempo_servicio': tiempo_servicio,
+        'nodos': nodos,
+        'coordenadas': [[round(float(c), 1) for c in node_coords[n]] for n in nodos],
+        'vehiculos': vehiculos,
+        'colores': COLORES_RUTAS,
+        # Cada ruta: v = índice del vehículo, n = índices de nodos, t = minuto de llegada a cada nodo.
+        'planes': planes,
+        # Cada día: [día, índice del plan].
+        'dias': dias,
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(ruta_salida)), exist_ok=True)
+    if ruta_salida.lower().endswith('.svg'):
+        contenido = _replay_a_svg(replay, segundos_por_dia, tamano_mapa, map_href)
+    else:
+        contenido = json.dumps(replay, separators=(',', ':'), ensure_ascii=False)
+    with open(ruta_salida, 'w', encoding='utf-8') as f:
+        f.write(contenido)
+    print(f"[AnimGen] Replay vectorial de {len(dias)} día(s) ({len(planes)} plan(es) distintos) "
+          f"guardado en: {ruta_salida} ({len(contenido.encode('utf-8')) / 1024:.1f} KB)")
+    return ruta_salida
+
+
+def _tiempos_llegada(route_nodes, node_coords, matriz_tiempos, tiempo_servicio):
+    """Minuto de llegada a cada nodo de la ruta; la descarga se suma al salir de cada nodo intermedio."""
+    tiempos = [0.0]
+    for posicion, (i, j) in enumerate(zip(route_nodes[:-1], route_nodes[1:])):
+        if matriz_tiempos is not None:
+            viaje = matriz_tiempos.get((i, j), 0)
+        else:
+            (x0, y0), (x1, y1) = node_coords[i], node_coords[j]
+            viaje = ((x1 - x0) ** 2 + (y1 - y0) ** 2) ** 0.5
+        servicio = tiempo_servicio if posicion > 0 else 0
+        tiempos.append(round(tiempos[-1] + servicio + float(viaje), 2))
+    return tiempos
+
+
+def _replay_a_svg(replay, segundos_por_dia, tamano_mapa, map_href):
+    """Arma el SVG con animación SMIL a partir del diccionario del replay."""
+    coordenadas = replay['coordenadas']
+    if tamano_mapa:
+        caja = (0, 0, tamano_mapa[0], tamano_mapa[1])
+    else:
+        xs, ys = [c[0] for c in coordenadas], [c[1] for c in coordenadas]
+        caja = (min(xs) - 20, min(ys) - 20, max(xs) - min(xs) + 40, max(ys) - min(ys) + 40)
+    colores = replay['colores']
+
+    def puntos(indices):
+        return ' '.join(f"{coordenadas[i][0]:g},{coordenadas[i][1]:g}" for i in indices)
+
+    partes = [f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+              f'viewBox="{caja[0]:g} {caja[1]:g} {caja[2]:g} {caja[3]:g}">']
+    if map_href:
+        partes.append(f'<image href="{map_href}" xlink:href="{map_href}" x="0" y="0" '
+                      f'width="{caja[2]:g}" height="{caja[3]:g}"/>')
+
+    # Capa estática de cada plan (líneas y nodos), definida una vez y reutilizada con <use>.
+    partes.append('<defs>')
+    for p, plan in enumerate(replay['planes']):
+        partes.append(f'<g id="plan{p}">')
+        for idx, ruta in enumerate(plan):
+            color = colores[idx % len(colores)]
+            partes.append(f'<polyline points="{puntos(ruta["n"])}" fill="none" stroke="{color}" stroke-width="4"/>')
+            for i in dict.fromkeys(ruta['n']):
+                partes.append(f'<circle cx="{coordenadas[i][0]:g}" cy="{coordenadas[i][1]:g}" r="6" fill="white" '
+                              f'stroke="{color}" stroke-width="2"/>')
+        partes.append('</g>')
+    partes.append('</defs>')
+
+    for orden, (dia, p) in enumerate(replay['dias']):
+        inicio = orden * segundos_por_dia
+        plan = replay['planes'][p]
+        # El día más largo (en minutos) ocupa todo su intervalo de reproducción.
+        escala = segundos_por_dia / max(max(ruta['t'][-1] for ruta in plan), 1e-9)
+        partes.append(f'<g visibility="hidden"><set attributeName="visibility" to="visible" '
+                      f'begin="{inicio:g}s" dur="{segundos_por_dia:g}s"/>')
+        partes.append(f'<use href="#plan{p}" xlink:href="#plan{p}"/>')
+        partes.append(f'<text x="{caja[0] + 10:g}" y="{caja[1] + 30:g}" font-size="24" font-family="sans-serif">'
+                      f'Día {dia}</text>')
+        for idx, ruta in enumerate(plan):
+            movimiento = _movimiento_smil(ruta, coordenadas, replay['tiempo_servicio'])
+            if movimiento is None:
+                continue
+            key_points, key_times = movimiento
+            partes.append(f'<circle r="9" fill="{colores[idx % len(colores)]}" stroke="black" stroke-width="2">'
+                          f'<animateMotion path="M{puntos(ruta["n"])}" keyPoints="{key_points}" '
+                          f'keyTimes="{key_times}" calcMode="linear" begin="{inicio:g}s" '
+                          f'dur="{ruta["t"][-1] * escala:.3f}s" fill="freeze"/></circle>')
+        partes.append('</g>')
+    partes.append('</svg>')
+    return '\n'.join(partes)
+
+
+def _movimiento_smil(ruta, coordenadas, tiempo_servicio):
+    """
+    keyPoints/keyTimes de animateMotion para una ruta: fracción del recorrido (por
+    longitud) y del tiempo en cada llegada y salida de nodo, de modo que el camión se
+    detiene durante la descarga.
+    """
+    longitudes = [0.0]
+    for i, j in zip(ruta['n'][:-1], ruta['n'][1:]):
+        (x0, y0), (x1, y1) = coordenadas[i], coordenadas[j]
+        longitudes.append(longitudes[-1] + ((x1 - x0) ** 2 + (y1 - y0) ** 2) ** 0.5)
+    longitud_total, tiempo_total = longitudes[-1], ruta['t'][-1]
+    if longitud_total <= 0 or tiempo_total <= 0:
+        return None
+
+    pares = []
+    for posicion, (longitud, llegada) in enumerate(zip(longitudes, ruta['t'])):
+        pares.append((longitud / longitud_total, llegada / tiempo_total))
+        if 0 < posicion < len(longitudes) - 1 and tiempo_servicio:
+            pares.append((longitud / longitud_total, min(1.0, (llegada + tiempo_servicio) / tiempo_total)))
+    return ';'.join(f"{k:.4f}" for k, _ in pares), ';'.join(f"{t:.4f}" for _, t in pares)
+
+
+def _precalentar_worker(map_path, truck_icon_path):
+    """Worker: carga las imágenes al arrancar, mientras el productor sigue resolviendo días."""
+    try:
+        obtener_activos_imagen(map_path, truck_icon_path)
+    except OSError:
+        pass  # El error se informa al renderizar cada día.
+
+
+def _renderizar_dia(tarea):
+    """Worker: genera el GIF de un día y mide cuánto tardó."""
+    dia, rutas, node_coords, map_path, truck_icon_path, output_dir = tarea
+    inicio = time.perf_counter()
+    ruta = create_daily_route_gif(dia, rutas, node_coords, map_path, truck_icon_path, output_dir)
+    return dia, ruta, time.perf_counter() - inicio
+
+
+def _enlazar_o_copiar(origen, destino):
+    """Crea destino como enlace duro a origen; si el sistema de archivos no lo permite, lo copia."""
+    if os.path.lexists(destino):
+        os.remove(destino)
+    try:
+        os.link(origen, destino)
+    except OSError:
+        shutil.copyfile(origen, destino)
+
+
+def _calcular_paleta(capa_estatica, truck_icon):
+    """
+    Paleta de 256 colores calculada una sola vez a partir de la capa estática (mapa con
+    rutas y nodos) y del ícono del camión, que son los únicos píxeles que aparecen.
+    """
+    ancho, alto = capa_estatica.size
+    muestra = Image.new("RGB", (ancho + truck_icon.width, max(alto, truck_icon.height)), "white")
+    muestra.paste(capa_estatica.convert("RGB"), (0, 0))
+    muestra.paste(truck_icon, (ancho, 0), truck_icon)
+    return muestra.quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+
+
+def _posiciones_camion(rutas_nodos, node_coords, pasos):
+    """Genera la posición (x, y) del camión en cada frame, ruta por ruta y segmento por segmento."""
+    for route_nodes in rutas_nodos:
+        for start_node_name, end_node_name in zip(route_nodes[:-1], route_nodes[1:]):
+            start_pos = node_coords.get(start_node_name)
+            end_pos = node_coords.get(end_node_name)
+            # Si falta alguna coordenada, salta este segmento
+            if start_pos is None or end_pos is None:
+                continue
+            (x0, y0), (x1, y1) = start_pos, end_pos
+            for j in range(pasos + 1):
+                yield int(x0 + (x1 - x0) * (j / pasos)), int(y0 + (y1 - y0) * (j / pasos))
+
+
+def _frames_sucios(capa_estatica, truck_icon, posiciones, paleta):
+    """
+    Genera los frames como (imagen en modo P, desplazamiento). El primero es el mapa
+    completo; los siguientes sólo cubren el rectángulo sucio, es decir, la unión de la
+    caja del camión en el frame anterior (que se borra) y en el actual (que se dibuja).
+    """
+    ancho, alto = capa_estatica.size
+    ancho_icono, alto_icono = truck_icon.size
+    caja_anterior = None
+    for x, y in posiciones:
+        # Se resta la mitad del tamaño del ícono para centrarlo
+        caja = (x - ancho_icono // 2, y - alto_icono // 2, x - ancho_icono // 2 + ancho_icono, y - alto_icono // 2 + alto_icono)
+        if caja_anterior is None:
+            rect = (0, 0, ancho, alto)
+        else:
+            rect = (max(0, min(caja[0], caja_anterior[0])), max(0, min(caja[1], caja_anterior[1])),
+                    min(ancho, max(caja[2], caja_anterior[2])), min(alto, max(caja[3], caja_anterior[3])))
+            if rect[0] >= rect[2] or rect[1] >= rect[3]:
+                # El camión está fuera del mapa en ambos frames: se repite un píxel sin cambios.
+                rect = (0, 0, 1, 1)
+        parche = capa_estatica.crop(rect)
+        parche.paste(truck_icon, (caja[0] - rect[0], caja[1] - rect[1]), truck_icon)
+        yield parche.convert("RGB").quantize(palette=paleta, dither=Image.Dither.NONE), rect[:2]
+        caja_anterior = caja
+
+
+def _escribir_gif_incremental(gif_path, frames, duracion_ms):
+    """
+    Escribe el GIF frame por frame con GifImagePlugin.getheader/getdata, sin mantener
+    los frames en memoria. Se escribe a un archivo temporal y se renombra al terminar.
+    Devuelve el número de frames escritos.
+    """
+    frames = iter(frames)
+    primero = next(frames, None)
+    if primero is None:
+        return 0
+
+    ruta_temporal = f"{gif_path}.{os.getpid()}.tmp"
+    num_frames = 0
+    with open(ruta_temporal, "wb") as fp:
+        imagen, _ = primero
+        encabezado, _ = GifImagePlugin.getheader(imagen, info={"loop": 0})  # loop=0: se repite indefinidamente
+        for bloque in encabezado:
+            fp.write(bloque)
+        for imagen, desplazamiento in itertools.chain([primero], frames):
+            for bloque in GifImagePlugin.getdata(imagen, desplazamiento, duration=duracion_ms):
+                fp.write(bloque)
+            num_frames += 1
+        fp.write(b";")  # Fin del archivo GIF
+    os.replace(ruta_temporal, gif_path)
+    return num_frames
+
+
+def _capa_estatica(activos, daily_routes_data, node_coords):
+    """
+    Devuelve (capa estática, paleta) para las rutas de un día, dibujándolas sólo si este
+    proceso no tiene ya en caché la misma firma de rutas sobre el mismo mapa.
+    """
+    map_img, truck_icon = activos
+    # El mapa se guarda junto a la capa, así su id() no puede reutilizarse mientras esté en caché.
+    clave = (id(map_img), id(truck_icon), firma_rutas(daily_routes_data, node_coords))
+    if clave in _CAPAS_PROCESO:
+        _CAPAS_PROCESO.move_to_end(clave)
+        return _CAPAS_PROCESO[clave][2:]
+
+    capa = _dibujar_capa_estatica(map_img, daily_routes_data, node_coords)
+    paleta = _calcular_paleta(capa, truck_icon)
+    _CAPAS_PROCESO[clave] = (map_img, truck_icon, capa, paleta)
+    if len(_CAPAS_PROCESO) > MAX_CAPAS_EN_CACHE:
+        _CAPAS_PROCESO.popitem(last=False)
+    return capa, paleta
+
+
+def _dibujar_capa_estatica(map_img, daily_routes_data, node_coords):
+    """Dibuja las líneas de ruta y los nodos de un día sobre una copia del mapa."""
+    map_img_base = map_img.copy()
+    # Prepara el objeto para dibujar sobre la imagen
+    draw = ImageDraw.Draw(map_img_base)
+        
+    colors = COLORES_RUTAS
+
+    # Se dibuja sobre una copia del mapa para que aparezcan en todos los frames.
+    for idx, route_info in enumerate(daily_routes_data):
+        color = colors[idx % len(colors)]
+            
+        # Obtiene la ruta como texto y la divide en una lista de nodos
+        route_nodes = route_info['Ruta_Nodos_Str'].split(' -> ')
+            
+        # Dibuja las líneas que conectan los nodos de la ruta
+        for i in range(len(route_nodes) - 1):
+            start_node_name = route_nodes[i]
+            end_node_name = route_nodes[i+1]
+                
+            # Obtiene las coordenadas usando .get() para evitar errores si un nodo no existe
+            start_pos = node_coords.get(start_node_name)
+            end_pos = node_coords.get(end_node_name)
+                
+            if start_pos and end_pos:
+                draw.line([start_pos, end_pos], fill=color, width=4)
+            
+        # Dibuja círculos para marcar la ubicación de cada nodo en la ruta
+        for node_name in route_nodes:
+            if node_name in node_coords:
+                x, y = node_coords[node_name]
+                # Dibuja un círculo exterior (borde) y uno interior para mejor visibilidad
+                draw.ellipse((x-7, y-7, x+7, y+7), fill=color, outline="black")
+                draw.ellipse((x-5, y-5, x+5, y+5), fill="white")
+    return map_img_base
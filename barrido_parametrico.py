@@ -0,0 +1,148 @@
+# barrido_parametrico.py
+
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from ortools.linear_solver import pywraplp
+
+import model_fase1_ortools as model_fase1
+
+# Parámetros que se pueden barrer sin reconstruir el modelo de Fase 1.
+# 'Presupuesto_Compra' es un tope al costo de adquisición (None = sin tope).
+PARAMETROS_BARRIDO = ('Presupuesto_Compra', 'TruckCap_Compra_General', 'Almacen_Capacidad_m2')
+
+
+class _ModeloBarrido:
+    """
+    Modelo de Fase 1 construido una sola vez, con referencias a las filas que cambian
+    entre puntos del barrido: capacidad de compra (coeficiente de z1), capacidad de
+    almacén (lado derecho) y una fila adicional de presupuesto de adquisición.
+    """
+
+    def __init__(self, params, constructor, opciones_solver):
+        self.opciones_solver = opciones_solver
+        self.solver = model_fase1.crear_solver(opciones_solver)
+        if not self.solver:
+            raise RuntimeError(f"No se pudo crear el solver {opciones_solver.get('solver', 'CBC')}.")
+        self.T = list(range(1, params['T_dias_planificacion'] + 1))
+        self.v = model_fase1.CONSTRUCTORES_FASE1[constructor](self.solver, params, self.T)
+        self.filas_compra = {t: self.solver.LookupConstraint(f"CapCompra_{t}") for t in self.T}
+        self.filas_almacen = {t: self.solver.LookupConstraint(f"Almacen_{t}") for t in self.T}
+
+        # Presupuesto de adquisición: sum C_sp * x[s,p,t] <= presupuesto (inactiva con ub infinito).
+        self.fila_presupuesto = self.solver.Constraint(-self.solver.infinity(), self.solver.infinity(),
+                                                       'Presupuesto_Compra')
+        for (s, p, t), var in self.v['x'].items():
+            self.fila_presupuesto.SetCoefficient(var, params['C_sp'][s, p])
+        self.variables = self.solver.variables()
+        # Sólo se guarda la solución de un punto para el siguiente si el backend usa hints.
+        self.usa_hints = model_fase1.usa_hints(opciones_solver)
+        self.solucion_previa = None
+
+    def aplicar(self, punto):
+        """Ajusta coeficientes y lados derechos para el punto {parámetro: valor}."""
+        if 'Presupuesto_Compra' in punto:
+            presupuesto = punto['Presupuesto_Compra']
+            self.fila_presupuesto.SetUb(self.solver.infinity() if presupuesto is None else presupuesto)
+        if 'TruckCap_Compra_General' in punto:
+            for t, fila in self.filas_compra.items():
+                fila.SetCoefficient(self.v['z1'][t], -punto['TruckCap_Compra_General'])
+        if 'Almacen_Capacidad_m2' in punto:
+            for fila in self.filas_almacen.values():
+                fila.SetUb(punto['Almacen_Capacidad_m2'])
+
+    def resolver(self, punto):
+        """Resuelve un punto partiendo de la solución del punto anterior, si la hubo y el backend usa hints."""
+        self.aplicar(punto)
+        arranque_caliente = self.usa_hints and self.solucion_previa is not None
+        if arranque_caliente:
+            self.solver.SetHint(self.variables, self.solucion_previa)
+
+        inicio = time.perf_counter()
+        status = self.solver.Solve(model_fase1.parametros_resolucion(self.opciones_solver))
+        tiempo = time.perf_counter() - inicio
+
+        fila = dict(punto)
+        fila.update({'Estado': model_fase1.NOMBRES_ESTADO.get(status, str(status)),
+                     'Factible': status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE),
+                     'Costo': None, 'Costo_Compras': None, 'Gap': None,
+                     'Tiempo_Resolucion_s': tiempo, 'Arranque_Caliente': arranque_caliente})
+        if fila['Factible']:
+            objetivo = self.solver.Objective()
+            fila['Costo'] = objetivo.Value()
+            fila['Costo_Compras'] = sum(var.solution_value() * self.fila_presupuesto.GetCoefficient(var)
+                                        for var in self.v['x'].values())
+            fila['Gap'] = abs(objetivo.Value() - objetivo.BestBound()) / max(abs(objetivo.Value()), 1e-9)
+            if self.usa_hints:
+                self.solucion_previa = [round(var.solution_value()) for var in self.variables]
+        return fila
+
+
+def _resolver_bloque(tarea):
+    """Worker: construye el modelo una vez y recorre en orden su bloque de puntos."""
+    params, puntos, constructor, opciones_solver = tarea
+    modelo = _ModeloBarrido(params, constructor, opciones_solver)
+    filas = []
+    for punto in puntos:
+        filas.append(modelo.resolver(punto))
+        print(f"[Barrido] {punto} -> {filas[-1]['Estado']} "
+              f"(costo {filas[-1]['Costo']}, {filas[-1]['Tiempo_Resolucion_s']:.2f} s)")
+    return filas
+
+
+def barrido_fase1(params, grilla, workers=1, constructor='arreglos', opciones_solver=None):
+    """
+    Barrido paramétrico ("what-if") de la Fase 1 sin recargar datos ni reconstruir el
+    modelo en cada punto.
+
+    La grilla es el producto cartesiano de los valores de cada parámetro, p. ej.
+    {'Presupuesto_Compra': [None, 8000], 'Almacen_Capacidad_m2': [50, 100]}. Los puntos se
+    reparten en bloques contiguos entre 'workers' procesos; cada uno construye el modelo
+    una vez, cambia sólo coeficientes y lados derechos entre puntos, y arranca cada punto
+    con la solución del anterior como hint si el backend los usa (SOLVERS_CON_HINTS de
+    model_fase1_ortools); con CBC cada punto se resuelve en frío y 'Arranque_Caliente' es False.
+
+    Args:
+        params (dict): Parámetros del escenario, como los arma run_complete_optimization.
+        grilla (dict): {parámetro de PARAMETROS_BARRIDO: lista de valores}.
+        workers (int): Procesos en paralelo; se acota a los CPU disponibles (divididos
+            por los hilos del solver, si se fijan) y al número de puntos.
+        constructor (str): Constructor de CONSTRUCTORES_FASE1.
+        opciones_solver (dict): Igual que en solve_supply_model_gurobi (el límite de
+            tiempo aplica a cada punto).
+
+    Returns:
+        pd.DataFrame: Una fila por punto con los valores de los parámetros, estado,
+        factibilidad, costo total, costo de compras, gap y tiempo de resolución.
+    """
+    opciones_solver = opciones_solver or {}
+    desconocidos = set(grilla) - set(PARAMETROS_BARRIDO)
+    if desconocidos:
+        raise ValueError(f"Parámetros no soportados en el barrido: {sorted(desconocidos)}. "
+                         f"Disponibles: {list(PARAMETROS_BARRIDO)}")
+
+    nombres = list(grilla)
+    puntos = [dict(zip(nombres, valores)) for valores in itertools.product(*(grilla[n] for n in nombres))]
+    hilos_por_worker = max(1, opciones_solver.get('hilos') or 1)
+    workers = max(1, min(workers, len(puntos), (os.cpu_count() or 1) // hilos_por_worker))
+    tamano_bloque = -(-len(puntos) // workers)
+    bloques = [puntos[i:i + tamano_bloque] for i in range(0, len(puntos), tamano_bloque)]
+    tareas = [(params, bloque, constructor, opciones_solver) for bloque in bloques]
+    print(f"--- BARRIDO FASE 1: {len(puntos)} puntos en {len(bloques)} bloque(s) ---")
+    if not model_fase1.usa_hints(opciones_solver):
+        print(f"[Barrido] {opciones_solver.get('solver', 'CBC')} ignora los hints: cada punto se resuelve sin "
+              f"arranque en caliente (use {' o '.join(model_fase1.SOLVERS_CON_HINTS)} para aprovecharlo).")
+
+    if len(tareas) == 1:
+        resultados = [_resolver_bloque(tareas[0])]
+    else:
+        # 'spawn', como los demás pools: cada worker arranca sin heredar el estado de OR-Tools
+        # ni los hilos del proceso padre.
+        with ProcessPoolExecutor(max_workers=len(tareas), mp_context=multiprocessing.get_context('spawn')) as pool:
+            resultados = list(pool.map(_resolver_bloque, tareas))
+
+    return pd.DataFrame([fila for bloque in resultados for fila in bloque])
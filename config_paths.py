@@ -13,6 +13,18 @@ else:
 BASE_DATA_INPUT_PATH = os.path.join(application_path, "data")
 BASE_OUTPUT_PATH = os.path.join(application_path, "outputs")
 
+# --- Caché persistente de soluciones VRP (compartida entre corridas y escenarios) ---
+RUTA_CACHE_VRP = os.path.join(BASE_OUTPUT_PATH, "Cache_VRP")
+
+# --- Caché de parámetros ya parseados por escenario (clave: huella del contenido de los CSV) ---
+RUTA_CACHE_DATOS = os.path.join(BASE_OUTPUT_PATH, "Cache_Datos")
+
+# --- Matrices de distancia VRP convertidas a .npy (se abren con memory-map) ---
+RUTA_CACHE_MATRICES = os.path.join(BASE_OUTPUT_PATH, "Cache_Matrices")
+
+# --- Almacén columnar de resultados, particionado por escenario y día (ver almacen_resultados.py) ---
+RUTA_ALMACEN_RESULTADOS = os.path.join(BASE_OUTPUT_PATH, "Almacen_Resultados")
+
 # --- INICIO DEL BLOQUE FALTANTE ---
 # --- Rutas comunes a todos los escenarios ---
 rutas_comunes = {
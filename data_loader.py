@@ -1,7 +1,22 @@
 # data_loader.py
 
+import hashlib
+import math
+import os
+import pickle
+import numpy as np
 import pandas as pd
 
+# Incrementar si cambia la forma de 'params' para invalidar la caché de escenarios.
+VERSION_CACHE_PARAMS = 1
+
+# Radio medio de la Tierra para distancias haversine.
+RADIO_TIERRA_KM = 6371.0088
+
+# Archivos de un escenario que alimentan 'params' (la matriz VRP se carga aparte).
+ARCHIVOS_PARAMS = ('Parametros Generales', 'Datos Especies', 'Disponibilidad Especies',
+                   'Costos Unitarios', 'Areas Poligonos', 'Vehiculos VRP')
+
 # --- Funciones para Cargar Datos desde CSV ---
 
 def cargar_parametros_generales(filepath):
@@ -44,38 +59,38 @@ def cargar_disponibilidad_y_proveedores(filepath):
     """Carga la disponibilidad de especies por proveedor."""
     df = pd.read_csv(filepath)
     P_proveedores_list = df.columns[1:].tolist()
-    FactE_sp_dict = {}
-    for index, row in df.iterrows():
-        especie = row['Especie']
-        for proveedor in P_proveedores_list:
-            FactE_sp_dict[(especie, proveedor)] = int(row[proveedor])
+    # stack() recorre especie por especie y proveedor por proveedor, igual que el doble ciclo original.
+    disponibilidad = df.set_index('Especie')[P_proveedores_list].stack()
+    FactE_sp_dict = dict(zip(disponibilidad.index.tolist(), disponibilidad.astype(int).tolist()))
     return P_proveedores_list, FactE_sp_dict
 
 def cargar_costos_unitarios(filepath, proveedores_list=None):
     """Carga los costos unitarios por especie y proveedor, manejando valores no disponibles."""
     df = pd.read_csv(filepath)
-    C_sp_dict = {}
     if proveedores_list is None:
         proveedores_list_actual = df.columns[1:].tolist()
     else:
         proveedores_list_actual = proveedores_list
 
-    for index, row in df.iterrows():
-        especie = row['Especie']
-        for proveedor in proveedores_list_actual:
-            if proveedor in df.columns:
-                costo = row[proveedor]
-                if pd.isna(costo) or str(costo).strip() in ['', '--', 'nan', 'NaN', '9999', '9999.0']:
-                    C_sp_dict[(especie, proveedor)] = float('inf')
-                else:
-                    try:
-                        C_sp_dict[(especie, proveedor)] = float(costo)
-                    except ValueError:
-                        C_sp_dict[(especie, proveedor)] = float('inf')
-            else:
-                C_sp_dict[(especie, proveedor)] = float('inf')
+    # Proveedores ausentes del archivo, celdas vacías, '--', texto no numérico y el
+    # marcador 9999 significan "no disponible" (costo infinito).
+    costos = df.set_index('Especie').reindex(columns=proveedores_list_actual)
+    costos = costos.apply(lambda columna: pd.to_numeric(columna.astype(str).str.strip(), errors='coerce'))
+    valores = costos.to_numpy(dtype=float, copy=True)
+    valores[np.isnan(valores) | (valores == 9999)] = float('inf')
+
+    claves = [(especie, proveedor) for especie in costos.index.tolist() for proveedor in proveedores_list_actual]
+    C_sp_dict = dict(zip(claves, valores.ravel().tolist()))
     return C_sp_dict
 
+def construir_pares_admisibles(especies_list, proveedores_list, disponibilidad_dict, costos_dict):
+    """
+    Devuelve la lista de pares (especie, proveedor) que realmente se pueden comprar:
+    disponibles (valor 1) y con costo finito. Los demás no necesitan variables en la Fase 1.
+    """
+    return [(s, p) for s in especies_list for p in proveedores_list
+            if disponibilidad_dict.get((s, p), 0) == 1 and math.isfinite(costos_dict.get((s, p), float('inf')))]
+
 def cargar_areas_poligonos(filepath):
     """Carga las áreas de los polígonos a reforestar."""
     df = pd.read_csv(filepath)
@@ -129,4 +144,149 @@ def cargar_matriz_tiempos_vrp(filepath, depot_node_name='18', nodes_to_include=N
 
     df_ordered.fillna(99999, inplace=True) # Rellenar valores faltantes con un número alto
     
-    return df_ordered.values.tolist(), ordered_node_names_for_vrp
\ No newline at end of file
+    return df_ordered.values.tolist(), ordered_node_names_for_vrp
+
+def _huella_archivos(paths):
+    """SHA-256 del contenido de los archivos que alimentan 'params', más la versión de la caché."""
+    huella = hashlib.sha256(f"v{VERSION_CACHE_PARAMS}".encode('utf-8'))
+    for nombre in ARCHIVOS_PARAMS:
+        huella.update(nombre.encode('utf-8'))
+        with open(paths[nombre], 'rb') as f:
+            huella.update(f.read())
+    return huella.hexdigest()
+
+def _parsear_params_escenario(paths):
+    """Lee y combina todos los CSV de un escenario en el diccionario 'params'."""
+    params = {}
+    params.update(cargar_parametros_generales(paths["Parametros Generales"]))
+    params['S_especies'], params['Dens_s'], params['Area_s'], params['Trat_s'] = cargar_datos_especies(paths['Datos Especies'])
+    params['P_proveedores'], disp_sp = cargar_disponibilidad_y_proveedores(paths['Disponibilidad Especies'])
+    params['Disponibilidad_{sp}'] = disp_sp
+    params['C_sp'] = cargar_costos_unitarios(paths['Costos Unitarios'], params['P_proveedores'])
+    params['SP_admisibles'] = construir_pares_admisibles(
+        params['S_especies'], params['P_proveedores'], params['Disponibilidad_{sp}'], params['C_sp']
+    )
+    params['G_poligonos'], params['Ha_g_total'] = cargar_areas_poligonos(paths['Areas Poligonos'])
+    params['K_vehiculos_nombres'], params['cap_k_vehiculos_vrp'] = cargar_datos_vehiculos_vrp(paths['Vehiculos VRP'])
+
+    # Establecer valores por defecto para parámetros clave si no están en el archivo
+    params.setdefault('DesperPenalty_s', 1.0)
+    params.setdefault('PC_U', params.get('Costo_Unitario_Plantacion_PC', 1.0))
+    params.setdefault('StockMinEspecie_s', params.get('Stock_Minimo_Deseado_Por_Especie', 10))
+    return params
+
+def cargar_params_escenario(paths, directorio_cache=None):
+    """
+    Devuelve el diccionario 'params' de un escenario. Si se indica directorio_cache, el
+    resultado del parseo se guarda como pickle con nombre igual a la huella del contenido
+    de los CSV, de modo que las corridas siguientes (y los lotes o barridos) no vuelven a
+    parsear mientras los archivos no cambien.
+
+    Args:
+        paths (dict): Rutas del escenario (config_paths.rutas_escenarios[...]).
+        directorio_cache (str): Directorio de la caché; None la desactiva.
+    """
+    if not directorio_cache:
+        return _parsear_params_escenario(paths)
+
+    ruta_cache = os.path.join(directorio_cache, f"params_{_huella_archivos(paths)}.pkl")
+    if os.path.exists(ruta_cache):
+        try:
+            with open(ruta_cache, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            print(f"Advertencia: no se pudo leer la caché de parámetros '{ruta_cache}' ({e}). Se vuelve a parsear.")
+
+    params = _parsear_params_escenario(paths)
+    os.makedirs(directorio_cache, exist_ok=True)
+    # Escritura atómica: varios escenarios de un lote pueden escribir a la vez.
+    ruta_temporal = f"{ruta_cache}.{os.getpid()}.tmp"
+    with open(ruta_temporal, 'wb') as f:
+        pickle.dump(params, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(ruta_temporal, ruta_cache)
+    return params
+
+def calcular_matriz_tiempos_desde_coordenadas(coords_dict, velocidad=1.0, metrica='euclidiana', depot_node_name='18'):
+    """
+    Calcula la matriz de tiempos de viaje a partir de las coordenadas de los nodos, para
+    sitios que no tienen un archivo de matriz. El cálculo es vectorizado (n×n de una vez).
+
+    Args:
+        coords_dict (dict): {nodo: (x, y)}, como lo devuelve cargar_coordenadas_nodos. Con
+            metrica='haversine', x es la longitud e y la latitud en grados.
+        velocidad (float): Unidades de distancia por minuto (unidades de las coordenadas
+            para 'euclidiana', kilómetros para 'haversine').
+        metrica (str): 'euclidiana' o 'haversine'.
+
+    Returns:
+        tuple: (arreglo n×n de minutos, lista de nodos con el depot primero), en el mismo
+        orden que cargar_matriz_tiempos_vrp.
+    """
+    if depot_node_name not in coords_dict:
+        raise ValueError(f"El nodo depot '{depot_node_name}' no tiene coordenadas.")
+    nodos = sorted(coords_dict, key=lambda x: (x != depot_node_name, int(x)))
+    xy = np.array([coords_dict[n] for n in nodos], dtype=float)
+
+    if metrica == 'euclidiana':
+        diferencias = xy[:, None, :] - xy[None, :, :]
+        distancias = np.hypot(diferencias[..., 0], diferencias[..., 1])
+    elif metrica == 'haversine':
+        lon, lat = np.radians(xy[:, 0]), np.radians(xy[:, 1])
+        dlat = lat[None, :] - lat[:, None]
+        dlon = lon[None, :] - lon[:, None]
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat[:, None]) * np.cos(lat[None, :]) * np.sin(dlon / 2) ** 2
+        distancias = 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    else:
+        raise ValueError(f"Métrica '{metrica}' no soportada. Use 'euclidiana' o 'haversine'.")
+    return distancias / velocidad, nodos
+
+def construir_indice_vecinos(matriz, k):
+    """
+    Índice de los k vecinos más cercanos de cada nodo (sin incluirse a sí mismo), ordenados
+    de más a menos cercano, como arreglo n×k de posiciones. Usa argpartition sobre las
+    filas de la matriz, por lo que sirve para cualquier matriz, incluso asimétrica.
+    """
+    n = len(matriz)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.intp)
+
+    tiempos = np.array(matriz, dtype=float)
+    np.fill_diagonal(tiempos, np.inf)
+    candidatos = np.argpartition(tiempos, k - 1, axis=1)[:, :k]
+    orden = np.argsort(np.take_along_axis(tiempos, candidatos, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(candidatos, orden, axis=1)
+
+def cargar_plan_fase1(filepath):
+    """
+    Carga un plan de Fase 1 previo con la forma de 'results' ('x', 'y', 'z1', 'z2', 'XI').
+    Acepta el archivo de resultados guardado por el runner (.pkl) o el CSV de variables
+    'fase1_plan_variables.csv' que escribe generate_comparison_outputs. Con el CSV, las
+    métricas de la resolución (para medir el ahorro del arranque en caliente) se leen de
+    'fase1_metricas_solver.csv' en el mismo directorio, si existe.
+    """
+    if os.path.splitext(filepath)[1].lower() == '.pkl':
+        with open(filepath, 'rb') as f:
+            return pickle.load(f)
+
+    df = pd.read_csv(filepath, dtype={'Especie': str, 'Proveedor': str, 'Poligono': str})
+    plan = {'x': {}, 'y': {}, 'z1': {}, 'z2': {}, 'XI': {}}
+    columnas_por_familia = {
+        'x': ['Especie', 'Proveedor', 'Dia'],
+        'y': ['Especie', 'Poligono', 'Dia'],
+        'z1': ['Dia'],
+        'z2': ['Poligono', 'Dia'],
+        'XI': ['Especie', 'Dia'],
+    }
+    for familia, columnas in columnas_por_familia.items():
+        df_familia = df[df['Variable'] == familia]
+        dias = df_familia['Dia'].astype(int).tolist()
+        otras = [df_familia[c].tolist() for c in columnas[:-1]]
+        claves = dias if not otras else list(zip(*otras, dias))
+        plan[familia] = dict(zip(claves, df_familia['Valor'].astype(float).tolist()))
+
+    ruta_metricas = os.path.join(os.path.dirname(filepath), 'fase1_metricas_solver.csv')
+    if os.path.exists(ruta_metricas):
+        metricas = pd.read_csv(ruta_metricas).iloc[0]
+        plan['metricas_modelo'] = {k: v for k, v in metricas.to_dict().items() if pd.notna(v)}
+    return plan
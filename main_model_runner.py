@@ -1,93 +1,454 @@
 # main_model_runner.py (Versión con Métricas de Rendimiento)
 
 import os
+import copy
+import pickle
+import numpy as np
 import pandas as pd
 from collections import defaultdict
 import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import time     # <--- 1. Importamos la librería para medir tiempo
-import psutil   # <--- 2. Importamos la librería para medir memoria
 
 # Módulos del proyecto (Versión con OR-Tools)
 import config_paths
 import data_loader
 import model_fase1_ortools as model_fase1
 import model_fase2_ortools_milp as model_fase2
+import model_fase2_heuristico
+import model_fase2_ortools_routing
 import animation_generator
+from vrp_cache import CacheVRP
+from scenario_data import ScenarioData
+from matriz_distancias import MatrizDistancias
+from almacen_resultados import AlmacenResultados
+from pipeline import EtapaAsincrona
+from resultados_fase1 import ResultadosFase1
+from telemetria import Telemetria, memoria_pico_mb
 
 
-def generate_comparison_outputs(fase1_results, vrp_results, params, output_path):
+def _tabla_familia(fase1_results, familia, columnas):
+    """Valores de una familia de variables de Fase 1 como tabla: una columna por índice más 'Valor'."""
+    if isinstance(fase1_results, ResultadosFase1) and familia in fase1_results.familias:
+        return fase1_results.tabla(familia)
+    valores = fase1_results.get(familia, {})
+    claves = list(valores.keys())
+    if len(columnas) == 1:
+        tabla = pd.DataFrame({columnas[0]: claves})
+    else:
+        tabla = pd.DataFrame(claves, columns=list(columnas)) if claves else pd.DataFrame(columns=list(columnas))
+    tabla['Valor'] = list(valores.values())
+    return tabla
+
+
+def _buscar_por_clave(mapeo, *columnas, por_defecto=0.0):
+    """Busca en bloque mapeo[(c1, c2, ...)] para cada fila de las columnas dadas."""
+    serie = pd.Series(dict(mapeo), dtype=float)
+    if len(columnas) == 1:
+        return columnas[0].map(serie).fillna(por_defecto).to_numpy(dtype=float)
+    return serie.reindex(pd.MultiIndex.from_arrays(columnas)).fillna(por_defecto).to_numpy(dtype=float)
+
+
+def _tiempos_arcos(matriz_tiempos, origenes, destinos, por_defecto=1e6):
+    """Tiempos de viaje de un conjunto de arcos, con el mismo valor por defecto que los modelos de Fase 2."""
+    if isinstance(matriz_tiempos, MatrizDistancias):
+        i = origenes.map(matriz_tiempos.indice)
+        j = destinos.map(matriz_tiempos.indice)
+        presentes = (i.notna() & j.notna()).to_numpy()
+        tiempos = np.full(len(origenes), por_defecto)
+        tiempos[presentes] = matriz_tiempos.valores[i[presentes].astype(int).to_numpy(), j[presentes].astype(int).to_numpy()]
+        return tiempos
+    return _buscar_por_clave(matriz_tiempos, origenes, destinos, por_defecto=por_defecto)
+
+
+# Familias de variables de Fase 1 y los índices de cada una.
+COLUMNAS_POR_FAMILIA = {
+    'x': ('Especie', 'Proveedor', 'Dia'),
+    'y': ('Especie', 'Poligono', 'Dia'),
+    'z1': ('Dia',),
+    'z2': ('Poligono', 'Dia'),
+    'XI': ('Especie', 'Dia'),
+    'Desper': ('Especie', 'Poligono', 'Dia'),
+}
+# Familias que forman el plan reutilizable (fase1_plan_variables.csv) y columnas de las tablas de salida.
+FAMILIAS_PLAN = ('x', 'y', 'z1', 'z2', 'XI')
+COLUMNAS_PLAN = ['Variable', 'Especie', 'Proveedor', 'Poligono', 'Dia', 'Valor']
+COLUMNAS_RUTAS = ['Día', 'Vehículo', 'Ruta_Nodos_Str', 'Carga_Plantas', 'Tiempo_min']
+# Días resueltos que pueden esperar en la cola de la etapa escritora antes de frenar al VRP.
+MAX_DIAS_EN_COLA = 16
+# Etapas que se miden en telemetria.jsonl (y que pueden perfilarse con --perfil-etapa).
+ETAPAS_TELEMETRIA = ('carga', 'fase1', 'vrp', 'salidas', 'animaciones')
+
+
+def _tabla_plan_fase1(tablas):
+    """Plan de Fase 1 en formato largo (una fila por variable) a partir de las tablas por familia."""
+    df_plan = pd.concat([tablas[familia].assign(Variable=familia) for familia in FAMILIAS_PLAN], ignore_index=True)
+    return df_plan.reindex(columns=COLUMNAS_PLAN)
+
+
+def _tabla_rutas_vrp(vrp_results, y, params, matriz_tiempos=None):
+    """
+    Una fila por ruta del VRP con su carga (plantas entregadas ese día en los nodos que
+    visita) y su duración (viaje más descarga en cada nodo visitado). Sin matriz de
+    tiempos, Tiempo_min es el total del día.
+
+    Args:
+        vrp_results (dict): {día: solución VRP del día o None}.
+        y (pd.DataFrame): Tabla de la familia 'y' de Fase 1 (ver _tabla_familia).
+    """
+    rutas = [(dia, ruta_info['vehiculo'], [str(n) for n in ruta_info['ruta']], resultado_dia.get('tiempo_total', 0))
+             for dia, resultado_dia in vrp_results.items() if resultado_dia and resultado_dia.get('rutas')
+             for ruta_info in resultado_dia['rutas']]
+    df_rutas = pd.DataFrame(rutas, columns=['Día', 'Vehículo', 'Nodos', 'Tiempo_Dia'])
+    df_rutas['Ruta_Nodos_Str'] = df_rutas['Nodos'].str.join(' -> ')
+
+    # Una fila por parada (el índice identifica la ruta); el primer nodo de cada ruta es el depósito.
+    paradas = df_rutas[['Día', 'Nodos']].explode('Nodos').rename(columns={'Nodos': 'Nodo'})
+    paradas = paradas[paradas['Nodo'].notna()]
+    por_ruta = paradas.groupby(level=0)['Nodo']
+    es_cliente = paradas['Nodo'] != por_ruta.transform('first')
+
+    # Carga: plantas entregadas ese día en cada nodo visitado (fuera del depósito).
+    demanda = y['Valor'].groupby([y['Dia'], y['Poligono'].astype(str)]).sum()
+    carga = demanda.reindex(pd.MultiIndex.from_arrays([paradas['Día'], paradas['Nodo']])).fillna(0.0).to_numpy()
+    df_rutas['Carga_Plantas'] = pd.Series(np.where(es_cliente, carga, 0.0), index=paradas.index).groupby(level=0).sum()
+
+    if matriz_tiempos is not None:
+        siguiente = por_ruta.shift(-1)
+        arcos = siguiente.notna().to_numpy()
+        viaje = np.zeros(len(paradas))
+        viaje[arcos] = _tiempos_arcos(matriz_tiempos, paradas['Nodo'][arcos], siguiente[arcos])
+        servicio = np.where(es_cliente, params.get('Tiempo_Descarga_LD_min', 0), 0.0)
+        df_rutas['Tiempo_min'] = pd.Series(viaje + servicio, index=paradas.index).groupby(level=0).sum()
+    else:
+        df_rutas['Tiempo_min'] = df_rutas['Tiempo_Dia']
+    return df_rutas[COLUMNAS_RUTAS]
+
+
+def generate_comparison_outputs(fase1_results, vrp_results, params, output_path, matriz_tiempos=None):
     """
     Toma los resultados crudos de los solvers y los convierte a los formatos CSV
     esperados para su análisis.
+
+    Los resultados (diccionarios dispersos indexados por tuplas) se pasan a tablas y
+    los KPIs diarios se calculan con group-bys. Con matriz_tiempos, cada ruta del VRP
+    lleva su carga (plantas entregadas en sus nodos ese día) y su duración (viaje más
+    descarga en cada nodo visitado); sin ella, Tiempo_min es el total del día.
     """
     print("\n--- Iniciando generación de archivos CSV de salida para comparación ---")
+    tablas = _escribir_salidas_fase1(fase1_results, params, output_path)
+    _escribir_rutas_vrp(_tabla_rutas_vrp(vrp_results, tablas['y'], params, matriz_tiempos), output_path)
 
+
+def _escribir_salidas_fase1(fase1_results, params, output_path):
+    """Escribe los CSV de Fase 1 (archivos 1, 2, 2b y 2c) y devuelve las tablas por familia."""
     # Asegurarse de que los directorios de salida existan
     fase1_output_dir = os.path.join(output_path, 'Fase1_Suministro_Siembra_Logs', 'Analisis_KPIs_Fase1')
-    fase2_output_dir = os.path.join(output_path, 'Fase2_VRP_Logs')
     os.makedirs(fase1_output_dir, exist_ok=True)
-    os.makedirs(fase2_output_dir, exist_ok=True)
     
     T = list(range(1, params['T_dias_planificacion'] + 1))
-    S = params['S_especies']
+    tablas = {familia: _tabla_familia(fase1_results, familia, columnas)
+              for familia, columnas in COLUMNAS_POR_FAMILIA.items()}
+    x, y = tablas['x'], tablas['y']
     
     # --- Archivo 1: fase1_hectareas_plantadas_diarias.csv ---
-    ha_plantadas_data = []
-    ha_restantes_total = sum(params['Ha_g_total'].values())
-    for t in T:
-        ha_plantadas_dia = sum(fase1_results.get('y', {}).get((s, g, t), 0) / params['Dens_s'][s]
-                               for s in S for g in params['G_poligonos'])
-        ha_restantes_total -= ha_plantadas_dia
-        ha_plantadas_data.append({
-            'Día': t,
-            'Hectareas_Plantadas_Dia': ha_plantadas_dia,
-            'Hectareas_Restantes_Total': ha_restantes_total
-        })
-    df_hectareas = pd.DataFrame(ha_plantadas_data)
+    ha_plantadas = y['Valor'] / _buscar_por_clave(params['Dens_s'], y['Especie'], por_defecto=np.nan)
+    ha_plantadas_dia = ha_plantadas.groupby(y['Dia']).sum().reindex(T, fill_value=0.0)
+    df_hectareas = pd.DataFrame({
+        'Día': T,
+        'Hectareas_Plantadas_Dia': ha_plantadas_dia.to_numpy(),
+        'Hectareas_Restantes_Total': sum(params['Ha_g_total'].values()) - ha_plantadas_dia.cumsum().to_numpy()
+    })
     df_hectareas.to_csv(os.path.join(fase1_output_dir, 'fase1_hectareas_plantadas_diarias.csv'), index=False)
     print("Archivo 'fase1_hectareas_plantadas_diarias.csv' generado.")
 
     # --- Archivo 2: fase1_costos_diarios.csv ---
-    costos_data = []
-    presupuesto_acumulado = 0
-    for t in T:
-        gasto_compras_dia = sum(fase1_results.get('x', {}).get((s, p, t), 0) * params['C_sp'].get((s,p), 0)
-                                for s in S for p in params['P_proveedores'])
-        gasto_desperdicio_dia = sum(fase1_results.get('Desper', {}).get((s, g, t), 0) * params.get('DesperPenalty_s', 1.0)
-                                     for s in S for g in params['G_poligonos'])
-        presupuesto_acumulado += gasto_compras_dia
-        costos_data.append({
-            'Día': t,
-            'Gasto_Compras_Dia': gasto_compras_dia,
-            'Gasto_Desperdicio_Dia': gasto_desperdicio_dia,
-            'Presupuesto_Acumulado_Utilizado': presupuesto_acumulado
-        })
-    df_costos = pd.DataFrame(costos_data)
+    # Sólo se multiplican los valores no nulos, así los pares sin costo (infinito) no aportan NaN.
+    costos_x = _buscar_por_clave(params['C_sp'], x['Especie'], x['Proveedor'])
+    gasto_compras = pd.Series(np.where(x['Valor'] != 0, x['Valor'] * costos_x, 0.0), index=x.index)
+    gasto_compras_dia = gasto_compras.groupby(x['Dia']).sum().reindex(T, fill_value=0.0)
+    desper = tablas['Desper']
+    gasto_desperdicio_dia = (desper['Valor'].groupby(desper['Dia']).sum().reindex(T, fill_value=0.0)
+                             * params.get('DesperPenalty_s', 1.0))
+    df_costos = pd.DataFrame({
+        'Día': T,
+        'Gasto_Compras_Dia': gasto_compras_dia.to_numpy(),
+        'Gasto_Desperdicio_Dia': gasto_desperdicio_dia.to_numpy(),
+        'Presupuesto_Acumulado_Utilizado': gasto_compras_dia.cumsum().to_numpy()
+    })
     df_costos.to_csv(os.path.join(fase1_output_dir, 'fase1_costos_diarios.csv'), index=False)
     print("Archivo 'fase1_costos_diarios.csv' generado.")
-    
-    # --- Archivo 3: vrp_rutas_resumen.csv ---
-    rutas_data = []
-    for dia, resultado_dia in vrp_results.items():
-        if resultado_dia and resultado_dia.get('rutas'):
-            for ruta_info in resultado_dia['rutas']:
-                rutas_data.append({
-                    'Día': dia,
-                    'Vehículo': ruta_info['vehiculo'],
-                    'Ruta_Nodos_Str': ' -> '.join(map(str, ruta_info['ruta'])),
-                    'Carga_Plantas': 0, # Este dato requeriría más detalle para calcularse
-                    'Tiempo_min': resultado_dia.get('tiempo_total', 0)
-                })
-    df_rutas = pd.DataFrame(rutas_data)
+
+    # --- Archivo 2b: fase1_plan_variables.csv (plan completo, reutilizable como arranque en caliente) ---
+    df_plan = _tabla_plan_fase1(tablas)
+    df_plan.to_csv(os.path.join(fase1_output_dir, 'fase1_plan_variables.csv'), index=False)
+    print("Archivo 'fase1_plan_variables.csv' generado.")
+
+    # --- Archivo 2c: fase1_metricas_solver.csv (tiempos y estadísticas de la resolución) ---
+    # Junto al plan, permite medir el ahorro del arranque en caliente también desde el CSV.
+    metricas = {**fase1_results.get('metricas_modelo', {}), **fase1_results.get('estadisticas_solver', {})}
+    if metricas:
+        pd.DataFrame([metricas]).to_csv(os.path.join(fase1_output_dir, 'fase1_metricas_solver.csv'), index=False)
+        print("Archivo 'fase1_metricas_solver.csv' generado.")
+    return tablas
+
+
+def _escribir_rutas_vrp(df_rutas, output_path):
+    """Escribe el archivo 3: vrp_rutas_resumen.csv."""
+    fase2_output_dir = os.path.join(output_path, 'Fase2_VRP_Logs')
+    os.makedirs(fase2_output_dir, exist_ok=True)
     df_rutas.to_csv(os.path.join(fase2_output_dir, 'vrp_rutas_resumen.csv'), index=False)
     print("Archivo 'vrp_rutas_resumen.csv' generado.")
 
 
-def run_complete_optimization(scenario_name):
+# Motores disponibles para la Fase 2. Todos devuelven {'rutas', 'tiempo_total', 'status'}.
+MOTORES_VRP = {
+    'milp': model_fase2.solve_vrp_analytically,
+    'milp_dos_indices': model_fase2.solve_vrp_dos_indices,
+    'heuristico': model_fase2_heuristico.solve_vrp_heuristico,
+    'routing': model_fase2_ortools_routing.solve_vrp_routing,
+}
+
+
+def _resolver_vrp_dia(tarea):
+    """Resuelve el VRP de un solo día. Debe ser de nivel módulo para poder enviarse a otro proceso."""
+    dia, demandas_del_dia, matriz_tiempos, vehiculos, params, opciones = tarea
+    motor = opciones.get('motor', 'milp')
+    inicio = time.perf_counter()
+    argumentos = dict(dia=dia, demandas_diarias=demandas_del_dia, matriz_tiempos=matriz_tiempos,
+                      vehiculos=vehiculos, params=params)
+
+    if motor in ('milp', 'milp_dos_indices'):
+        solucion_inicial = None
+        if opciones.get('warm_start'):
+            solucion_inicial = model_fase2_heuristico.solve_vrp_heuristico(**argumentos, vecinos_k=opciones.get('vecinos_k'))
+        argumentos.update(num_hilos=opciones.get('hilos_solver'), solucion_inicial=solucion_inicial,
+                          vecinos_k=opciones.get('vecinos_k'))
+        if motor == 'milp':
+            argumentos['romper_simetria'] = opciones.get('romper_simetria', False)
+            argumentos['cortes_perezosos'] = opciones.get('cortes_perezosos', False)
+        resultado_vrp_dia = MOTORES_VRP[motor](**argumentos)
+    elif motor == 'routing':
+        resultado_vrp_dia = model_fase2_ortools_routing.solve_vrp_routing(
+            **argumentos, limite_tiempo_s=opciones.get('limite_tiempo_s', 5), vecinos_k=opciones.get('vecinos_k')
+        )
+    elif motor == 'heuristico':
+        resultado_vrp_dia = model_fase2_heuristico.solve_vrp_heuristico(**argumentos, vecinos_k=opciones.get('vecinos_k'))
+    else:
+        raise ValueError(f"Motor VRP desconocido: {motor}")
+    if resultado_vrp_dia is not None:
+        # Tiempo del día completo (incluye la heurística de arranque); los MILP agregan sus estadísticas.
+        resultado_vrp_dia.setdefault('estadisticas_solver', {})['tiempo_total_s'] = time.perf_counter() - inicio
+    return dia, resultado_vrp_dia
+
+
+def _demandas_por_dia(fase1_results, T):
+    """
+    {día: {polígono: plantas}} a partir de la variable 'y' de Fase 1. Con ResultadosFase1
+    cada día es un corte directo; con un 'results' de diccionarios se agrupa en una sola
+    pasada en lugar de recorrer 'y' completa por cada día.
+    """
+    if isinstance(fase1_results, ResultadosFase1):
+        return {t: fase1_results.demanda_dia(t) for t in T}
+    demandas = defaultdict(lambda: defaultdict(float))
+    for (s, g, t), val in fase1_results.get('y', {}).items():
+        demandas[t][g] += val
+    return {t: dict(demandas.get(t, {})) for t in T}
+
+
+def resolver_vrp_todos_los_dias(T, fase1_results, matriz_tiempos, vehiculos, params, workers=1, hilos_solver=1, cache=None,
+                                motor='milp', warm_start=False, limite_tiempo_vrp_s=5, vecinos_k=None,
+                                romper_simetria=False, cortes_perezosos=False, al_resolver_dia=None,
+                                telemetria=None):
+    """
+    Resuelve el VRP de cada día del horizonte. Cada día es un modelo independiente,
+    por lo que con workers > 1 se reparten entre un pool de procesos. Los resultados
+    se devuelven siempre en orden de día, sin importar el orden en que terminen.
+
+    Si se proporciona una CacheVRP, los días cuya firma ya fue resuelta (en esta
+    corrida o en una anterior) no se vuelven a resolver, y los días con la misma
+    firma dentro de la corrida se resuelven una sola vez.
+
+    motor elige el solver de la Fase 2 (ver MOTORES_VRP); con warm_start los MILP
+    arrancan desde la solución del motor heurístico. limite_tiempo_vrp_s acota cada
+    día con el motor 'routing'. vecinos_k restringe los arcos candidatos de todos los
+    motores a los k vecinos más cercanos de cada nodo. romper_simetria ordena los
+    vehículos idénticos y cortes_perezosos reemplaza las restricciones MTZ por un ciclo
+    de cortes de subtours, ambos en el MILP de tres índices.
+
+    al_resolver_dia(día, solución) se llama en cuanto cada día tiene solución (resuelto,
+    recuperado de la caché o copiado de otro día con la misma firma), no al final. Con una
+    Telemetria, cada día se registra como evento 'vrp_dia' con su origen y, si se resolvió
+    en esta corrida, las estadísticas del solver.
+    """
+    opciones = {'motor': motor, 'hilos_solver': hilos_solver, 'warm_start': warm_start,
+                'limite_tiempo_s': limite_tiempo_vrp_s, 'vecinos_k': vecinos_k, 'romper_simetria': romper_simetria,
+                'cortes_perezosos': cortes_perezosos}
+    # Las soluciones del motor 'routing' dependen del límite de tiempo, por lo que forma parte de la firma.
+    firma_motor = (motor, limite_tiempo_vrp_s) if motor == 'routing' else motor
+    if vecinos_k:
+        firma_motor = (firma_motor, 'vecinos', vecinos_k)
+    # Romper simetría y los cortes perezosos cambian la formulación del motor 'milp' (y,
+    # con empates, qué ruta óptima devuelve), así que tampoco se comparten entre sí.
+    if motor == 'milp':
+        firma_motor = (firma_motor, 'simetria', bool(romper_simetria), 'cortes', bool(cortes_perezosos))
+    # El arranque en caliente agrega la cota de la solución inicial a los MILP, que con
+    # empates también puede cambiar la ruta devuelta.
+    if motor in ('milp', 'milp_dos_indices'):
+        firma_motor = (firma_motor, 'warm_start', bool(warm_start))
+    all_vrp_results = {}
+    demandas_por_dia = _demandas_por_dia(fase1_results, T)
+
+    def _registrar(dia, resultado_vrp_dia, origen='resuelto'):
+        all_vrp_results[dia] = resultado_vrp_dia
+        if telemetria is not None:
+            estadisticas = (resultado_vrp_dia or {}).get('estadisticas_solver', {}) if origen == 'resuelto' else {}
+            telemetria.registrar('vrp_dia', dia=dia, motor=motor, origen=origen, clientes=len(demandas_por_dia[dia]),
+                                 estado=(resultado_vrp_dia or {}).get('status'), **estadisticas)
+        if al_resolver_dia is not None:
+            al_resolver_dia(dia, resultado_vrp_dia)
+
+    tareas = []
+    dias_por_clave = defaultdict(list)
+    clave_por_dia = {}
+
+    def _registrar_resuelto(dia, resultado_vrp_dia):
+        # Los días con la misma firma se registran en cuanto termina su representante.
+        _registrar(dia, resultado_vrp_dia)
+        if cache is None:
+            return
+        clave = clave_por_dia[dia]
+        cache.guardar(clave, resultado_vrp_dia)
+        for dia_repetido in dias_por_clave[clave][1:]:
+            print(f"Día {dia_repetido}: Reutiliza la solución VRP del día {dia} (misma firma).")
+            _registrar(dia_repetido, copy.deepcopy(resultado_vrp_dia), 'firma_repetida')
+
+    for t in T:
+        demandas_del_dia = demandas_por_dia[t]
+        if not demandas_del_dia:
+            print(f"Día {t}: Sin actividad de plantación, se omite el VRP.")
+            _registrar(t, None, 'sin_demanda')
+            continue
+
+        if cache is not None:
+            clave = CacheVRP.clave(demandas_del_dia, matriz_tiempos, vehiculos, params, extra=firma_motor)
+            if clave in dias_por_clave:
+                # Misma firma que un día ya pendiente en esta corrida: se resuelve una sola vez.
+                dias_por_clave[clave].append(t)
+                continue
+            solucion_guardada = cache.obtener(clave)
+            if solucion_guardada is not None:
+                print(f"Día {t}: Solución VRP recuperada de la caché.")
+                _registrar(t, solucion_guardada, 'cache')
+                continue
+            dias_por_clave[clave].append(t)
+            clave_por_dia[t] = clave
+
+        tareas.append((t, demandas_del_dia, matriz_tiempos, vehiculos, params, opciones))
+
+    if workers > 1 and len(tareas) > 1:
+        print(f"\n--- Resolviendo {len(tareas)} VRP diarios (motor '{motor}') en paralelo con {workers} procesos "
+              f"({hilos_solver} hilo(s) de solver por proceso) ---")
+        # Los hilos por proceso los acota cada solver MILP con SetNumThreads(hilos_solver); los
+        # motores heurístico y de ruteo usan un solo hilo. Los workers se crean con 'spawn':
+        # para entonces ya corren el hilo escritor y el del renderizador, y un fork con otros
+        # hilos vivos puede dejar al hijo bloqueado en un candado heredado.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futuros = [pool.submit(_resolver_vrp_dia, tarea) for tarea in tareas]
+            for futuro in as_completed(futuros):
+                _registrar_resuelto(*futuro.result())
+    else:
+        for tarea in tareas:
+            _registrar_resuelto(*_resolver_vrp_dia(tarea))
+
+    if cache is not None:
+        stats = cache.estadisticas()
+        print(f"\n[CacheVRP] Aciertos memoria: {stats['aciertos_memoria']} | Aciertos disco: {stats['aciertos_disco']} | "
+              f"Fallos: {stats['fallos']} | Tasa de aciertos: {stats['tasa_aciertos']:.1%}")
+
+    return {t: all_vrp_results[t] for t in T}
+
+
+def cargar_activos_comunes():
+    """
+    Carga una sola vez los activos compartidos por todos los escenarios: coordenadas
+    de nodos, mapa e ícono del camión (ya preparados para las animaciones).
+    """
+    activos = {'coords_nodos': data_loader.cargar_coordenadas_nodos(config_paths.rutas_comunes['Coordenadas Nodos'])}
+    try:
+        activos['imagenes'] = animation_generator.cargar_activos_imagen(
+            config_paths.rutas_comunes['Mapa'], config_paths.rutas_comunes['Icono Camion']
+        )
+    except FileNotFoundError as e:
+        print(f"ADVERTENCIA: No se pudieron cargar las imágenes para animaciones: {e}")
+        activos['imagenes'] = None
+    return activos
+
+
+def _costo_plan_fase1(fase1_results, params):
+    """Costo de adquisición más plantación de un plan de Fase 1."""
+    costo_compras = sum(valor * params['C_sp'].get((s, p), 0) for (s, p, t), valor in fase1_results.get('x', {}).items())
+    costo_plantacion = sum(valor * params['PC_U'] for valor in fase1_results.get('y', {}).values())
+    return costo_compras + costo_plantacion
+
+
+def run_complete_optimization(scenario_name, workers_vrp=1, hilos_solver=1, usar_cache_vrp=True,
+                              motor_vrp='milp', warm_start_vrp=False, limite_tiempo_vrp_s=5,
+                              constructor_fase1='arreglos', ventana_fase1=0, traslape_fase1=15,
+                              opciones_solver_fase1=None, plan_previo_fase1=None, activos_comunes=None,
+                              usar_cache_datos=True, vecinos_vrp=None, velocidad_coordenadas=1.0,
+                              metrica_coordenadas='euclidiana', romper_simetria_vrp=False, cortes_perezosos_vrp=False,
+                              workers_animacion=1, formato_animacion='gif', almacen_resultados=False,
+                              perfil_etapa=None, memoria_python=False):
     """
     Función orquestadora principal para el modelo de optimización.
+
+    Args:
+        scenario_name (str): Escenario definido en config_paths.rutas_escenarios.
+        workers_vrp (int): Procesos para resolver los VRP diarios en paralelo (1 = secuencial).
+        hilos_solver (int): Hilos máximos que cada solver de VRP puede usar.
+        usar_cache_vrp (bool): Reutilizar soluciones VRP ya resueltas (caché en memoria y en disco).
+        motor_vrp (str): Motor de la Fase 2, una de las claves de MOTORES_VRP.
+        warm_start_vrp (bool): Con los motores MILP, arrancar desde la solución heurística.
+        limite_tiempo_vrp_s (float): Límite de tiempo por día para el motor 'routing'.
+        constructor_fase1 (str): Constructor del modelo de Fase 1 ('arreglos' o 'clasico').
+        ventana_fase1 (int): Días por ventana del horizonte rodante de Fase 1 (0 = modelo completo).
+        traslape_fase1 (int): Días de cada ventana que se vuelven a resolver en la siguiente.
+        opciones_solver_fase1 (dict): Backend y controles del solver de Fase 1
+            ('solver', 'hilos', 'gap_relativo', 'limite_tiempo_s', 'log_solver').
+        plan_previo_fase1 (str): Ruta a un plan previo (.pkl o fase1_plan_variables.csv)
+            para arrancar la Fase 1 en caliente, también por horizonte rodante. Sólo SCIP y CP-SAT
+            aprovechan los hints; con CBC se advierte y el plan previo no se aplica.
+        activos_comunes (dict): Activos ya cargados con cargar_activos_comunes(); si no
+            se proporcionan, se cargan aquí.
+        usar_cache_datos (bool): Reutilizar los parámetros ya parseados de config_paths.RUTA_CACHE_DATOS
+            mientras los CSV del escenario no cambien.
+        vecinos_vrp (int): Restringe los arcos de los motores de Fase 2 a los k vecinos más
+            cercanos de cada nodo.
+        velocidad_coordenadas, metrica_coordenadas: Si el escenario no tiene archivo de matriz
+            de distancias, los tiempos se calculan desde las coordenadas de los nodos con esta
+            velocidad (unidades por minuto) y métrica ('euclidiana' o 'haversine').
+        romper_simetria_vrp (bool): Con el motor 'milp', ordenar por carga los vehículos idénticos.
+        cortes_perezosos_vrp (bool): Con el motor 'milp', eliminar subtours con cortes
+            agregados bajo demanda en lugar de restricciones MTZ.
+        workers_animacion (int): Procesos para renderizar los GIF diarios en paralelo.
+        formato_animacion (str): 'gif' (un GIF por día), 'json' o 'svg' (un único replay
+            vectorial del escenario, ver animation_generator.exportar_replay_vectorial).
+        almacen_resultados (bool): Guardar el plan de Fase 1 y cada día de VRP, en cuanto
+            están disponibles, en el almacén columnar de config_paths.RUTA_ALMACEN_RESULTADOS.
+        perfil_etapa (str): Etapa de ETAPAS_TELEMETRIA a perfilar con cProfile.
+        memoria_python (bool): Medir además el pico de memoria Python de cada etapa con
+            tracemalloc (más lento).
+
+    Las métricas de cada etapa, del solver de Fase 1 y de cada día de VRP se escriben en
+    <salidas del escenario>/telemetria.jsonl (ver telemetria.Telemetria).
+
+    Returns:
+        dict: Resumen de la corrida (estado, costo y tiempos por paso).
     """
     print(f"--- INICIANDO MODELO DE OPTIMIZACIÓN PARA ESCENARIO: {scenario_name} ---")
+    resumen = {'Escenario': scenario_name, 'Estado': 'Error de configuración'}
 
     # --- PASO 1: Carga de Configuración y Datos ---
     print("\n--- PASO 1: Cargando datos y parámetros ---")
@@ -95,110 +456,444 @@ def run_complete_optimization(scenario_name):
     if scenario_name not in config_paths.rutas_escenarios:
         print(f"Error: El escenario '{scenario_name}' no se encuentra definido en config_paths.py.")
         print(f"Escenarios disponibles: {list(config_paths.rutas_escenarios.keys())}")
-        return
+        return resumen
 
     paths = {**config_paths.rutas_comunes, **config_paths.rutas_escenarios[scenario_name]}
     output_path = config_paths.rutas_outputs[scenario_name]
-    
-    os.makedirs(os.path.join(output_path, 'Fase1_Suministro_Siembra_Logs', 'Analisis_KPIs_Fase1'), exist_ok=True)
-    os.makedirs(os.path.join(output_path, 'Fase2_VRP_Logs', 'Analisis_Rutas_Detalladas'), exist_ok=True)
-    os.makedirs(os.path.join(output_path, 'Animaciones'), exist_ok=True)
-
-    params = {}
-    params.update(data_loader.cargar_parametros_generales(paths["Parametros Generales"]))
-    params['S_especies'], params['Dens_s'], params['Area_s'], params['Trat_s'] = data_loader.cargar_datos_especies(paths['Datos Especies'])
-    params['P_proveedores'], disp_sp = data_loader.cargar_disponibilidad_y_proveedores(paths['Disponibilidad Especies'])
-    params['Disponibilidad_{sp}'] = disp_sp
-    params['C_sp'] = data_loader.cargar_costos_unitarios(paths['Costos Unitarios'], params['P_proveedores'])
-    params['G_poligonos'], params['Ha_g_total'] = data_loader.cargar_areas_poligonos(paths['Areas Poligonos'])
-    params['K_vehiculos_nombres'], params['cap_k_vehiculos_vrp'] = data_loader.cargar_datos_vehiculos_vrp(paths['Vehiculos VRP'])
-    
-    # Establecer valores por defecto para parámetros clave si no están en el archivo
-    params.setdefault('DesperPenalty_s', 1.0)
-    params.setdefault('PC_U', params.get('Costo_Unitario_Plantacion_PC', 1.0))
-    params.setdefault('StockMinEspecie_s', params.get('Stock_Minimo_Deseado_Por_Especie', 10))
+    telemetria = Telemetria(os.path.join(output_path, 'telemetria.jsonl'), contexto={'escenario': scenario_name},
+                            etapa_perfil=perfil_etapa, rastrear_asignaciones=memoria_python)
+    with telemetria.etapa('carga') as etapa:
+        os.makedirs(os.path.join(output_path, 'Fase1_Suministro_Siembra_Logs', 'Analisis_KPIs_Fase1'), exist_ok=True)
+        os.makedirs(os.path.join(output_path, 'Fase2_VRP_Logs', 'Analisis_Rutas_Detalladas'), exist_ok=True)
+        os.makedirs(os.path.join(output_path, 'Animaciones'), exist_ok=True)
+
+        params = ScenarioData.desde_params(data_loader.cargar_params_escenario(
+            paths, directorio_cache=config_paths.RUTA_CACHE_DATOS if usar_cache_datos else None
+        ))
+
+        print("Datos cargados exitosamente.")
+    resumen['Tiempo_Carga_s'] = etapa['tiempo_s']
 
-    print("Datos cargados exitosamente.")
-    
     # --- PASO 2: Resolver el Modelo de Planificación (Fase 1) ---
-    fase1_results = model_fase1.solve_supply_model_gurobi(params, scenario_name)
-    
+    with telemetria.etapa('fase1') as etapa:
+        resultados_previos = data_loader.cargar_plan_fase1(plan_previo_fase1) if plan_previo_fase1 else None
+        if ventana_fase1 and ventana_fase1 < params['T_dias_planificacion']:
+            fase1_results = model_fase1.solve_supply_model_rolling(
+                params, scenario_name, ventana=ventana_fase1, traslape=traslape_fase1, constructor=constructor_fase1,
+                opciones_solver=opciones_solver_fase1, resultados_previos=resultados_previos
+            )
+        else:
+            fase1_results = model_fase1.solve_supply_model_gurobi(
+                params, scenario_name, constructor=constructor_fase1, opciones_solver=opciones_solver_fase1,
+                resultados_previos=resultados_previos
+            )
+    resumen['Tiempo_Fase1_s'] = etapa['tiempo_s']
     if not fase1_results:
         print("El modelo de Fase 1 no encontró solución. Finalizando proceso.")
-        return
+        resumen['Estado'] = 'Fase 1 sin solución'
+        telemetria.registrar('resumen', resumen=resumen)
+        return resumen
+    # Construcción y resolución por separado, con tamaño del modelo, nodos, iteraciones y gap.
+    telemetria.registrar('solver_fase1', **{**fase1_results.get('metricas_modelo', {}),
+                                            **fase1_results.get('estadisticas_solver', {})})
+    resumen['Costo_Fase1'] = _costo_plan_fase1(fase1_results, params)
 
-    # --- PASO 3: Resolver el Modelo de Ruteo (Fase 2) para cada día ---
-    all_vrp_results = {}
-    T = list(range(1, params['T_dias_planificacion'] + 1))
+    # Se guarda el plan completo (con sus tiempos) para poder reutilizarlo como arranque en caliente.
+    with open(os.path.join(output_path, 'Fase1_Suministro_Siembra_Logs', 'fase1_resultados.pkl'), 'wb') as f:
+        pickle.dump(fase1_results, f)
 
-    matriz_tiempos_valores, vrp_nodos_ordenados = data_loader.cargar_matriz_tiempos_vrp(paths["Matriz de Distancia VRP"])
-    matriz_tiempos_dict = {}
-    for i, nodo_i in enumerate(vrp_nodos_ordenados):
-        for j, nodo_j in enumerate(vrp_nodos_ordenados):
-            matriz_tiempos_dict[nodo_i, nodo_j] = matriz_tiempos_valores[i][j]
+    # --- PASO 3: Resolver el Modelo de Ruteo (Fase 2) para cada día, en pipeline ---
+    # Una etapa escritora (hilo con cola acotada) escribe las salidas de Fase 1 mientras
+    # arrancan los VRP y luego procesa cada día en cuanto se resuelve: arma su tabla de
+    # rutas, la guarda en el almacén columnar y la pasa al renderizador de animaciones.
+    with telemetria.etapa('vrp') as etapa:
+        T = list(range(1, params['T_dias_planificacion'] + 1))
 
-    vehiculos_list = [{'id': f'K{i+1}', 'capacidad': cap} for i, cap in enumerate(params['cap_k_vehiculos_vrp'])]
-            
-    for t in T:
-        demandas_del_dia = defaultdict(float)
-        for (s, g, t_res), val in fase1_results.get('y', {}).items():
-            if t_res == t:
-                demandas_del_dia[g] += val
-        
-        if not demandas_del_dia:
-            print(f"Día {t}: Sin actividad de plantación, se omite el VRP.")
-            all_vrp_results[t] = None
-            continue
+        ruta_matriz = paths.get("Matriz de Distancia VRP")
+        if ruta_matriz and os.path.exists(ruta_matriz):
+            matriz_tiempos = MatrizDistancias.desde_csv(ruta_matriz, config_paths.RUTA_CACHE_MATRICES)
+        else:
+            print("No hay archivo de matriz de distancias: se calculan los tiempos desde las coordenadas de los nodos.")
+            matriz_tiempos = MatrizDistancias.desde_coordenadas(
+                data_loader.cargar_coordenadas_nodos(paths["Coordenadas Nodos"]), config_paths.RUTA_CACHE_MATRICES,
+                velocidad=velocidad_coordenadas, metrica=metrica_coordenadas
+            )
 
-        resultado_vrp_dia = model_fase2.solve_vrp_analytically(
-            dia=t,
-            demandas_diarias=dict(demandas_del_dia),
-            matriz_tiempos=matriz_tiempos_dict,
-            vehiculos=vehiculos_list,
-            params=params
-        )
-        all_vrp_results[t] = resultado_vrp_dia
+        vehiculos_list = [{'id': f'K{i+1}', 'capacidad': cap} for i, cap in enumerate(params['cap_k_vehiculos_vrp'])]
 
-    # --- PASO 4: Generar Archivos de Salida para Comparación ---
-    generate_comparison_outputs(fase1_results, all_vrp_results, params, output_path)
+        if activos_comunes is None:
+            activos_comunes = {'coords_nodos': data_loader.cargar_coordenadas_nodos(paths["Coordenadas Nodos"]),
+                               'imagenes': None}
+        coords_nodos = activos_comunes['coords_nodos']
+        map_path = paths['Mapa']
+        truck_icon_path = paths['Icono Camion']
+        renderizador = None
+        if formato_animacion == 'gif' and coords_nodos:
+            renderizador = animation_generator.RenderizadorAnimaciones(
+                coords_nodos, map_path, truck_icon_path, os.path.join(output_path, 'Animaciones'),
+                workers=workers_animacion, activos=activos_comunes.get('imagenes')
+            )
 
-    # --- PASO 5: Generar Animaciones ---
-    print("\n--- Iniciando generación de animaciones ---")
-    ruta_resumen_vrp = os.path.join(output_path, 'Fase2_VRP_Logs', 'vrp_rutas_resumen.csv')
-    coords_nodos = data_loader.cargar_coordenadas_nodos(paths["Coordenadas Nodos"])
-    map_path = paths['Mapa']
-    truck_icon_path = paths['Icono Camion']
-    
-    if os.path.exists(ruta_resumen_vrp) and coords_nodos:
-        df_rutas = pd.read_csv(ruta_resumen_vrp)
-        if not df_rutas.empty:
-            for dia_animacion in sorted(df_rutas['Día'].unique()):
-                rutas_para_gif = df_rutas[df_rutas['Día'] == dia_animacion].to_dict('records')
-                animation_generator.create_daily_route_gif(
-                    dia_animacion, rutas_para_gif, coords_nodos,
-                    map_path, truck_icon_path, os.path.join(output_path, 'Animaciones')
-                )
+        almacen = None
+        if almacen_resultados:
+            almacen = AlmacenResultados(config_paths.RUTA_ALMACEN_RESULTADOS, scenario_name)
+            almacen.limpiar()
+
+        tablas_fase1, tablas_rutas, rutas_por_dia = {}, {}, {}
+
+        def _escribir_fase1():
+            print("\n--- Iniciando generación de archivos CSV de salida para comparación ---")
+            tablas_fase1.update(_escribir_salidas_fase1(fase1_results, params, output_path))
+            if almacen is not None:
+                for dia, df_dia in _tabla_plan_fase1(tablas_fase1).groupby('Dia', sort=True):
+                    almacen.agregar('fase1', dia, df_dia)
+
+        def _procesar_dia_vrp(dia, resultado_vrp_dia):
+            df_dia = _tabla_rutas_vrp({dia: resultado_vrp_dia}, tablas_fase1['y'], params, matriz_tiempos)
+            tablas_rutas[dia] = df_dia
+            if almacen is not None:
+                almacen.agregar('vrp', dia, df_dia)
+            if df_dia.empty or not coords_nodos:
+                return
+            if renderizador is not None:
+                renderizador.agregar(dia, df_dia.to_dict('records'))
+            elif formato_animacion in ('json', 'svg'):
+                rutas_por_dia[dia] = df_dia.to_dict('records')
+
+        escritor = EtapaAsincrona('escritor_resultados', max_pendientes=MAX_DIAS_EN_COLA)
+        escritor.enviar(_escribir_fase1)
+        cache_vrp = CacheVRP(config_paths.RUTA_CACHE_VRP) if usar_cache_vrp else None
+        try:
+            all_vrp_results = resolver_vrp_todos_los_dias(
+                T, fase1_results, matriz_tiempos, vehiculos_list, params,
+                workers=workers_vrp, hilos_solver=hilos_solver, cache=cache_vrp,
+                motor=motor_vrp, warm_start=warm_start_vrp, limite_tiempo_vrp_s=limite_tiempo_vrp_s,
+                vecinos_k=vecinos_vrp, romper_simetria=romper_simetria_vrp, cortes_perezosos=cortes_perezosos_vrp,
+                al_resolver_dia=lambda dia, resultado: escritor.enviar(_procesar_dia_vrp, dia, resultado),
+                telemetria=telemetria
+            )
+        finally:
+            escritor.cerrar()
+    resumen['Tiempo_VRP_s'] = etapa['tiempo_s']
+    resumen['Dias_con_VRP'] = sum(1 for r in all_vrp_results.values() if r)
+    resumen['Tiempo_Rutas_Total_min'] = sum(r.get('tiempo_total', 0) for r in all_vrp_results.values() if r)
+    if cortes_perezosos_vrp:
+        resumen['Cortes_VRP'] = sum(r.get('cortes', {}).get('cortes_agregados', 0) for r in all_vrp_results.values() if r)
+
+    # --- PASO 4: Consolidar las Rutas de Todos los Días ---
+    # Las salidas de Fase 1 ya se escribieron durante el paso 3.
+    with telemetria.etapa('salidas') as etapa:
+        tablas_no_vacias = [tablas_rutas[t] for t in sorted(tablas_rutas) if not tablas_rutas[t].empty]
+        df_rutas = pd.concat(tablas_no_vacias, ignore_index=True) if tablas_no_vacias else pd.DataFrame(columns=COLUMNAS_RUTAS)
+        _escribir_rutas_vrp(df_rutas, output_path)
+    resumen['Tiempo_Salidas_s'] = etapa['tiempo_s']
+
+    # --- PASO 5: Completar Animaciones ---
+    # Los GIF se fueron renderizando durante el paso 3; aquí se esperan los pendientes.
+    with telemetria.etapa('animaciones') as etapa:
+        print("\n--- Completando generación de animaciones ---")
+        if renderizador is not None:
+            animaciones = renderizador.cerrar()
+            if animaciones:
+                df_tiempos = pd.DataFrame([{'Día': dia, **info} for dia, info in animaciones.items()])
+                df_tiempos['Reutiliza_Dia'] = df_tiempos['Reutiliza_Dia'].astype('Int64')
+                df_tiempos.to_csv(os.path.join(output_path, 'Animaciones', 'tiempos_render.csv'), index=False)
+                resumen['GIF_Reutilizados'] = int((df_tiempos['Estado'] == 'Reutilizado').sum())
+                resumen['GIF_Fallidos'] = int((df_tiempos['Estado'] == 'Fallido').sum())
+                for dia, info in animaciones.items():
+                    telemetria.registrar('animacion_dia', dia=dia, tiempo_s=info['Tiempo_s'],
+                                         reutiliza_dia=info['Reutiliza_Dia'], estado=info['Estado'])
+        elif rutas_por_dia:
+            ruta_replay = os.path.join(output_path, 'Animaciones', f'replay.{formato_animacion}')
+            imagenes = activos_comunes.get('imagenes')
+            animation_generator.exportar_replay_vectorial(
+                rutas_por_dia, coords_nodos, ruta_replay, matriz_tiempos=matriz_tiempos,
+                tiempo_servicio=params.get('Tiempo_Descarga_LD_min', 0), escenario=scenario_name,
+                tamano_mapa=imagenes[0].size if imagenes else None,
+                map_href=os.path.relpath(map_path, os.path.dirname(ruta_replay)) if imagenes else None
+            )
+    resumen['Tiempo_Animaciones_s'] = etapa['tiempo_s']
     
     print("\n--- PROCESO DE OPTIMIZACIÓN COMPLETADO ---")
+    resumen['Estado'] = 'Completado'
+    resumen['Memoria_Pico_MB'] = memoria_pico_mb()
+    telemetria.registrar('resumen', resumen=resumen)
+    print(f"Telemetría de la corrida guardada en: {telemetria.ruta_jsonl}")
+    return resumen
+
+
+def _ejecutar_escenario_lote(escenario, opciones, activos_comunes):
+    """Corre un escenario dentro del pool del lote y mide su tiempo total."""
+    inicio = time.perf_counter()
+    try:
+        resumen = run_complete_optimization(escenario, activos_comunes=activos_comunes, **opciones)
+    except Exception as e:
+        print(f"Error inesperado en el escenario '{escenario}': {e}")
+        resumen = {'Escenario': escenario, 'Estado': f'Error: {e}'}
+    resumen['Tiempo_Total_s'] = time.perf_counter() - inicio
+    return resumen
+
+
+def _repartir_procesos(cuota, workers_vrp, workers_animacion):
+    """
+    Reparte la cuota de procesos de un escenario entre el pool de VRP y el de animaciones,
+    que corren a la vez durante el pipeline. Con un solo worker no se crea pool (el VRP se
+    resuelve en el proceso del escenario y las animaciones en su etapa escritora), así que
+    el otro puede usar toda la cuota; si ambos piden más de lo que cabe, las animaciones
+    se quedan con a lo sumo la mitad.
+    """
+    workers_vrp = max(1, min(workers_vrp, cuota))
+    workers_animacion = max(1, min(workers_animacion, cuota))
+    if workers_vrp == 1 or workers_animacion == 1 or workers_vrp + workers_animacion <= cuota:
+        return workers_vrp, workers_animacion
+    workers_animacion = max(1, min(workers_animacion, cuota // 2))
+    if workers_animacion == 1:
+        return workers_vrp, 1
+    return max(1, min(workers_vrp, cuota - workers_animacion)), workers_animacion
+
+
+def run_batch_optimization(escenarios, max_procesos=None, **opciones):
+    """
+    Resuelve varios escenarios en un pool de procesos. Los activos comunes (coordenadas,
+    mapa e ícono) se cargan una sola vez y se comparten con cada escenario.
+
+    max_procesos es el límite global de procesos: se reparte entre escenarios
+    simultáneos y, dentro de cada uno, entre los workers de VRP y de animaciones (ver
+    _repartir_procesos). Al final se escribe una tabla consolidada de tiempos y costos
+    en outputs/resumen_lote.csv.
+    """
+    max_procesos = max_procesos or os.cpu_count() or 1
+    escenarios_concurrentes = max(1, min(len(escenarios), max_procesos))
+    opciones['workers_vrp'], opciones['workers_animacion'] = _repartir_procesos(
+        max(1, max_procesos // escenarios_concurrentes), opciones.get('workers_vrp', 1),
+        opciones.get('workers_animacion', 1)
+    )
+    print(f"--- LOTE: {len(escenarios)} escenarios, {escenarios_concurrentes} simultáneos, "
+          f"{opciones['workers_vrp']} worker(s) de VRP y {opciones['workers_animacion']} de animación "
+          f"por escenario ---")
+
+    activos_comunes = cargar_activos_comunes()
+    resumenes = {}
+    # 'spawn' para que cada escenario arranque limpio, sin heredar el estado de OR-Tools/PIL ni
+    # candados del proceso padre.
+    with ProcessPoolExecutor(max_workers=escenarios_concurrentes, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futuros = {pool.submit(_ejecutar_escenario_lote, escenario, opciones, activos_comunes): escenario
+                   for escenario in escenarios}
+        for futuro in as_completed(futuros):
+            resumenes[futuros[futuro]] = futuro.result()
+
+    df_resumen = pd.DataFrame([resumenes[escenario] for escenario in escenarios])
+    os.makedirs(config_paths.BASE_OUTPUT_PATH, exist_ok=True)
+    ruta_resumen = os.path.join(config_paths.BASE_OUTPUT_PATH, 'resumen_lote.csv')
+    df_resumen.to_csv(ruta_resumen, index=False)
+    print("\n" + "="*50)
+    print("  RESUMEN DEL LOTE")
+    print("="*50)
+    print(df_resumen.to_string(index=False))
+    print(f"\nResumen guardado en: {ruta_resumen}")
+    return df_resumen
 
 
 if __name__ == '__main__':
     # --- Configuración de argumentos (sin cambios) ---
-    parser = argparse.ArgumentParser(description="Ejecutar el modelo de optimización para un escenario específico.")
+    parser = argparse.ArgumentParser(description="Ejecutar el modelo de optimización para uno o varios escenarios.")
     escenarios_disponibles = list(config_paths.rutas_escenarios.keys())
     parser.add_argument(
-        "escenario",
-        help="El nombre del escenario a resolver.",
-        choices=escenarios_disponibles,
+        "escenarios",
+        nargs='+',
+        help="Escenario(s) a resolver, o 'all' para todos los de config_paths. "
+             "Con más de uno se ejecutan en lote.",
+        choices=escenarios_disponibles + ['all'],
         metavar="ESCENARIO"
     )
+    parser.add_argument(
+        "--max-procesos",
+        type=int,
+        default=None,
+        help="Límite global de procesos en modo lote (por defecto, todos los núcleos)."
+    )
+    parser.add_argument(
+        "--workers-vrp",
+        type=int,
+        default=1,
+        help="Número de procesos para resolver los VRP diarios en paralelo (0 = todos los núcleos)."
+    )
+    parser.add_argument(
+        "--hilos-solver",
+        type=int,
+        default=1,
+        help="Hilos máximos por solver de VRP en cada proceso."
+    )
+    parser.add_argument(
+        "--sin-cache-vrp",
+        action="store_true",
+        help="Desactiva la caché de soluciones VRP y resuelve cada día desde cero."
+    )
+    parser.add_argument(
+        "--sin-cache-datos",
+        action="store_true",
+        help="Vuelve a parsear los CSV del escenario aunque exista una caché de parámetros válida."
+    )
+    parser.add_argument(
+        "--motor-vrp",
+        choices=list(MOTORES_VRP.keys()),
+        default='milp',
+        help="Motor de ruteo para la Fase 2: MILP exacto (tres índices, o dos índices para flotas "
+             "homogéneas), heurística Clarke-Wright + búsqueda local o solver de ruteo de OR-Tools con GLS."
+    )
+    parser.add_argument(
+        "--warm-start-vrp",
+        action="store_true",
+        help="Con los motores MILP, usar la solución heurística como arranque en caliente."
+    )
+    parser.add_argument(
+        "--simetria-vrp",
+        action="store_true",
+        help="Con el motor 'milp', agregar restricciones de ruptura de simetría entre vehículos idénticos."
+    )
+    parser.add_argument(
+        "--cortes-perezosos-vrp",
+        action="store_true",
+        help="Con el motor 'milp', reemplazar MTZ por cortes de subtours agregados sólo cuando se violan."
+    )
+    parser.add_argument(
+        "--limite-tiempo-vrp",
+        type=float,
+        default=5,
+        help="Segundos por día para la búsqueda del motor 'routing'."
+    )
+    parser.add_argument(
+        "--vecinos-vrp",
+        type=int,
+        default=None,
+        help="Restringe los arcos de los motores de Fase 2 a los K vecinos más cercanos."
+    )
+    parser.add_argument(
+        "--velocidad-coordenadas",
+        type=float,
+        default=1.0,
+        help="Sin archivo de matriz: unidades de distancia por minuto para calcular tiempos desde coordenadas."
+    )
+    parser.add_argument(
+        "--metrica-coordenadas",
+        choices=['euclidiana', 'haversine'],
+        default='euclidiana',
+        help="Sin archivo de matriz: métrica de distancia entre coordenadas (haversine en km sobre lon/lat)."
+    )
+    parser.add_argument(
+        "--constructor-fase1",
+        choices=list(model_fase1.CONSTRUCTORES_FASE1.keys()),
+        default='arreglos',
+        help="Cómo se arma el modelo de Fase 1: en bloque con arreglos (rápido) o con expresiones de Python."
+    )
+    parser.add_argument(
+        "--ventana-fase1",
+        type=int,
+        default=0,
+        help="Resolver la Fase 1 por horizonte rodante con ventanas de N días (0 = modelo completo)."
+    )
+    parser.add_argument(
+        "--traslape-fase1",
+        type=int,
+        default=15,
+        help="Días de traslape entre ventanas consecutivas del horizonte rodante."
+    )
+    parser.add_argument(
+        "--solver-fase1",
+        choices=list(model_fase1.SOLVERS_FASE1.keys()),
+        default='CBC',
+        help="Backend de OR-Tools para el modelo de Fase 1."
+    )
+    parser.add_argument(
+        "--hilos-fase1",
+        type=int,
+        default=None,
+        help="Hilos del solver de Fase 1 (0 = todos los núcleos; por defecto, el valor del solver)."
+    )
+    parser.add_argument(
+        "--gap-fase1",
+        type=float,
+        default=None,
+        help="Gap MIP relativo aceptado en la Fase 1 (ej. 0.01 = 1%%)."
+    )
+    parser.add_argument(
+        "--limite-tiempo-fase1",
+        type=float,
+        default=None,
+        help="Límite de tiempo en segundos para el solver de Fase 1."
+    )
+    parser.add_argument(
+        "--log-solver-fase1",
+        action="store_true",
+        help="Mostrar el log interno del solver de Fase 1."
+    )
+    parser.add_argument(
+        "--workers-animacion",
+        type=int,
+        default=1,
+        help="Procesos para renderizar los GIF diarios en paralelo (0 = todos los núcleos)."
+    )
+    parser.add_argument(
+        "--formato-animacion",
+        choices=['gif', 'json', 'svg'],
+        default='gif',
+        help="Un GIF por día, o un único replay vectorial (JSON o SVG animado) por escenario."
+    )
+    parser.add_argument(
+        "--almacen-resultados",
+        action="store_true",
+        help="Guardar el plan de Fase 1 y cada día de VRP en un almacén columnar (Arrow IPC, o columnas .npy "
+             "si pyarrow no está instalado) a medida que se resuelven."
+    )
+    parser.add_argument(
+        "--perfil-etapa",
+        choices=ETAPAS_TELEMETRIA,
+        default=None,
+        help="Perfilar una etapa con cProfile; el .prof queda junto a telemetria.jsonl."
+    )
+    parser.add_argument(
+        "--memoria-python",
+        action="store_true",
+        help="Medir también el pico de memoria Python de cada etapa con tracemalloc (más lento)."
+    )
+    parser.add_argument(
+        "--plan-previo",
+        default=None,
+        help="Plan de Fase 1 previo (fase1_resultados.pkl o fase1_plan_variables.csv) para arrancar en caliente "
+             "(también con --ventana-fase1). Requiere --solver-fase1 SCIP o CP-SAT: CBC ignora los hints."
+    )
     args = parser.parse_args()
+    workers_vrp = args.workers_vrp if args.workers_vrp > 0 else (os.cpu_count() or 1)
+    workers_animacion = args.workers_animacion if args.workers_animacion > 0 else (os.cpu_count() or 1)
+    opciones_solver_fase1 = {
+        'solver': args.solver_fase1,
+        'hilos': (os.cpu_count() or 1) if args.hilos_fase1 == 0 else args.hilos_fase1,
+        'gap_relativo': args.gap_fase1,
+        'limite_tiempo_s': args.limite_tiempo_fase1,
+        'log_solver': args.log_solver_fase1,
+    }
     
     # ---> 1. INICIAMOS EL CRONÓMETRO <---
     start_time = time.time()
     
-    # --- Ejecución principal del modelo (sin cambios) ---
-    run_complete_optimization(scenario_name=args.escenario)
+    # --- Ejecución principal del modelo ---
+    opciones = dict(workers_vrp=workers_vrp, hilos_solver=args.hilos_solver,
+                    usar_cache_vrp=not args.sin_cache_vrp, usar_cache_datos=not args.sin_cache_datos,
+                    motor_vrp=args.motor_vrp, warm_start_vrp=args.warm_start_vrp,
+                    romper_simetria_vrp=args.simetria_vrp, cortes_perezosos_vrp=args.cortes_perezosos_vrp,
+                    limite_tiempo_vrp_s=args.limite_tiempo_vrp, vecinos_vrp=args.vecinos_vrp,
+                    velocidad_coordenadas=args.velocidad_coordenadas, metrica_coordenadas=args.metrica_coordenadas,
+                    constructor_fase1=args.constructor_fase1,
+                    ventana_fase1=args.ventana_fase1, traslape_fase1=args.traslape_fase1,
+                    opciones_solver_fase1=opciones_solver_fase1, plan_previo_fase1=args.plan_previo,
+                    workers_animacion=workers_animacion, formato_animacion=args.formato_animacion,
+                    almacen_resultados=args.almacen_resultados, perfil_etapa=args.perfil_etapa,
+                    memoria_python=args.memoria_python)
+    escenarios = escenarios_disponibles if 'all' in args.escenarios else list(dict.fromkeys(args.escenarios))
+    if len(escenarios) > 1:
+        run_batch_optimization(escenarios, max_procesos=args.max_procesos, **opciones)
+    else:
+        run_complete_optimization(scenario_name=escenarios[0], **opciones)
     
     # ---> 2. DETENEMOS EL CRONÓMETRO Y CALCULAMOS LA DURACIÓN <---
     end_time = time.time()
@@ -209,15 +904,17 @@ if __name__ == '__main__':
     secs = duration_seconds % 60
     
     # ---> 3. MEDIMOS EL USO DE MEMORIA PICO <---
-    # Obtenemos el proceso actual del sistema operativo
-    process = psutil.Process(os.getpid())
-    # Pedimos la información de memoria en bytes y la convertimos a Megabytes (MB)
-    memory_mb = process.memory_info().rss / (1024 * 1024)
+    # Pico real de memoria residente (ru_maxrss) del proceso principal y del mayor de sus
+    # procesos hijos (workers de VRP, de animaciones o del lote), no la memoria al terminar.
+    memory_mb = memoria_pico_mb()
+    memory_hijos_mb = memoria_pico_mb(hijos=True)
     
     # ---> 4. IMPRIMIMOS EL RESUMEN DE RENDIMIENTO AL FINAL DE TODO <---
     print("\n" + "="*50)
     print("  MÉTRICAS DE RENDIMIENTO TOTAL")
     print("="*50)
     print(f"  Tiempo total de ejecución: {mins} minutos y {secs:.2f} segundos.")
-    print(f"  Uso de memoria pico: {memory_mb:.2f} MB.")
+    print(f"  Uso de memoria pico (proceso principal): {memory_mb:.2f} MB.")
+    if memory_hijos_mb:
+        print(f"  Uso de memoria pico (mayor proceso hijo): {memory_hijos_mb:.2f} MB.")
     print("="*50)
@@ -0,0 +1,158 @@
+# matriz_distancias.py
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+import data_loader
+
+
+class MatrizDistancias:
+    """
+    Matriz de tiempos del VRP respaldada por un archivo .npy abierto con memory-map.
+
+    Los nodos se direccionan por nombre mediante un índice nombre → posición. Cargar la
+    matriz es O(1) (sólo se mapea el archivo) y cada consulta de arco es indexación de
+    arreglo; las submatrices de un día leen sólo las filas y columnas de sus nodos.
+
+    Conserva la interfaz del diccionario {(nodo_i, nodo_j): tiempo} que usaban los
+    modelos de Fase 2 (get, [], in), de modo que el código existente sigue funcionando.
+    Al serializarse (p. ej. hacia los workers del VRP) sólo viaja la ruta del archivo.
+    """
+
+    def __init__(self, ruta_npy, nodos):
+        self.ruta_npy = ruta_npy
+        self.nodos = [str(n) for n in nodos]
+        self.indice = {n: i for i, n in enumerate(self.nodos)}
+        self.valores = np.load(ruta_npy, mmap_mode='r')
+
+    @classmethod
+    def desde_csv(cls, ruta_csv, directorio_binario, depot='18'):
+        """
+        Abre la versión binaria de la matriz CSV, convirtiéndola la primera vez. El binario
+        se identifica por ruta, tamaño y fecha de modificación del CSV: si el CSV cambia,
+        se vuelve a convertir.
+        """
+        estado = os.stat(ruta_csv)
+        firma = f"{os.path.abspath(ruta_csv)}|{estado.st_size}|{estado.st_mtime_ns}|{depot}"
+        base = os.path.join(directorio_binario, hashlib.sha256(firma.encode('utf-8')).hexdigest()[:32])
+        ruta_npy, ruta_nodos = f"{base}.npy", f"{base}.nodos.json"
+
+        if not (os.path.exists(ruta_npy) and os.path.exists(ruta_nodos)):
+            valores, nodos = data_loader.cargar_matriz_tiempos_vrp(ruta_csv, depot_node_name=depot)
+            _guardar_binario(valores, nodos, ruta_npy, ruta_nodos)
+            print(f"Matriz de distancias convertida a binario: {ruta_npy}")
+
+        with open(ruta_nodos, encoding='utf-8') as f:
+            nodos = json.load(f)
+        return cls(ruta_npy, nodos)
+
+    @classmethod
+    def desde_coordenadas(cls, coords_dict, directorio_binario, velocidad=1.0, metrica='euclidiana', depot='18'):
+        """
+        Genera la matriz de tiempos a partir de las coordenadas de los nodos (ver
+        data_loader.calcular_matriz_tiempos_desde_coordenadas) y la guarda como .npy. El
+        binario se identifica por las coordenadas, la velocidad y la métrica.
+        """
+        firma = json.dumps([sorted((str(n), list(map(float, xy))) for n, xy in coords_dict.items()),
+                            float(velocidad), metrica, depot])
+        base = os.path.join(directorio_binario, 'coords_' + hashlib.sha256(firma.encode('utf-8')).hexdigest()[:32])
+        ruta_npy, ruta_nodos = f"{base}.npy", f"{base}.nodos.json"
+
+        if not (os.path.exists(ruta_npy) and os.path.exists(ruta_nodos)):
+            valores, nodos = data_loader.calcular_matriz_tiempos_desde_coordenadas(
+                coords_dict, velocidad=velocidad, metrica=metrica, depot_node_name=depot
+            )
+            _guardar_binario(valores, nodos, ruta_npy, ruta_nodos)
+            print(f"Matriz de tiempos generada desde coordenadas ({metrica}, {len(nodos)} nodos): {ruta_npy}")
+
+        with open(ruta_nodos, encoding='utf-8') as f:
+            nodos = json.load(f)
+        return cls(ruta_npy, nodos)
+
+    def indices(self, nodos):
+        """Posiciones de los nodos en la matriz. Lanza KeyError si alguno no existe."""
+        return np.fromiter((self.indice[n] for n in nodos), dtype=np.intp, count=len(nodos))
+
+    def submatriz(self, nodos, por_defecto=1e6):
+        """
+        Tiempos entre los nodos dados, en ese orden, como arreglo k×k. Los nodos ausentes
+        de la matriz quedan con 'por_defecto', igual que matriz.get((i, j), 1e6).
+        """
+        posiciones = np.array([self.indice.get(n, -1) for n in nodos], dtype=np.intp)
+        presentes = posiciones >= 0
+        resultado = np.full((len(nodos), len(nodos)), por_defecto, dtype=np.float64)
+        filas = np.flatnonzero(presentes)
+        resultado[np.ix_(filas, filas)] = self.valores[np.ix_(posiciones[filas], posiciones[filas])]
+        return resultado
+
+    # --- Interfaz compatible con el diccionario {(i, j): tiempo} ---
+    def get(self, arco, por_defecto=None):
+        i, j = arco
+        if i not in self.indice or j not in self.indice:
+            return por_defecto
+        return float(self.valores[self.indice[i], self.indice[j]])
+
+    def __getitem__(self, arco):
+        valor = self.get(arco)
+        if valor is None:
+            raise KeyError(arco)
+        return valor
+
+    def __contains__(self, arco):
+        i, j = arco
+        return i in self.indice and j in self.indice
+
+    def __len__(self):
+        return len(self.nodos) ** 2
+
+    def __getstate__(self):
+        return {'ruta_npy': self.ruta_npy, 'nodos': self.nodos}
+
+    def __setstate__(self, estado):
+        self.__init__(**estado)
+
+
+def matriz_a_arreglo(matriz_tiempos, N):
+    """
+    Extrae la submatriz de tiempos para los nodos N (depot primero) como arreglo NumPy.
+    Con una MatrizDistancias se indexa el arreglo directamente; con un diccionario
+    {(i, j): tiempo} se consulta arco por arco.
+    """
+    if hasattr(matriz_tiempos, 'submatriz'):
+        tiempos = matriz_tiempos.submatriz(N)
+        np.fill_diagonal(tiempos, 0.0)
+        return tiempos
+    return np.array([[matriz_tiempos.get((i, j), 1e6) if i != j else 0.0 for j in N] for i in N], dtype=float)
+
+
+def mascara_vecinos(tiempos, k):
+    """
+    Arcos candidatos entre clientes según el índice de k vecinos más cercanos: el par
+    (a, b) se admite si b está entre los k más cercanos de a o viceversa. Los arcos con
+    el depósito (posición 0) siempre se admiten. Con k=None se admiten todos.
+    """
+    n = len(tiempos)
+    if not k or k >= n - 2:
+        return np.ones((n, n), dtype=bool)
+    mascara = np.zeros((n, n), dtype=bool)
+    vecinos = data_loader.construir_indice_vecinos(tiempos[1:, 1:], k) + 1
+    mascara[np.repeat(np.arange(1, n), vecinos.shape[1]), vecinos.ravel()] = True
+    mascara |= mascara.T
+    mascara[0, :] = mascara[:, 0] = True
+    return mascara
+
+
+def _guardar_binario(valores, nodos, ruta_npy, ruta_nodos):
+    """Escribe la matriz (.npy) y su lista de nodos (.json) de forma atómica."""
+    os.makedirs(os.path.dirname(ruta_npy), exist_ok=True)
+    # Primero el arreglo y luego los nodos, que marcan la conversión como completa.
+    sufijo = f".{os.getpid()}.tmp"
+    with open(ruta_npy + sufijo, 'wb') as f:
+        np.save(f, np.asarray(valores, dtype=np.float64))
+    os.replace(ruta_npy + sufijo, ruta_npy)
+    with open(ruta_nodos + sufijo, 'w', encoding='utf-8') as f:
+        json.dump(nodos, f)
+    os.replace(ruta_nodos + sufijo, ruta_nodos)
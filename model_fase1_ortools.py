@@ -1,27 +1,46 @@
 # model_fase1_ortools.py (Versión Completa, Robusta y Final)
 
+import time
+import os
+
+import numpy as np
+import psutil
 from ortools.linear_solver import pywraplp
+from ortools.linear_solver import linear_solver_pb2
 
-def solve_supply_model_gurobi(params, scenario_name):
-    
-    """
-    Versión final y completa del modelo de Fase 1. Incluye todas las
-    restricciones operativas y la solución al problema de estabilidad numérica.
+import data_loader
+from scenario_data import ScenarioData
+from resultados_fase1 import ResultadosFase1, valores_solucion
+
+
+def _pares_admisibles(params):
+    """Índice disperso de pares (especie, proveedor) comprables, precalculado en la carga si existe."""
+    if 'SP_admisibles' in params:
+        return params['SP_admisibles']
+    return data_loader.construir_pares_admisibles(
+        params['S_especies'], params['P_proveedores'], params['Disponibilidad_{sp}'], params['C_sp']
+    )
+
+
+def _construir_modelo_clasico(solver, params, T, inventario_inicial=None, ha_requeridas=None):
     """
-    solver = pywraplp.Solver.CreateSolver('CBC')
-    if not solver:
-        return None
+    Constructor original: declara cada variable con IntVar y cada restricción con
+    expresiones lineales de Python. Devuelve el diccionario de variables 'v'.
 
-    print("--- EJECUTANDO MODELO OPERACIONAL COMPLETO Y ROBUSTO ---")
+    inventario_inicial (por especie) y ha_requeridas (por polígono) permiten resolver
+    un subhorizonte que no empieza en el día 1; por defecto son 0 y Ha_g_total.
+    """
+    inventario_inicial = inventario_inicial or {}
+    ha_requeridas = ha_requeridas if ha_requeridas is not None else params['Ha_g_total']
     inf = solver.infinity()
-    
-    # --- 1. Extraer Conjuntos ---
-    T = list(range(1, params['T_dias_planificacion'] + 1))
-    S, P, G, depot = params['S_especies'], params['P_proveedores'], params['G_poligonos'], '18'
+    S, G = params['S_especies'], params['G_poligonos']
+    # Sólo se crean compras x[s,p,t] para pares disponibles y con costo finito.
+    SP = _pares_admisibles(params)
+    proveedores_de = {s: [p for (s2, p) in SP if s2 == s] for s in S}
 
     # --- 2. Declaración de TODAS las Variables ---
     v = {}
-    v['x'] = {(s, p, t): solver.IntVar(0, inf, f"x_{s}_{p}_{t}") for s in S for p in P for t in T}
+    v['x'] = {(s, p, t): solver.IntVar(0, inf, f"x_{s}_{p}_{t}") for (s, p) in SP for t in T}
     v['y'] = {(s, g, t): solver.IntVar(0, inf, f"y_{s}_{g}_{t}") for s in S for g in G for t in T}
     v['z1'] = {t: solver.IntVar(0, inf, f"z1_{t}") for t in T}
     v['z2'] = {(g, t): solver.IntVar(0, inf, f"z2_{g}_{t}") for g in G for t in T}
@@ -31,20 +50,21 @@ def solve_supply_model_gurobi(params, scenario_name):
     
     # Cumplimiento de Reforestación por Área
     for g in G:
-        solver.Add(sum(v['y'][s, g, t] / params['Dens_s'][s] for s in S for t in T) >= params['Ha_g_total'][g] - 0.001)
+        solver.Add(sum(v['y'][s, g, t] / params['Dens_s'][s] for s in S for t in T) >= ha_requeridas[g] - 0.001)
 
     # Balance de Inventario
     for s in S:
         for t in T:
-            compras_hoy = sum(v['x'][s, pr, t] for pr in P if params['Disponibilidad_{sp}'].get((s, pr), 0) == 1)
+            compras_hoy = sum(v['x'][s, pr, t] for pr in proveedores_de[s])
             plantas_hoy = sum(v['y'][s, g, t] for g in G)
-            inv_ayer = v['XI'][s, t - 1] if t > 1 else 0
+            inv_ayer = v['XI'][s, t - 1] if t > T[0] else inventario_inicial.get(s, 0)
             solver.Add(v['XI'][s, t] == inv_ayer + compras_hoy - plantas_hoy)
 
     # Resto de restricciones operativas
     for t in T:
         # Capacidad de vehículos
-        solver.Add(sum(v['x'][s, pr, t] for s in S for pr in P) <= v['z1'][t] * params['TruckCap_Compra_General'])
+        solver.Add(sum(v['x'][s, pr, t] for (s, pr) in SP) <= v['z1'][t] * params['TruckCap_Compra_General'],
+                   f"CapCompra_{t}")
         for g in G:
             solver.Add(sum(v['y'][s, g, t] for s in S) <= v['z2'][g, t] * params['TruckCap_P1Distrib'])
         
@@ -52,24 +72,379 @@ def solve_supply_model_gurobi(params, scenario_name):
         solver.Add(sum(params['Trat_s'][s] * v['y'][s, g, t] for s in S for g in G) + params['Tiempo_Carga_LC_min'] * v['z1'][t] + sum(params['Tiempo_Descarga_LD_min'] * v['z2'][g, t] for g in G) <= params['Jornada_Laboral_JL_min'])
         
         # Capacidad de Almacén
-        solver.Add(sum(v['XI'][s, t] * params['Area_s'][s] for s in S) <= params['Almacen_Capacidad_m2'])
+        solver.Add(sum(v['XI'][s, t] * params['Area_s'][s] for s in S) <= params['Almacen_Capacidad_m2'],
+                   f"Almacen_{t}")
         
         # Límite de Viajes Diarios
         solver.Add(v['z1'][t] <= params['Max_Viajes_Compra_Dia'])
 
     # --- 4. Función Objetivo: MINIMIZAR COSTO TOTAL (versión robusta) ---
-    # La clave está en el 'if' para evitar los costos infinitos que causaban la inestabilidad.
-    costo_total_adquisicion = sum(
-        v['x'][s, p, t] * params['C_sp'].get((s, p), 0)
-        for s in S for p in P for t in T
-        if params['Disponibilidad_{sp}'].get((s, p), 0) == 1
-    )
+    # El índice disperso ya excluye los costos infinitos que causaban la inestabilidad.
+    costo_total_adquisicion = sum(v['x'][s, p, t] * params['C_sp'][s, p] for (s, p) in SP for t in T)
     costo_total_plantacion = sum(v['y'][s, g, t] * params['PC_U'] for s,g,t in v['y'].keys())
     solver.Minimize(costo_total_adquisicion + costo_total_plantacion)
+    return v
+
+
+def _bloque_variables(n, costo=0.0):
+    """
+    n variables enteras no negativas con el mismo costo, serializadas como fragmento de
+    MPModelProto. Los campos repetidos se concatenan al parsear, así que repetir los bytes
+    de una variable n veces agrega las n de una vez, sin un add() por variable.
+    """
+    una = linear_solver_pb2.MPModelProto()
+    una.variable.add(lower_bound=0, upper_bound=float('inf'), is_integer=True, objective_coefficient=costo)
+    return una.SerializeToString() * n
+
+
+def _construir_modelo_arreglos(solver, params, T, inventario_inicial=None, ha_requeridas=None):
+    """
+    Constructor rápido: arma el mismo modelo que _construir_modelo_clasico directamente
+    como MPModelProto. Cada familia de variables es un bloque de índices contiguos
+    (arreglos NumPy con forma SP×T, S×G×T, ...), y cada fila se llena con arreglos de
+    índices y coeficientes en bloque, sin expresiones lineales de Python. El proto se
+    carga de una sola vez en el solver.
+
+    Las variables se agregan por bloques (ver _bloque_variables) y no llevan nombre:
+    el resto del código las ubica por índice a través de 'v'.
+
+    Las filas de capacidad de compra y de almacén se nombran CapCompra_<t> y Almacen_<t>
+    (igual que en el constructor clásico) para poder modificarlas después de construir.
+    """
+    inventario_inicial = inventario_inicial or {}
+    ha_requeridas = ha_requeridas if ha_requeridas is not None else params['Ha_g_total']
+    inf = solver.infinity()
+    S, G = params['S_especies'], params['G_poligonos']
+    SP = _pares_admisibles(params)
+    nS, nSP, nG, nT = len(S), len(SP), len(G), len(T)
+
+    # --- Bloques de índices por familia de variables (mismo orden que el constructor clásico) ---
+    # Las compras sólo existen para los pares admisibles: bloque nSP×T en lugar de S×P×T.
+    inicio = 0
+    idx_x = np.arange(inicio, inicio + nSP * nT).reshape(nSP, nT); inicio += idx_x.size
+    idx_y = np.arange(inicio, inicio + nS * nG * nT).reshape(nS, nG, nT); inicio += idx_y.size
+    idx_z1 = np.arange(inicio, inicio + nT); inicio += idx_z1.size
+    idx_z2 = np.arange(inicio, inicio + nG * nT).reshape(nG, nT); inicio += idx_z2.size
+    idx_XI = np.arange(inicio, inicio + nS * nT).reshape(nS, nT); inicio += idx_XI.size
+
+    # --- Parámetros como arreglos (ScenarioData ya los trae en el orden de sus vocabularios) ---
+    if isinstance(params, ScenarioData):
+        especie_de_par = params.pares_admisibles[0]
+        costo_sp = params.costo_sp[params.pares_admisibles]
+        dens, trat, area = params.dens_s, params.trat_s, params.area_s
+    else:
+        especie_de_par = np.array([S.index(s) for (s, _) in SP], dtype=int)
+        costo_sp = np.array([params['C_sp'][s, p] for (s, p) in SP], dtype=float)
+        dens = np.array([params['Dens_s'][s] for s in S], dtype=float)
+        trat = np.array([params['Trat_s'][s] for s in S], dtype=float)
+        area = np.array([params['Area_s'][s] for s in S], dtype=float)
+
+    modelo = linear_solver_pb2.MPModelProto()
+
+    # --- Variables: un bloque por familia, en el orden de los índices de arriba ---
+    # Las compras cambian de costo por par, así que su bloque se arma par por par (nT cada uno).
+    modelo.MergeFromString(b''.join(
+        [_bloque_variables(nT, c) for c in costo_sp.tolist()]
+        + [_bloque_variables(nS * nG * nT, params['PC_U']), _bloque_variables(nT),
+           _bloque_variables(nG * nT), _bloque_variables(nS * nT)]
+    ))
+
+    def _fila(indices, coeficientes, lb, ub, nombre=''):
+        fila = modelo.constraint.add(lower_bound=lb, upper_bound=ub, name=nombre)
+        fila.var_index.extend(np.asarray(indices).ravel().tolist())
+        fila.coefficient.extend(np.broadcast_to(coeficientes, np.shape(indices)).ravel().tolist())
+
+    # --- Cumplimiento de Reforestación por Área ---
+    inv_dens = np.broadcast_to((1.0 / dens)[:, None], (nS, nT))
+    for gi, g in enumerate(G):
+        _fila(idx_y[:, gi, :], inv_dens, ha_requeridas[g] - 0.001, inf)
+
+    # --- Balance de Inventario: XI[s,t] - XI[s,t-1] - compras + plantas == 0 ---
+    # (el primer día del horizonte parte del inventario inicial: XI - compras + plantas == inv0)
+    for si, s in enumerate(S):
+        pares_especie = np.flatnonzero(especie_de_par == si)
+        for ti in range(nT):
+            indices = [idx_XI[si, ti]]
+            coeficientes = [1.0]
+            if ti > 0:
+                indices.append(idx_XI[si, ti - 1]); coeficientes.append(-1.0)
+            indices = np.concatenate([indices, idx_x[pares_especie, ti], idx_y[si, :, ti]])
+            coeficientes = np.concatenate([coeficientes, -np.ones(pares_especie.size), np.ones(nG)])
+            lado_derecho = float(inventario_inicial.get(s, 0)) if ti == 0 else 0.0
+            _fila(indices, coeficientes, lado_derecho, lado_derecho)
+
+    # --- Restricciones diarias ---
+    for ti in range(nT):
+        # Capacidad de vehículos
+        _fila(np.append(idx_x[:, ti], idx_z1[ti]),
+              np.append(np.ones(nSP), -params['TruckCap_Compra_General']), -inf, 0.0, f"CapCompra_{T[ti]}")
+        for gi in range(nG):
+            _fila(np.append(idx_y[:, gi, ti], idx_z2[gi, ti]),
+                  np.append(np.ones(nS), -params['TruckCap_P1Distrib']), -inf, 0.0)
+
+        # Jornada Laboral
+        _fila(np.concatenate([idx_y[:, :, ti].ravel(), [idx_z1[ti]], idx_z2[:, ti]]),
+              np.concatenate([np.repeat(trat, nG), [params['Tiempo_Carga_LC_min']],
+                              np.full(nG, params['Tiempo_Descarga_LD_min'], dtype=float)]),
+              -inf, params['Jornada_Laboral_JL_min'])
+
+        # Capacidad de Almacén
+        _fila(idx_XI[:, ti], area, -inf, params['Almacen_Capacidad_m2'], f"Almacen_{T[ti]}")
+
+        # Límite de Viajes Diarios
+        _fila([idx_z1[ti]], [1.0], -inf, params['Max_Viajes_Compra_Dia'])
+
+    error = solver.LoadModelFromProtoKeepNames(modelo)
+    if error:
+        raise RuntimeError(f"No se pudo cargar el modelo de Fase 1 en el solver: {error}")
+
+    # --- Reconstruir los diccionarios de variables que espera el resto del código ---
+    variables = solver.variables()
+    v = {}
+    v['x'] = {(s, p, t): variables[idx_x[i, k]] for i, (s, p) in enumerate(SP) for k, t in enumerate(T)}
+    v['y'] = {(s, g, t): variables[idx_y[i, j, k]] for i, s in enumerate(S) for j, g in enumerate(G) for k, t in enumerate(T)}
+    v['z1'] = {t: variables[idx_z1[k]] for k, t in enumerate(T)}
+    v['z2'] = {(g, t): variables[idx_z2[j, k]] for j, g in enumerate(G) for k, t in enumerate(T)}
+    v['XI'] = {(s, t): variables[idx_XI[i, k]] for i, s in enumerate(S) for k, t in enumerate(T)}
+    return v
+
+
+# Constructores disponibles para el modelo de Fase 1; ambos generan el mismo modelo.
+CONSTRUCTORES_FASE1 = {
+    'clasico': _construir_modelo_clasico,
+    'arreglos': _construir_modelo_arreglos,
+}
+
+# Backends de OR-Tools aceptados para la Fase 1 (el modelo es totalmente entero, por lo que
+# CP-SAT también aplica). Clave: nombre expuesto al usuario; valor: identificador de OR-Tools.
+SOLVERS_FASE1 = {
+    'CBC': 'CBC',
+    'SCIP': 'SCIP',
+    'CP-SAT': 'CP_SAT',
+}
+
+NOMBRES_ESTADO = {
+    pywraplp.Solver.OPTIMAL: 'OPTIMAL',
+    pywraplp.Solver.FEASIBLE: 'FEASIBLE',
+    pywraplp.Solver.INFEASIBLE: 'INFEASIBLE',
+    pywraplp.Solver.UNBOUNDED: 'UNBOUNDED',
+    pywraplp.Solver.ABNORMAL: 'ABNORMAL',
+    pywraplp.Solver.MODEL_INVALID: 'MODEL_INVALID',
+    pywraplp.Solver.NOT_SOLVED: 'NOT_SOLVED',
+}
+# Estados con solución, del mejor al peor (para resumir varias resoluciones).
+ORDEN_ESTADOS = ('OPTIMAL', 'FEASIBLE')
+
+
+def crear_solver(opciones_solver):
+    """
+    Crea el solver de Fase 1 según opciones_solver:
+    'solver' (clave de SOLVERS_FASE1), 'hilos', 'limite_tiempo_s' y 'log_solver'.
+    """
+    nombre = opciones_solver.get('solver', 'CBC')
+    solver = pywraplp.Solver.CreateSolver(SOLVERS_FASE1[nombre])
+    if not solver:
+        print(f"Error: No se pudo crear el solver {nombre}.")
+        return None
+    if opciones_solver.get('hilos') and not solver.SetNumThreads(opciones_solver['hilos']):
+        print(f"Advertencia: el solver {nombre} no acepta la configuración de {opciones_solver['hilos']} hilos.")
+    if opciones_solver.get('limite_tiempo_s'):
+        solver.SetTimeLimit(int(opciones_solver['limite_tiempo_s'] * 1000))
+    if opciones_solver.get('log_solver'):
+        solver.EnableOutput()
+    return solver
+
+
+def parametros_resolucion(opciones_solver):
+    """Parámetros de la llamada a Solve(); por ahora, la tolerancia relativa de gap MIP."""
+    parametros = pywraplp.MPSolverParameters()
+    if opciones_solver.get('gap_relativo') is not None:
+        parametros.SetDoubleParam(pywraplp.MPSolverParameters.RELATIVE_MIP_GAP, opciones_solver['gap_relativo'])
+    return parametros
+
+
+def _estadisticas_solver(solver, status, opciones_solver):
+    """Resume el resultado de la resolución: estado, objetivo, cota, gap, nodos, iteraciones y tiempo."""
+    estadisticas = {
+        'solver': opciones_solver.get('solver', 'CBC'),
+        'estado': NOMBRES_ESTADO.get(status, str(status)),
+        'num_variables': solver.NumVariables(),
+        'num_restricciones': solver.NumConstraints(),
+        'objetivo': None,
+        'cota': None,
+        'gap_relativo': None,
+        'nodos': solver.nodes(),
+        'iteraciones': solver.iterations(),
+        'tiempo_pared_s': solver.wall_time() / 1000,
+    }
+    if status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+        objetivo = solver.Objective().Value()
+        cota = solver.Objective().BestBound()
+        estadisticas.update({
+            'objetivo': objetivo,
+            'cota': cota,
+            'gap_relativo': abs(objetivo - cota) / max(abs(objetivo), 1e-9),
+        })
+    return estadisticas
+
+
+# Familias de variables que forman un plan de Fase 1 (mismas claves que 'results').
+FAMILIAS_VARIABLES = ('x', 'y', 'z1', 'z2', 'XI')
+
+
+# Backends que aprovechan los hints (SetHint); CBC en OR-Tools los ignora.
+SOLVERS_CON_HINTS = ('SCIP', 'CP-SAT')
+
+
+def usa_hints(opciones_solver):
+    """Indica si el backend elegido en opciones_solver aprovecha un arranque en caliente."""
+    return (opciones_solver or {}).get('solver', 'CBC') in SOLVERS_CON_HINTS
+
+
+def _arranque_caliente_posible(opciones_solver):
+    """Como usa_hints, pero advierte que el plan previo no se aplicará con un backend sin hints."""
+    if usa_hints(opciones_solver):
+        return True
+    print(f"Arranque en caliente: {opciones_solver.get('solver', 'CBC')} ignora los hints; el plan previo "
+          f"no se aplica (use --solver-fase1 {' o '.join(SOLVERS_CON_HINTS)} para aprovecharlo).")
+    return False
+
+
+def _aplicar_plan_previo(solver, v, resultados_previos):
+    """
+    Traduce un 'results' previo a hints del solver. Las variables ausentes del plan
+    previo (que sólo guarda valores > 0.1) se sugieren en 0; las que ya no existen en el
+    modelo actual se ignoran. Devuelve cuántas variables recibieron un valor no nulo.
+    """
+    variables, valores = [], []
+    con_valor = 0
+    for familia in FAMILIAS_VARIABLES:
+        previos = resultados_previos.get(familia, {})
+        for idx, var in v[familia].items():
+            valor = round(previos.get(idx, 0))
+            variables.append(var)
+            valores.append(float(valor))
+            con_valor += valor > 0
+    solver.SetHint(variables, valores)
+    print(f"Arranque en caliente: hint para {len(variables)} variables ({con_valor} con valor no nulo).")
+    return con_valor
+
+
+def _resumen_arranque_caliente(resultados_previos, tiempo_resolucion, variables_con_valor, opciones_solver):
+    """
+    Compara el tiempo de resolución contra el registrado en el plan previo. El ahorro
+    sólo se informa si se aplicaron hints y el plan previo se resolvió con el mismo
+    backend; si no, 'tiempo_ahorrado_s' queda en None.
+    """
+    estadisticas_previas = resultados_previos.get('estadisticas_solver') or {}
+    metricas_previas = resultados_previos.get('metricas_modelo') or {}
+    tiempo_previo = metricas_previas.get('tiempo_resolucion_s', estadisticas_previas.get('tiempo_pared_s'))
+    solver_actual = opciones_solver.get('solver', 'CBC')
+    solver_previo = metricas_previas.get('solver', estadisticas_previas.get('solver'))
+    hints_aplicados = usa_hints(opciones_solver)
+    resumen = {
+        'solver': solver_actual,
+        'solver_previo': solver_previo,
+        'hints_aplicados': hints_aplicados,
+        'variables_con_valor': variables_con_valor,
+        'tiempo_resolucion_previo_s': tiempo_previo,
+        'tiempo_ahorrado_s': None,
+    }
+    if not hints_aplicados:
+        return resumen
+    if tiempo_previo is None:
+        print("Arranque en caliente: el plan previo no registra su tiempo de resolución; no se puede medir el ahorro.")
+    elif solver_previo != solver_actual:
+        print(f"Arranque en caliente: el plan previo se resolvió con {solver_previo or 'un backend no registrado'} "
+              f"y éste con {solver_actual}; el ahorro sólo se mide con el mismo backend.")
+    else:
+        resumen['tiempo_ahorrado_s'] = tiempo_previo - tiempo_resolucion
+        print(f"Arranque en caliente: {tiempo_resolucion:.2f} s frente a {tiempo_previo:.2f} s del plan previo "
+              f"(ahorro de {resumen['tiempo_ahorrado_s']:.2f} s).")
+    return resumen
+
+
+def _estadisticas_ventanas(estadisticas_ventanas):
+    """
+    Estadísticas de una corrida por horizonte rodante a partir de las de cada ventana: el
+    peor estado, el mayor gap y tamaño, y nodos, iteraciones y tiempo sumados. El objetivo
+    y la cota de cada ventana incluyen días no comprometidos, por lo que no se agregan.
+    """
+    gaps = [e['gap_relativo'] for e in estadisticas_ventanas if e['gap_relativo'] is not None]
+    return {
+        'solver': estadisticas_ventanas[0]['solver'],
+        'estado': max((e['estado'] for e in estadisticas_ventanas), key=ORDEN_ESTADOS.index),
+        'num_variables': max(e['num_variables'] for e in estadisticas_ventanas),
+        'num_restricciones': max(e['num_restricciones'] for e in estadisticas_ventanas),
+        'objetivo': None,
+        'cota': None,
+        'gap_relativo': max(gaps) if gaps else None,
+        'nodos': sum(e['nodos'] for e in estadisticas_ventanas),
+        'iteraciones': sum(e['iteraciones'] for e in estadisticas_ventanas),
+        'tiempo_pared_s': sum(e['tiempo_pared_s'] for e in estadisticas_ventanas),
+    }
+
+
+def _imprimir_estadisticas_solver(estadisticas):
+    gap = estadisticas['gap_relativo']
+    print(f"[{estadisticas['solver']}] Estado: {estadisticas['estado']} | "
+          f"Variables: {estadisticas['num_variables']} | Restricciones: {estadisticas['num_restricciones']} | "
+          f"Nodos B&B: {estadisticas['nodos']} | Iteraciones: {estadisticas['iteraciones']} | "
+          f"Gap: {'n/d' if gap is None else f'{gap:.4%}'} | Tiempo: {estadisticas['tiempo_pared_s']:.2f} s")
+
+
+def solve_supply_model_gurobi(params, scenario_name, constructor='arreglos', opciones_solver=None,
+                              resultados_previos=None):
+    
+    """
+    Versión final y completa del modelo de Fase 1. Incluye todas las
+    restricciones operativas y la solución al problema de estabilidad numérica.
+
+    constructor elige cómo se arma el modelo ('arreglos' o 'clasico', ver
+    CONSTRUCTORES_FASE1). Los tiempos de construcción y resolución, y la memoria usada
+    al construir, se reportan por separado en results['metricas_modelo'].
+
+    opciones_solver controla el backend y su rendimiento: 'solver' (CBC, SCIP o CP-SAT),
+    'hilos', 'gap_relativo', 'limite_tiempo_s' y 'log_solver'. Las estadísticas de la
+    resolución quedan en results['estadisticas_solver'].
+
+    resultados_previos (un 'results' devuelto antes por esta función, o cargado con
+    data_loader.cargar_plan_fase1) se usa como arranque en caliente mediante hints, sólo
+    con backends que los aprovechan (SOLVERS_CON_HINTS); con CBC se advierte y se resuelve
+    sin ellos.
+    """
+    opciones_solver = opciones_solver or {}
+    solver = crear_solver(opciones_solver)
+    if not solver:
+        return None
+
+    print("--- EJECUTANDO MODELO OPERACIONAL COMPLETO Y ROBUSTO ---")
+    
+    # --- 1. Extraer Conjuntos ---
+    T = list(range(1, params['T_dias_planificacion'] + 1))
+
+    proceso = psutil.Process(os.getpid())
+    memoria_inicial = proceso.memory_info().rss
+    inicio_construccion = time.perf_counter()
+    v = CONSTRUCTORES_FASE1[constructor](solver, params, T)
+    tiempo_construccion = time.perf_counter() - inicio_construccion
+    memoria_construccion_mb = (proceso.memory_info().rss - memoria_inicial) / (1024 * 1024)
+    print(f"Modelo construido (constructor '{constructor}'): {solver.NumVariables()} variables, "
+          f"{solver.NumConstraints()} restricciones en {tiempo_construccion:.2f} s "
+          f"(+{memoria_construccion_mb:.1f} MB).")
+
+    variables_con_valor = 0
+    if resultados_previos and _arranque_caliente_posible(opciones_solver):
+        variables_con_valor = _aplicar_plan_previo(solver, v, resultados_previos)
     
     # --- 5. Resolver el Modelo Final y Completo ---
     print("\nResolviendo el modelo operacional completo...")
-    status = solver.Solve()
+    inicio_resolucion = time.perf_counter()
+    status = solver.Solve(parametros_resolucion(opciones_solver))
+    tiempo_resolucion = time.perf_counter() - inicio_resolucion
+    print(f"Tiempo de resolución: {tiempo_resolucion:.2f} s.")
+    estadisticas = _estadisticas_solver(solver, status, opciones_solver)
+    _imprimir_estadisticas_solver(estadisticas)
 
     if status == pywraplp.Solver.OPTIMAL or status == pywraplp.Solver.FEASIBLE:
         print("\n" + "="*60)
@@ -78,11 +453,141 @@ def solve_supply_model_gurobi(params, scenario_name):
         costo = solver.Objective().Value()
         print(f"\nEl costo mínimo para ejecutar el plan de '{scenario_name}' es: ${costo:,.2f}")        
         
-        results = {}
-        for key, var_dict in v.items():
-            if isinstance(var_dict, dict):
-                results[key] = {idx: var.solution_value() for idx, var in var_dict.items() if var.solution_value() > 0.1}
+        results = ResultadosFase1.desde_solver(solver, v, umbral=0.1)
+        results['metricas_modelo'] = {
+            'solver': opciones_solver.get('solver', 'CBC'),
+            'constructor': constructor,
+            'num_variables': solver.NumVariables(),
+            'num_restricciones': solver.NumConstraints(),
+            'tiempo_construccion_s': tiempo_construccion,
+            'memoria_construccion_mb': memoria_construccion_mb,
+            'tiempo_resolucion_s': tiempo_resolucion,
+        }
+        results['estadisticas_solver'] = estadisticas
+        if resultados_previos:
+            results['arranque_caliente'] = _resumen_arranque_caliente(resultados_previos, tiempo_resolucion,
+                                                                      variables_con_valor, opciones_solver)
         return results
-    else:
+    elif status == pywraplp.Solver.NOT_SOLVED and opciones_solver.get('limite_tiempo_s'):
+        print(f"\nERROR: Se agotó el límite de {opciones_solver['limite_tiempo_s']} s sin encontrar un plan factible.")
+        return None
+    elif status == pywraplp.Solver.INFEASIBLE:
         print("\nERROR INESPERADO: El modelo completo sigue siendo infactible.")
-        return None
\ No newline at end of file
+        return None
+    else:
+        print(f"\nERROR: El solver terminó sin solución (estado {estadisticas['estado']}).")
+        return None
+
+
+def solve_supply_model_rolling(params, scenario_name, ventana=30, traslape=15, constructor='arreglos',
+                               opciones_solver=None, resultados_previos=None):
+    """
+    Resuelve la Fase 1 por horizonte rodante: ventanas de 'ventana' días de las que sólo
+    se comprometen los primeros (ventana - traslape). El inventario del último día
+    comprometido y las hectáreas que faltan por plantar pasan a la ventana siguiente.
+
+    Para que cada ventana no posponga toda la plantación, se le exige la fracción de las
+    hectáreas restantes proporcional a sus días (y a los días comprometidos); la última
+    ventana debe completar todo lo que falte. Devuelve un diccionario 'results' con la
+    misma forma que solve_supply_model_gurobi. opciones_solver se aplica a cada ventana.
+
+    Con resultados_previos, cada ventana recibe como hints los valores del plan previo en
+    sus días (igual que en solve_supply_model_gurobi: sólo con backends que usan hints).
+    """
+    opciones_solver = opciones_solver or {}
+    aplicar_plan_previo = bool(resultados_previos) and _arranque_caliente_posible(opciones_solver)
+    paso = ventana - traslape
+    if paso < 1:
+        raise ValueError(f"El traslape ({traslape}) debe ser menor que la ventana ({ventana}).")
+
+    print(f"--- EJECUTANDO FASE 1 POR HORIZONTE RODANTE (ventana {ventana} días, se comprometen {paso}) ---")
+    T_total = params['T_dias_planificacion']
+    S, G = params['S_especies'], params['G_poligonos']
+
+    inventario = {s: 0 for s in S}
+    ha_restantes = dict(params['Ha_g_total'])
+    partes = []
+    metricas = {'solver': opciones_solver.get('solver', 'CBC'), 'constructor': constructor, 'ventanas': 0,
+                'num_variables': 0, 'num_restricciones': 0,
+                'tiempo_construccion_s': 0.0, 'memoria_construccion_mb': 0.0, 'tiempo_resolucion_s': 0.0}
+    estadisticas_ventanas = []
+    costo_total = 0.0
+    variables_con_valor = 0
+    proceso = psutil.Process(os.getpid())
+
+    inicio = 1
+    while inicio <= T_total:
+        fin = min(inicio + ventana - 1, T_total)
+        T_ventana = list(range(inicio, fin + 1))
+        es_ultima = fin == T_total
+        dias_comprometidos = T_ventana if es_ultima else T_ventana[:paso]
+        dias_restantes = T_total - inicio + 1
+
+        if es_ultima:
+            ha_ventana = ha_restantes
+        else:
+            ha_ventana = {g: ha_restantes[g] * len(T_ventana) / dias_restantes for g in G}
+
+        solver = crear_solver(opciones_solver)
+        if not solver:
+            return None
+
+        memoria_inicial = proceso.memory_info().rss
+        inicio_construccion = time.perf_counter()
+        v = CONSTRUCTORES_FASE1[constructor](solver, params, T_ventana,
+                                             inventario_inicial=inventario, ha_requeridas=ha_ventana)
+        if not es_ultima:
+            # Ritmo mínimo en los días que sí se comprometen
+            for g in G:
+                solver.Add(sum(v['y'][s, g, t] / params['Dens_s'][s] for s in S for t in dias_comprometidos)
+                           >= ha_restantes[g] * len(dias_comprometidos) / dias_restantes - 0.001)
+        metricas['tiempo_construccion_s'] += time.perf_counter() - inicio_construccion
+        # Cada ventana libera el modelo anterior: lo que importa es el máximo, no la suma.
+        metricas['memoria_construccion_mb'] = max(metricas['memoria_construccion_mb'],
+                                                  (proceso.memory_info().rss - memoria_inicial) / (1024 * 1024))
+        metricas['num_variables'] = max(metricas['num_variables'], solver.NumVariables())
+        metricas['num_restricciones'] = max(metricas['num_restricciones'], solver.NumConstraints())
+        if aplicar_plan_previo:
+            variables_con_valor += _aplicar_plan_previo(solver, v, resultados_previos)
+
+        inicio_resolucion = time.perf_counter()
+        status = solver.Solve(parametros_resolucion(opciones_solver))
+        metricas['tiempo_resolucion_s'] += time.perf_counter() - inicio_resolucion
+        metricas['ventanas'] += 1
+        estadisticas = _estadisticas_solver(solver, status, opciones_solver)
+        _imprimir_estadisticas_solver(estadisticas)
+        estadisticas_ventanas.append(estadisticas)
+
+        if status not in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+            print(f"\nERROR: La ventana de los días {inicio}-{fin} no tiene solución (estado {estadisticas['estado']}).")
+            return None
+
+        # --- Comprometer sólo los primeros días de la ventana ---
+        valores = valores_solucion(solver)
+        parte = ResultadosFase1.desde_solver(solver, v, umbral=0.1, dias=dias_comprometidos, valores=valores)
+        partes.append(parte)
+
+        ultimo_dia = dias_comprometidos[-1]
+        inventario = {s: round(valores[v['XI'][s, ultimo_dia].index()]) for s in S}
+        for g in G:
+            plantado = sum(valores[v['y'][s, g, t].index()] / params['Dens_s'][s] for s in S for t in dias_comprometidos)
+            ha_restantes[g] = max(0.0, ha_restantes[g] - plantado)
+        costo_total += sum(valor * params['C_sp'].get((s, p), 0) for (s, p, t), valor in parte['x'].items()
+                           if params['Disponibilidad_{sp}'].get((s, p), 0) == 1)
+        costo_total += sum(parte['y'].values()) * params['PC_U']
+
+        print(f"Ventana días {inicio}-{fin}: comprometidos {dias_comprometidos[0]}-{ultimo_dia}, "
+              f"hectáreas restantes {sum(ha_restantes.values()):.2f}.")
+        inicio = ultimo_dia + 1
+
+    print("\n" + "="*60)
+    print("¡ÉXITO! SE ENCONTRÓ UN PLAN COMPLETO Y FACTIBLE (HORIZONTE RODANTE).")
+    print("="*60)
+    print(f"\nEl costo del plan de '{scenario_name}' es: ${costo_total:,.2f}")
+    results = ResultadosFase1.concatenar(partes)
+    results['metricas_modelo'] = metricas
+    results['estadisticas_solver'] = _estadisticas_ventanas(estadisticas_ventanas)
+    if resultados_previos:
+        results['arranque_caliente'] = _resumen_arranque_caliente(resultados_previos, metricas['tiempo_resolucion_s'],
+                                                                  variables_con_valor, opciones_solver)
+    return results
@@ -0,0 +1,254 @@
+# model_fase2_heuristico.py
+
+import numpy as np
+
+from matriz_distancias import mascara_vecinos, matriz_a_arreglo
+
+
+class _EvaluadorRutas:
+    """
+    Evalúa costos y factibilidad de rutas expresadas como listas de índices
+    [0, c1, c2, ..., 0] sobre la submatriz del día.
+
+    El costo replica la función objetivo del MILP: tiempo de viaje más servicio en
+    cada arco que llega a un cliente (el regreso al depósito no se cobra). La duración
+    replica la restricción de jornada: todo el viaje, regreso incluido, más el servicio.
+    """
+
+    def __init__(self, tiempos, demandas, tiempo_servicio, jornada_limite):
+        self.tiempos = tiempos
+        self.demandas = demandas
+        self.tiempo_servicio = tiempo_servicio
+        self.jornada_limite = jornada_limite
+        self.costos = tiempos + tiempo_servicio
+        self.costos[:, 0] = 0.0
+        np.fill_diagonal(self.costos, 0.0)
+
+    def costo(self, ruta):
+        r = np.asarray(ruta)
+        return float(self.costos[r[:-1], r[1:]].sum())
+
+    def duracion(self, ruta):
+        r = np.asarray(ruta)
+        return float(self.tiempos[r[:-1], r[1:]].sum()) + self.tiempo_servicio * (len(ruta) - 2)
+
+    def carga(self, ruta):
+        return float(self.demandas[ruta[1:-1]].sum())
+
+    def es_factible(self, ruta, capacidad):
+        return self.carga(ruta) <= capacidad + 1e-9 and self.duracion(ruta) <= self.jornada_limite + 1e-9
+
+
+def _ahorros_clarke_wright(ev, num_vehiculos, capacidad_max, mascara=None):
+    """
+    Construcción por ahorros de Clarke-Wright (versión paralela). Los ahorros se calculan
+    de forma vectorizada para todos los pares de clientes y se fusionan en orden
+    decreciente. Los ahorros negativos sólo se aceptan mientras haya más rutas que vehículos.
+    Con una máscara de vecinos sólo se consideran fusiones entre clientes cercanos.
+    """
+    n = len(ev.demandas) - 1
+    rutas = {i: [0, i, 0] for i in range(1, n + 1)}
+    ruta_de = {i: i for i in range(1, n + 1)}
+    if n < 2:
+        return list(rutas.values())
+
+    c = ev.costos
+    ahorros = c[1:, 0][:, None] + c[0, 1:][None, :] - c[1:, 1:]
+    if mascara is not None:
+        ahorros[~mascara[1:, 1:]] = -np.inf
+    np.fill_diagonal(ahorros, -np.inf)
+    orden = np.argsort(-ahorros, axis=None, kind='stable')
+    filas, columnas = np.unravel_index(orden, ahorros.shape)
+
+    for a, b in zip(filas.tolist(), columnas.tolist()):
+        ahorro = ahorros[a, b]
+        if ahorro == -np.inf:
+            break
+        if ahorro <= 0 and len(rutas) <= num_vehiculos:
+            break
+        i, j = a + 1, b + 1
+        ri, rj = ruta_de[i], ruta_de[j]
+        if ri == rj:
+            continue
+        # i debe ser el último cliente de su ruta y j el primero de la suya
+        if rutas[ri][-2] != i or rutas[rj][1] != j:
+            continue
+        fusion = rutas[ri][:-1] + rutas[rj][1:]
+        if not ev.es_factible(fusion, capacidad_max):
+            continue
+        rutas[ri] = fusion
+        del rutas[rj]
+        for nodo in fusion[1:-1]:
+            ruta_de[nodo] = ri
+
+    return list(rutas.values())
+
+
+def _reducir_rutas(ev, rutas, num_vehiculos, capacidad_max):
+    """
+    Si los ahorros dejaron más rutas que vehículos, intenta disolver las rutas menos
+    cargadas reinsertando sus clientes (de mayor a menor demanda) en la posición factible
+    más barata de las demás rutas.
+    """
+    rutas = [list(r) for r in rutas]
+    while len(rutas) > num_vehiculos:
+        for candidata in sorted(range(len(rutas)), key=lambda idx: ev.carga(rutas[idx])):
+            restantes = [list(r) for idx, r in enumerate(rutas) if idx != candidata]
+            clientes = sorted(rutas[candidata][1:-1], key=lambda nodo: ev.demandas[nodo], reverse=True)
+            for nodo in clientes:
+                mejor = None
+                for r_idx, ruta in enumerate(restantes):
+                    deltas = _deltas_insercion(ev, ruta, nodo)
+                    for pos in np.argsort(deltas, kind='stable'):
+                        nueva = ruta[:pos + 1] + [nodo] + ruta[pos + 1:]
+                        if ev.es_factible(nueva, capacidad_max):
+                            if mejor is None or deltas[pos] < mejor[0]:
+                                mejor = (deltas[pos], r_idx, nueva)
+                            break
+                if mejor is None:
+                    break
+                restantes[mejor[1]] = mejor[2]
+            else:
+                rutas = restantes
+                break
+        else:
+            return rutas
+    return rutas
+
+
+def _asignar_vehiculos(ev, rutas, vehiculos):
+    """Asigna la ruta más cargada al vehículo de mayor capacidad. Devuelve None si no cabe."""
+    if len(rutas) > len(vehiculos):
+        return None
+    rutas_ordenadas = sorted(rutas, key=ev.carga, reverse=True)
+    vehiculos_ordenados = sorted(range(len(vehiculos)), key=lambda k: vehiculos[k]['capacidad'], reverse=True)
+    asignacion = {}
+    for ruta, k in zip(rutas_ordenadas, vehiculos_ordenados):
+        if not ev.es_factible(ruta, vehiculos[k]['capacidad']):
+            return None
+        asignacion[k] = ruta
+    return asignacion
+
+
+def _dos_opt(ev, ruta):
+    """Mejora 2-opt intra-ruta (primera mejora) invirtiendo segmentos de clientes."""
+    mejor = ev.costo(ruta)
+    mejorado = True
+    while mejorado:
+        mejorado = False
+        for i in range(1, len(ruta) - 2):
+            for j in range(i + 1, len(ruta) - 1):
+                candidata = ruta[:i] + ruta[i:j + 1][::-1] + ruta[j + 1:]
+                costo = ev.costo(candidata)
+                if costo < mejor - 1e-9 and ev.duracion(candidata) <= ev.jornada_limite + 1e-9:
+                    ruta, mejor, mejorado = candidata, costo, True
+    return ruta
+
+
+def _deltas_insercion(ev, ruta, nodo):
+    """Evalúa de forma vectorizada el delta de costo de insertar 'nodo' en cada posición de la ruta."""
+    r = np.asarray(ruta)
+    previos, siguientes = r[:-1], r[1:]
+    c = ev.costos
+    deltas = c[previos, nodo] + c[nodo, siguientes] - c[previos, siguientes]
+    return deltas
+
+
+def _relocate(ev, asignacion, capacidades):
+    """Mueve un cliente de una ruta a la mejor posición de otra. Devuelve True si mejoró."""
+    for ka, ruta_a in list(asignacion.items()):
+        for pos in range(1, len(ruta_a) - 1):
+            nodo = ruta_a[pos]
+            ruta_a_sin = ruta_a[:pos] + ruta_a[pos + 1:]
+            ahorro_retiro = ev.costo(ruta_a) - ev.costo(ruta_a_sin)
+            for kb in capacidades:
+                ruta_b = asignacion.get(kb, [0, 0]) if kb != ka else ruta_a_sin
+                deltas = _deltas_insercion(ev, ruta_b, nodo)
+                for idx in np.argsort(deltas, kind='stable'):
+                    if deltas[idx] >= ahorro_retiro - 1e-9:
+                        break
+                    nueva_b = ruta_b[:idx + 1] + [nodo] + ruta_b[idx + 1:]
+                    if not ev.es_factible(nueva_b, capacidades[kb]):
+                        continue
+                    if kb == ka:
+                        asignacion[ka] = nueva_b
+                    else:
+                        asignacion[kb] = nueva_b
+                        if len(ruta_a_sin) > 2:
+                            asignacion[ka] = ruta_a_sin
+                        else:
+                            del asignacion[ka]
+                    return True
+    return False
+
+
+def _exchange(ev, asignacion, capacidades):
+    """Intercambia un cliente entre dos rutas distintas. Devuelve True si mejoró."""
+    vehiculos = list(asignacion)
+    for a_idx, ka in enumerate(vehiculos):
+        for kb in vehiculos[a_idx + 1:]:
+            ruta_a, ruta_b = asignacion[ka], asignacion[kb]
+            costo_actual = ev.costo(ruta_a) + ev.costo(ruta_b)
+            for i in range(1, len(ruta_a) - 1):
+                for j in range(1, len(ruta_b) - 1):
+                    nueva_a = ruta_a[:i] + [ruta_b[j]] + ruta_a[i + 1:]
+                    nueva_b = ruta_b[:j] + [ruta_a[i]] + ruta_b[j + 1:]
+                    if ev.costo(nueva_a) + ev.costo(nueva_b) < costo_actual - 1e-9 \
+                            and ev.es_factible(nueva_a, capacidades[ka]) and ev.es_factible(nueva_b, capacidades[kb]):
+                        asignacion[ka], asignacion[kb] = nueva_a, nueva_b
+                        return True
+    return False
+
+
+def _busqueda_local(ev, asignacion, capacidades, max_iteraciones=1000):
+    """Alterna 2-opt, relocate y exchange hasta que ningún movimiento mejore la solución."""
+    for _ in range(max_iteraciones):
+        for k in asignacion:
+            asignacion[k] = _dos_opt(ev, asignacion[k])
+        if not (_relocate(ev, asignacion, capacidades) or _exchange(ev, asignacion, capacidades)):
+            break
+    return asignacion
+
+
+def solve_vrp_heuristico(dia, demandas_diarias, matriz_tiempos, vehiculos, params, vecinos_k=None):
+    """
+    Resuelve el VRP de un día con una heurística de construcción (ahorros de Clarke-Wright)
+    más búsqueda local (2-opt, relocate, exchange). Respeta la capacidad de cada vehículo y
+    la jornada laboral, y devuelve la misma estructura que solve_vrp_analytically.
+
+    Con vecinos_k, los ahorros se limitan a pares de clientes dentro de los k vecinos más
+    cercanos, lo que reduce la construcción en días con muchos nodos.
+    """
+    print(f"\n--- [Día {dia}] Iniciando VRP con motor heurístico (Clarke-Wright + búsqueda local) ---")
+
+    depot = '18'
+    nodos_con_demanda = list(demandas_diarias.keys())
+
+    if not nodos_con_demanda:
+        print(f"Día {dia}: No hay demanda, no se requiere ruteo.")
+        return {'rutas': [], 'tiempo_total': 0, 'status': 'Sin Demanda'}
+
+    N = [depot] + nodos_con_demanda
+    tiempo_servicio = params.get('Tiempo_Descarga_LD_min', 0)
+    jornada_limite = params.get('Jornada_Laboral_JL_min', 480)
+
+    tiempos = matriz_a_arreglo(matriz_tiempos, N)
+    demandas = np.array([0.0] + [demandas_diarias[j] for j in nodos_con_demanda])
+    ev = _EvaluadorRutas(tiempos, demandas, tiempo_servicio, jornada_limite)
+
+    capacidades = {k: v['capacidad'] for k, v in enumerate(vehiculos)}
+    rutas = _ahorros_clarke_wright(ev, len(vehiculos), max(capacidades.values()), mascara_vecinos(tiempos, vecinos_k))
+    rutas = _reducir_rutas(ev, rutas, len(vehiculos), max(capacidades.values()))
+    asignacion = _asignar_vehiculos(ev, rutas, vehiculos)
+    if asignacion is None:
+        print(f"Día {dia}: Infactible. La heurística no pudo cubrir la demanda con la flota disponible.")
+        return None
+
+    asignacion = _busqueda_local(ev, asignacion, capacidades)
+
+    tiempo_total = sum(ev.costo(ruta) for ruta in asignacion.values())
+    print(f"Día {dia}: Solución heurística encontrada. Tiempo total: {tiempo_total:.2f} min.")
+    solucion = {'rutas': [], 'tiempo_total': tiempo_total, 'status': 'Heurístico'}
+    for k in sorted(asignacion):
+        solucion['rutas'].append({'vehiculo': vehiculos[k]['id'], 'ruta': [N[i] for i in asignacion[k]]})
+    return solucion
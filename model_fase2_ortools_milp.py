@@ -1,11 +1,87 @@
 # model_fase2_ortools_milp.py
 
+import math
+import time
+from collections import defaultdict
+
 from ortools.linear_solver import pywraplp
 
-def solve_vrp_analytically(dia, demandas_diarias, matriz_tiempos, vehiculos, params):
+from matriz_distancias import mascara_vecinos, matriz_a_arreglo
+
+
+def _arcos_permitidos(N, matriz_tiempos, vecinos_k):
+    """Arcos (i, j) del modelo: todos los pares, o sólo los de vecinos cercanos si se da vecinos_k."""
+    mascara = mascara_vecinos(matriz_a_arreglo(matriz_tiempos, N), vecinos_k)
+    return [(N[a], N[b]) for a in range(len(N)) for b in range(len(N)) if a != b and mascara[a, b]]
+
+
+def _estadisticas_solver(solver, tiempo_construccion_s, tiempo_resolucion_s):
+    """Tamaño del modelo y esfuerzo del solver de un día (mismas claves que en la Fase 1)."""
+    objetivo, cota = solver.Objective().Value(), solver.Objective().BestBound()
+    return {
+        'solver': 'CBC',
+        'num_variables': solver.NumVariables(),
+        'num_restricciones': solver.NumConstraints(),
+        'objetivo': objetivo,
+        'cota': cota,
+        'gap_relativo': abs(objetivo - cota) / max(abs(objetivo), 1e-9),
+        'nodos': solver.nodes(),
+        'iteraciones': solver.iterations(),
+        'tiempo_construccion_s': tiempo_construccion_s,
+        'tiempo_resolucion_s': tiempo_resolucion_s,
+    }
+
+
+def _detectar_subtours(x, depot):
+    """
+    Componentes conexas del grafo de arcos usados (sumando sobre vehículos) que no tocan
+    el depósito: cada una es un subtour de la solución actual.
+    """
+    vecinos = defaultdict(set)
+    for clave, var in x.items():
+        if var.solution_value() > 0.5:
+            i, j = clave[0], clave[1]
+            vecinos[i].add(j)
+            vecinos[j].add(i)
+
+    visitados = set()
+    componentes = []
+    for inicio in [depot] + [n for n in vecinos if n != depot]:
+        if inicio in visitados:
+            continue
+        componente, pendientes = set(), [inicio]
+        while pendientes:
+            nodo = pendientes.pop()
+            if nodo in componente:
+                continue
+            componente.add(nodo)
+            pendientes.extend(vecinos[nodo] - componente)
+        visitados |= componente
+        if depot not in componente:
+            componentes.append(componente)
+    return componentes
+
+
+def solve_vrp_analytically(dia, demandas_diarias, matriz_tiempos, vehiculos, params, num_hilos=None,
+                           solucion_inicial=None, vecinos_k=None, romper_simetria=False, cortes_perezosos=False):
     """
     TRADUCCIÓN FIEL: Resuelve el VRP para un día específico usando un modelo MILP exacto
     con OR-Tools (Solver CBC).
+
+    num_hilos limita los hilos del solver; útil cuando varios días se resuelven en paralelo.
+    solucion_inicial (mismo formato que el resultado, p. ej. de solve_vrp_heuristico) se usa
+    como arranque en caliente: se pasa como hint al solver y su costo acota la función objetivo.
+    vecinos_k restringe los arcos entre clientes a los k vecinos más cercanos. Con
+    romper_simetria, los vehículos idénticos (misma capacidad) se ordenan por carga para
+    que CBC no explore ramas que sólo intercambian sus etiquetas.
+
+    Con cortes_perezosos no se agregan las restricciones MTZ: se resuelve sin eliminación
+    de subtours, se buscan subtours en la solución y sólo para ésos se agregan cortes de
+    capacidad redondeada, sum x(S) <= |S| - ceil(d(S) / Q), re-resolviendo el mismo solver
+    hasta que no quede ninguno. Las iteraciones y cortes quedan en solucion['cortes'].
+
+    El tamaño del modelo, nodos, iteraciones, gap y tiempos de construcción y resolución
+    quedan en solucion['estadisticas_solver'].
     """
     print(f"\n--- [Día {dia}] Iniciando VRP con Solver Analítico (OR-Tools MILP) ---")
     
@@ -17,6 +93,7 @@ def solve_vrp_analytically(dia, demandas_diarias, matriz_tiempos, vehiculos, par
         print(f"Día {dia}: No hay demanda, no se requiere ruteo.")
         return {'rutas': [], 'tiempo_total': 0, 'status': 'Sin Demanda'}
 
+    inicio_construccion = time.perf_counter()
     N = [depot] + nodos_con_demanda
     K = [v['id'] for v in vehiculos]
     num_nodos_clientes = len(nodos_con_demanda)
@@ -30,68 +107,110 @@ def solve_vrp_analytically(dia, demandas_diarias, matriz_tiempos, vehiculos, par
     if not solver:
         print("Error: No se pudo crear el solver CBC.")
         return None
+    if num_hilos:
+        solver.SetNumThreads(num_hilos)
 
     # --- 3. Declaración de Variables de Decisión ---
-    # x[i, j, k] = 1 si el vehículo k viaja del nodo i al j
-    x = {(i, j, k): solver.BoolVar(f'x_{i}_{j}_{k}') for i in N for j in N for k in K if i != j}
+    # x[i, j, k] = 1 si el vehículo k viaja del nodo i al j (sólo para los arcos permitidos)
+    arcos = _arcos_permitidos(N, matriz_tiempos, vecinos_k)
+    entrantes, salientes = defaultdict(list), defaultdict(list)
+    for i, j in arcos:
+        entrantes[j].append(i)
+        salientes[i].append(j)
+    x = {(i, j, k): solver.BoolVar(f'x_{i}_{j}_{k}') for (i, j) in arcos for k in K}
     
-    # u[i] para la eliminación de subtours (MTZ)
-    u = {i: solver.IntVar(1, num_nodos_clientes, f'u_{i}') for i in nodos_con_demanda}
+    # u[i] para la eliminación de subtours (MTZ); no se usan con cortes perezosos.
+    u = {} if cortes_perezosos else {i: solver.IntVar(1, num_nodos_clientes, f'u_{i}') for i in nodos_con_demanda}
 
     # --- 4. Sistema de Restricciones (Traducción 1 a 1) ---
     
     # Cada nodo con demanda debe ser visitado exactamente una vez.
     for j in nodos_con_demanda:
-        solver.Add(solver.Sum(x[i, j, k] for i in N if i != j for k in K) == 1, f'VisitaUnica_{j}')
+        solver.Add(solver.Sum(x[i, j, k] for i in entrantes[j] for k in K) == 1, f'VisitaUnica_{j}')
 
     # Cada vehículo sale del depósito como máximo una vez.
     for k in K:
-        solver.Add(solver.Sum(x[depot, j, k] for j in nodos_con_demanda) <= 1, f'SalidaDepot_{k}')
+        solver.Add(solver.Sum(x[depot, j, k] for j in salientes[depot]) <= 1, f'SalidaDepot_{k}')
 
     # Conservación de flujo: si un vehículo entra a un nodo, debe salir.
     for h in nodos_con_demanda:
         for k in K:
-            entradas = solver.Sum(x[i, h, k] for i in N if i != h)
-            salidas = solver.Sum(x[h, j, k] for j in N if j != h)
+            entradas = solver.Sum(x[i, h, k] for i in entrantes[h])
+            salidas = solver.Sum(x[h, j, k] for j in salientes[h])
             solver.Add(entradas == salidas, f'Flujo_{h}_{k}')
 
     # Restricción de capacidad de cada vehículo.
+    carga = {}
     for k in K:
         capacidad_vehiculo = next(v['capacidad'] for v in vehiculos if v['id'] == k)
-        carga_transportada = solver.Sum(demandas_diarias[j] * x[i, j, k] for j in nodos_con_demanda for i in N if i != j)
-        solver.Add(carga_transportada <= capacidad_vehiculo, f'Capacidad_{k}')
+        carga[k] = solver.Sum(demandas_diarias[j] * x[i, j, k] for j in nodos_con_demanda for i in entrantes[j])
+        solver.Add(carga[k] <= capacidad_vehiculo, f'Capacidad_{k}')
 
     # Restricción de duración máxima de ruta.
     for k in K:
-        tiempo_viaje = solver.Sum(matriz_tiempos.get((i, j), 1e6) * x[i, j, k] for i in N for j in N if i != j)
-        tiempo_servicio_total = solver.Sum(tiempo_servicio * x[i, j, k] for j in nodos_con_demanda for i in N if i != j)
+        tiempo_viaje = solver.Sum(matriz_tiempos.get((i, j), 1e6) * x[i, j, k] for (i, j) in arcos)
+        tiempo_servicio_total = solver.Sum(tiempo_servicio * x[i, j, k] for j in nodos_con_demanda for i in entrantes[j])
         solver.Add(tiempo_viaje + tiempo_servicio_total <= jornada_limite, f'DuracionRuta_{k}')
 
     # Eliminación de Subtours (Formulación de Miller-Tucker-Zemlin)
-    for i in nodos_con_demanda:
-        for j in nodos_con_demanda:
-            if i != j:
-                solver.Add(u[i] - u[j] + num_nodos_clientes * solver.Sum(x[i, j, k] for k in K) <= num_nodos_clientes - 1, f'MTZ_{i}_{j}')
+    for i, j in arcos:
+        if i != depot and j != depot and not cortes_perezosos:
+            solver.Add(u[i] - u[j] + num_nodos_clientes * solver.Sum(x[i, j, k] for k in K) <= num_nodos_clientes - 1, f'MTZ_{i}_{j}')
+
+    # Ruptura de simetría: entre vehículos consecutivos con la misma capacidad, el primero
+    # lleva al menos tanta carga como el segundo (cualquier solución puede reetiquetarse así).
+    if romper_simetria:
+        capacidades = {v['id']: v['capacidad'] for v in vehiculos}
+        for k_a, k_b in zip(K[:-1], K[1:]):
+            if capacidades[k_a] == capacidades[k_b]:
+                solver.Add(carga[k_a] >= carga[k_b], f'Simetria_{k_a}_{k_b}')
 
     # --- 5. Función Objetivo ---
     # Minimizar el tiempo total de viaje (incluyendo servicio).
     # La lógica es idéntica, solo cambia la sintaxis para construir la suma.
     tiempo_total_objetivo = solver.Sum(
         (matriz_tiempos.get((i,j), 1e6) + tiempo_servicio) * x[i,j,k] 
-        for i in N for j in N if i !=j and j != depot for k in K
+        for (i, j) in arcos if j != depot for k in K
     )
     solver.Minimize(tiempo_total_objetivo)
+
+    if solucion_inicial:
+        _aplicar_solucion_inicial(solver, x, u, solucion_inicial, tiempo_total_objetivo)
     
     # --- 6. Resolver el Modelo ---
     print(f"Día {dia}: Resolviendo VRP analítico (MILP) para {len(nodos_con_demanda)} nodos...")
     # Opcional: Establecer un límite de tiempo en milisegundos.
     # solver.SetTimeLimit(60000) # 60 segundos
+    inicio_resolucion = time.perf_counter()
+    tiempo_construccion = inicio_resolucion - inicio_construccion
     status = solver.Solve()
 
+    # --- 6b. Ciclo de cortes perezosos: agregar sólo los subtours violados y re-resolver ---
+    iteraciones, cortes_agregados = 1, 0
+    capacidad_maxima = max(v['capacidad'] for v in vehiculos)
+    while cortes_perezosos and status == pywraplp.Solver.OPTIMAL:
+        subtours = _detectar_subtours(x, depot)
+        if not subtours:
+            break
+        for S in subtours:
+            vehiculos_minimos = max(1, math.ceil(sum(demandas_diarias[j] for j in S) / capacidad_maxima))
+            nombre_corte = f"Subtour_{iteraciones}_{cortes_agregados}"
+            solver.Add(solver.Sum(x[i, j, k] for (i, j) in arcos if i in S and j in S for k in K)
+                       <= len(S) - vehiculos_minimos, nombre_corte)
+            cortes_agregados += 1
+        iteraciones += 1
+        status = solver.Solve()
+    tiempo_resolucion = time.perf_counter() - inicio_resolucion
+    if cortes_perezosos:
+        print(f"Día {dia}: Cortes perezosos: {cortes_agregados} cortes en {iteraciones} iteraciones.")
+
     # --- 7. Extraer y Reconstruir las Rutas ---
     if status == pywraplp.Solver.OPTIMAL:
         print(f"Día {dia}: Solución óptima encontrada. Tiempo total: {solver.Objective().Value():.2f} min.")
-        solucion = {'rutas': [], 'tiempo_total': solver.Objective().Value(), 'status': 'Óptimo'}
+        solucion = {'rutas': [], 'tiempo_total': solver.Objective().Value(), 'status': 'Óptimo',
+                    'estadisticas_solver': _estadisticas_solver(solver, tiempo_construccion, tiempo_resolucion)}
+        if cortes_perezosos:
+            solucion['cortes'] = {'iteraciones': iteraciones, 'cortes_agregados': cortes_agregados}
         
         for k in K:
             # Verificar si el vehículo k fue utilizado
@@ -127,4 +246,151 @@ def solve_vrp_analytically(dia, demandas_diarias, matriz_tiempos, vehiculos, par
         if status == pywraplp.Solver.INFEASIBLE:
             status_text = "Infactible"
         print(f"Día {dia}: {status_text}. Estado OR-Tools: {status}")
-        return None
\ No newline at end of file
+        return None
+
+
+def _aplicar_solucion_inicial(solver, x, u, solucion_inicial, tiempo_total_objetivo, indice_vehiculo=True):
+    """
+    Traduce una solución previa a hints para las variables x/u y agrega su costo como
+    cota superior del objetivo. La cota sirve incluso con solvers que ignoran los hints
+    (como CBC), porque poda todas las ramas peores que la solución conocida.
+
+    indice_vehiculo indica si x se indexa por (i, j, k) o sólo por arco (i, j). Si la
+    solución usa arcos que el modelo no tiene (arcos restringidos a vecinos), la cota
+    no es válida y no se agrega.
+    """
+    arcos_usados = set()
+    posiciones = {}
+    for ruta_info in solucion_inicial.get('rutas', []):
+        ruta, k = ruta_info['ruta'], ruta_info['vehiculo']
+        for posicion, (i, j) in enumerate(zip(ruta[:-1], ruta[1:]), start=1):
+            arcos_usados.add((i, j, k) if indice_vehiculo else (i, j))
+            if j in u:
+                posiciones[j] = posicion
+
+    variables = list(x.values()) + [u[i] for i in posiciones]
+    valores = [1.0 if clave in arcos_usados else 0.0 for clave in x] + [float(posiciones[i]) for i in posiciones]
+    solver.SetHint(variables, valores)
+    if not arcos_usados <= x.keys():
+        print("Aviso: la solución inicial usa arcos fuera de los vecinos permitidos; no se usa su costo como cota.")
+        return
+    solver.Add(tiempo_total_objetivo <= solucion_inicial['tiempo_total'] + 1e-6, 'CotaSolucionInicial')
+
+
+def solve_vrp_dos_indices(dia, demandas_diarias, matriz_tiempos, vehiculos, params, num_hilos=None,
+                          solucion_inicial=None, vecinos_k=None):
+    """
+    Formulación compacta del VRP para flotas homogéneas: una variable binaria x[i, j] por
+    arco (sin índice de vehículo), un flujo de carga f[i, j] que sale del depósito y se
+    entrega en cada cliente (elimina subtours y limita la capacidad) y un tiempo acumulado
+    a[j] con big-M por arco para la jornada laboral. Al no distinguir vehículos idénticos
+    no hay simetría entre ellos, y hay |K| veces menos binarias que en solve_vrp_analytically.
+
+    Con una flota heterogénea delega en solve_vrp_analytically. vecinos_k restringe los
+    arcos entre clientes a los k vecinos más cercanos. Devuelve la misma estructura que
+    solve_vrp_analytically; las rutas se asignan a los vehículos en orden.
+    """
+    print(f"\n--- [Día {dia}] Iniciando VRP con formulación de dos índices (OR-Tools MILP) ---")
+
+    # --- 1. Preparación de Conjuntos y Parámetros ---
+    depot = '18'
+    nodos_con_demanda = list(demandas_diarias.keys())
+
+    if not nodos_con_demanda:
+        print(f"Día {dia}: No hay demanda, no se requiere ruteo.")
+        return {'rutas': [], 'tiempo_total': 0, 'status': 'Sin Demanda'}
+
+    capacidades = {v['capacidad'] for v in vehiculos}
+    if len(capacidades) > 1:
+        print(f"Día {dia}: La flota no es homogénea; se usa la formulación de tres índices.")
+        return solve_vrp_analytically(dia, demandas_diarias, matriz_tiempos, vehiculos, params,
+                                      num_hilos=num_hilos, solucion_inicial=solucion_inicial, vecinos_k=vecinos_k)
+
+    inicio_construccion = time.perf_counter()
+    N = [depot] + nodos_con_demanda
+    K = [v['id'] for v in vehiculos]
+    capacidad = capacidades.pop()
+    tiempo_servicio = params.get('Tiempo_Descarga_LD_min', 0)
+    jornada_limite = params.get('Jornada_Laboral_JL_min', 480)
+
+    # Un arco cuyo viaje ya excede la jornada nunca puede usarse.
+    arcos = [(i, j) for (i, j) in _arcos_permitidos(N, matriz_tiempos, vecinos_k)
+             if matriz_tiempos.get((i, j), 1e6) <= jornada_limite]
+    tiempo = {arco: matriz_tiempos.get(arco, 1e6) for arco in arcos}
+    entrantes, salientes = defaultdict(list), defaultdict(list)
+    for i, j in arcos:
+        entrantes[j].append(i)
+        salientes[i].append(j)
+
+    # --- 2. Creación del Modelo OR-Tools ---
+    solver = pywraplp.Solver.CreateSolver('CBC')
+    if not solver:
+        print("Error: No se pudo crear el solver CBC.")
+        return None
+    if num_hilos:
+        solver.SetNumThreads(num_hilos)
+
+    # --- 3. Variables: arco usado, carga sobre el arco y tiempo acumulado al salir de cada cliente ---
+    x = {arco: solver.BoolVar(f'x_{arco[0]}_{arco[1]}') for arco in arcos}
+    f = {arco: solver.NumVar(0, capacidad, f'f_{arco[0]}_{arco[1]}') for arco in arcos}
+    a = {j: solver.NumVar(0, jornada_limite, f'a_{j}') for j in nodos_con_demanda}
+
+    # --- 4. Restricciones ---
+    for j in nodos_con_demanda:
+        solver.Add(solver.Sum(x[i, j] for i in entrantes[j]) == 1, f'Entrada_{j}')
+        solver.Add(solver.Sum(x[j, h] for h in salientes[j]) == 1, f'Salida_{j}')
+        # Cada cliente retira su demanda del flujo de carga.
+        solver.Add(solver.Sum(f[i, j] for i in entrantes[j]) - solver.Sum(f[j, h] for h in salientes[j])
+                   == demandas_diarias[j], f'FlujoCarga_{j}')
+
+    solver.Add(solver.Sum(x[depot, j] for j in salientes[depot]) <= len(K), 'Flota')
+
+    for i, j in arcos:
+        # La carga sólo viaja por arcos usados, cabe en el camión y cubre al menos al destino.
+        limite = capacidad if i == depot else capacidad - demandas_diarias[i]
+        solver.Add(f[i, j] <= limite * x[i, j], f'CapacidadArco_{i}_{j}')
+        if j != depot:
+            solver.Add(f[i, j] >= demandas_diarias[j] * x[i, j], f'CargaMinima_{i}_{j}')
+
+        # Jornada laboral con big-M por arco (M = jornada + tiempo del arco + servicio).
+        paso = tiempo[i, j] + (tiempo_servicio if j != depot else 0)
+        big_m = jornada_limite + paso
+        if i == depot:
+            solver.Add(a[j] >= paso - big_m * (1 - x[i, j]), f'TiempoSalida_{j}')
+        elif j == depot:
+            solver.Add(a[i] + paso <= jornada_limite + big_m * (1 - x[i, j]), f'TiempoRegreso_{i}')
+        else:
+            solver.Add(a[j] >= a[i] + paso - big_m * (1 - x[i, j]), f'Tiempo_{i}_{j}')
+
+    # --- 5. Función Objetivo (idéntica a la de tres índices: el regreso no se cobra) ---
+    tiempo_total_objetivo = solver.Sum((tiempo[i, j] + tiempo_servicio) * x[i, j] for (i, j) in arcos if j != depot)
+    solver.Minimize(tiempo_total_objetivo)
+
+    if solucion_inicial:
+        _aplicar_solucion_inicial(solver, x, {}, solucion_inicial, tiempo_total_objetivo, indice_vehiculo=False)
+
+    # --- 6. Resolver el Modelo ---
+    print(f"Día {dia}: Resolviendo VRP de dos índices para {len(nodos_con_demanda)} nodos "
+          f"({len(x)} binarias)...")
+    inicio_resolucion = time.perf_counter()
+    status = solver.Solve()
+    tiempo_resolucion = time.perf_counter() - inicio_resolucion
+
+    # --- 7. Extraer las Rutas: cada arco que sale del depósito inicia una ruta ---
+    if status != pywraplp.Solver.OPTIMAL:
+        status_text = "Infactible" if status == pywraplp.Solver.INFEASIBLE else "No se encontró solución óptima"
+        print(f"Día {dia}: {status_text}. Estado OR-Tools: {status}")
+        return None
+
+    print(f"Día {dia}: Solución óptima encontrada. Tiempo total: {solver.Objective().Value():.2f} min.")
+    siguiente = {i: j for (i, j), var in x.items() if i != depot and var.solution_value() > 0.5}
+    solucion = {'rutas': [], 'tiempo_total': solver.Objective().Value(), 'status': 'Óptimo',
+                'estadisticas_solver': _estadisticas_solver(solver, inicio_resolucion - inicio_construccion,
+                                                            tiempo_resolucion)}
+    inicios = [j for j in salientes[depot] if x[depot, j].solution_value() > 0.5]
+    for k, inicio in zip(K, inicios):
+        ruta_k = [depot, inicio]
+        while ruta_k[-1] != depot and len(ruta_k) <= len(N) + 1:
+            ruta_k.append(siguiente[ruta_k[-1]])
+        solucion['rutas'].append({'vehiculo': k, 'ruta': ruta_k})
+    return solucion
@@ -0,0 +1,109 @@
+# model_fase2_ortools_routing.py
+
+import numpy as np
+from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+
+from matriz_distancias import mascara_vecinos, matriz_a_arreglo
+
+# La librería de ruteo trabaja con arcos enteros: los minutos se escalan a milésimas.
+ESCALA_TIEMPO = 1000
+
+
+def solve_vrp_routing(dia, demandas_diarias, matriz_tiempos, vehiculos, params, limite_tiempo_s=5, vecinos_k=None):
+    """
+    Resuelve el VRP de un día con el solver de ruteo de OR-Tools (RoutingModel de
+    programación por restricciones). Usa una dimensión de capacidad y otra de tiempo,
+    y mejora la solución con Guided Local Search hasta agotar limite_tiempo_s.
+
+    Con vecinos_k, los arcos entre clientes se restringen a los k vecinos más cercanos
+    (en ambos sentidos), lo que achica el vecindario de la búsqueda en días grandes.
+
+    Devuelve la misma estructura que solve_vrp_analytically: {'rutas', 'tiempo_total', 'status'}.
+    """
+    print(f"\n--- [Día {dia}] Iniciando VRP con solver de ruteo OR-Tools (GLS, límite {limite_tiempo_s}s) ---")
+
+    # --- 1. Preparación de Conjuntos y Parámetros ---
+    depot = '18'
+    nodos_con_demanda = list(demandas_diarias.keys())
+
+    if not nodos_con_demanda:
+        print(f"Día {dia}: No hay demanda, no se requiere ruteo.")
+        return {'rutas': [], 'tiempo_total': 0, 'status': 'Sin Demanda'}
+
+    N = [depot] + nodos_con_demanda
+    K = [v['id'] for v in vehiculos]
+    tiempo_servicio = params.get('Tiempo_Descarga_LD_min', 0)
+    jornada_limite = params.get('Jornada_Laboral_JL_min', 480)
+
+    tiempos_arreglo = matriz_a_arreglo(matriz_tiempos, N)
+    tiempos = tiempos_arreglo.tolist()
+    # Tránsito = viaje + descarga en el nodo destino (si es cliente), igual que en el MILP.
+    transito = [[int(round((tiempos[a][b] + (tiempo_servicio if b != 0 else 0)) * ESCALA_TIEMPO))
+                 for b in range(len(N))] for a in range(len(N))]
+    # El objetivo del MILP no cobra el regreso al depósito.
+    costo_arco = [[transito[a][b] if b != 0 else 0 for b in range(len(N))] for a in range(len(N))]
+    demandas = [0] + [int(round(demandas_diarias[j])) for j in nodos_con_demanda]
+
+    # --- 2. Creación del Modelo de Ruteo ---
+    manager = pywrapcp.RoutingIndexManager(len(N), len(K), 0)
+    routing = pywrapcp.RoutingModel(manager)
+
+    def _costo_callback(desde_idx, hasta_idx):
+        return costo_arco[manager.IndexToNode(desde_idx)][manager.IndexToNode(hasta_idx)]
+
+    def _tiempo_callback(desde_idx, hasta_idx):
+        return transito[manager.IndexToNode(desde_idx)][manager.IndexToNode(hasta_idx)]
+
+    def _demanda_callback(desde_idx):
+        return demandas[manager.IndexToNode(desde_idx)]
+
+    routing.SetArcCostEvaluatorOfAllVehicles(routing.RegisterTransitCallback(_costo_callback))
+
+    if vecinos_k:
+        mascara = mascara_vecinos(tiempos_arreglo, vecinos_k)
+        for a, b in zip(*np.nonzero(~mascara)):
+            if a != b:
+                routing.NextVar(manager.NodeToIndex(int(a))).RemoveValue(manager.NodeToIndex(int(b)))
+
+    # --- 3. Dimensiones de Capacidad y de Jornada Laboral ---
+    routing.AddDimensionWithVehicleCapacity(
+        routing.RegisterUnaryTransitCallback(_demanda_callback),
+        0, [int(v['capacidad']) for v in vehiculos], True, 'Capacidad'
+    )
+    routing.AddDimension(
+        routing.RegisterTransitCallback(_tiempo_callback),
+        0, int(jornada_limite * ESCALA_TIEMPO), True, 'Tiempo'
+    )
+
+    # --- 4. Estrategia de Búsqueda ---
+    parametros_busqueda = pywrapcp.DefaultRoutingSearchParameters()
+    parametros_busqueda.first_solution_strategy = routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    parametros_busqueda.local_search_metaheuristic = routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+    parametros_busqueda.time_limit.FromMilliseconds(int(limite_tiempo_s * 1000))
+
+    print(f"Día {dia}: Resolviendo VRP con RoutingModel para {len(nodos_con_demanda)} nodos...")
+    asignacion = routing.SolveWithParameters(parametros_busqueda)
+
+    # --- 5. Extraer las Rutas ---
+    if asignacion is None:
+        print(f"Día {dia}: No se encontró solución factible. Estado RoutingModel: {routing.status()}")
+        return None
+
+    solucion = {'rutas': [], 'tiempo_total': 0.0, 'status': 'Metaheurística (GLS)'}
+    for k_idx, k in enumerate(K):
+        indice = routing.Start(k_idx)
+        ruta_k = [depot]
+        indice = asignacion.Value(routing.NextVar(indice))
+        while not routing.IsEnd(indice):
+            ruta_k.append(N[manager.IndexToNode(indice)])
+            indice = asignacion.Value(routing.NextVar(indice))
+        if len(ruta_k) == 1:
+            continue
+        ruta_k.append(depot)
+        # Se recalcula con los tiempos originales para evitar el redondeo de la escala entera.
+        solucion['tiempo_total'] += sum(matriz_tiempos.get((i, j), 1e6) + tiempo_servicio
+                                        for i, j in zip(ruta_k[:-1], ruta_k[1:]) if j != depot)
+        solucion['rutas'].append({'vehiculo': k, 'ruta': ruta_k})
+
+    print(f"Día {dia}: Solución encontrada. Tiempo total: {solucion['tiempo_total']:.2f} min.")
+    return solucion
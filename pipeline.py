@@ -0,0 +1,50 @@
+# pipeline.py
+
+import queue
+import threading
+
+
+class EtapaAsincrona:
+    """
+    Etapa de un pipeline productor/consumidor: un hilo dedicado ejecuta, en el orden en
+    que llegan, las tareas que el productor envía con enviar().
+
+    La cola es acotada (max_pendientes): si el consumidor se atrasa, enviar() bloquea al
+    productor en lugar de acumular resultados en memoria. Si una tarea falla, las
+    siguientes se descartan y el error se vuelve a lanzar en el productor (en el
+    siguiente enviar() o en cerrar()).
+    """
+
+    def __init__(self, nombre, max_pendientes=8):
+        self.nombre = nombre
+        self._cola = queue.Queue(maxsize=max_pendientes)
+        self._error = None
+        self._hilo = threading.Thread(target=self._consumir, name=nombre, daemon=True)
+        self._hilo.start()
+
+    def enviar(self, funcion, *args):
+        """Encola funcion(*args); bloquea mientras la cola esté llena."""
+        if self._error is not None:
+            raise self._error
+        self._cola.put((funcion, args))
+
+    def _consumir(self):
+        while True:
+            tarea = self._cola.get()
+            if tarea is None:
+                return
+            if self._error is not None:
+                continue
+            funcion, args = tarea
+            try:
+                funcion(*args)
+            except BaseException as e:
+                print(f"[Pipeline] Error en la etapa '{self.nombre}': {e}")
+                self._error = e
+
+    def cerrar(self):
+        """Espera a que se procesen todas las tareas encoladas y detiene el hilo."""
+        self._cola.put(None)
+        self._hilo.join()
+        if self._error is not None:
+            raise self._error
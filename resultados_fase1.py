@@ -0,0 +1,269 @@
+# resultados_fase1.py
+
+from collections.abc import Mapping, MutableMapping
+
+import numpy as np
+import pandas as pd
+from ortools.linear_solver import linear_solver_pb2
+
+# Familias de variables de Fase 1 y los nombres de sus índices; el último es siempre el día.
+INDICES_FAMILIAS = {
+    'x': ('Especie', 'Proveedor', 'Dia'),
+    'y': ('Especie', 'Poligono', 'Dia'),
+    'z1': ('Dia',),
+    'z2': ('Poligono', 'Dia'),
+    'XI': ('Especie', 'Dia'),
+}
+
+
+def valores_solucion(solver):
+    """
+    Valores de todas las variables del solver en un solo arreglo, indexado por
+    var.index(). Una sola llamada reemplaza un solution_value() por variable.
+    """
+    respuesta = linear_solver_pb2.MPSolutionResponse()
+    solver.FillSolutionResponseProto(respuesta)
+    return np.array(respuesta.variable_value, dtype=np.float64)
+
+
+class FamiliaDispersa(Mapping):
+    """
+    Valores no nulos de una familia de variables en formato coordenado (COO): un código
+    entero por índice no temporal (con su vocabulario), el día y el valor de cada entrada,
+    en el orden en que se extrajeron.
+
+    Una permutación estable por día y sus desplazamientos dan las entradas de cualquier
+    día en O(1) (ver posiciones_dia). Se comporta como el diccionario {clave: valor} de
+    siempre; el índice clave → posición para consultas puntuales se arma sólo si se usa.
+    """
+
+    __slots__ = ('columnas', 'vocabularios', 'codigos', 'dias', 'valores', '_orden', '_inicios', '_dia_min',
+                 '_posiciones')
+
+    def __init__(self, columnas, vocabularios, codigos, dias, valores):
+        self.columnas = tuple(columnas)
+        self.vocabularios = [list(voc) for voc in vocabularios]
+        self.codigos = np.asarray(codigos, dtype=np.int32).reshape(len(dias), len(self.columnas) - 1)
+        self.dias = np.asarray(dias, dtype=np.int64)
+        self.valores = np.asarray(valores, dtype=np.float64)
+        # Orden estable: dentro de cada día se conserva el orden original de las entradas.
+        self._orden = np.argsort(self.dias, kind='stable')
+        self._dia_min = int(self.dias.min()) if len(self.dias) else 0
+        dia_max = int(self.dias.max()) if len(self.dias) else -1
+        self._inicios = np.searchsorted(self.dias[self._orden], np.arange(self._dia_min, dia_max + 2))
+        self._posiciones = None
+
+    @classmethod
+    def desde_claves(cls, columnas, claves, valores):
+        """Construye la familia a partir de sus claves (tuplas, o el día si sólo tiene ese índice)."""
+        columnas = tuple(columnas)
+        if len(columnas) == 1:
+            return cls(columnas, [], np.empty((len(claves), 0)), list(claves), valores)
+        componentes = list(zip(*claves)) if claves else [()] * len(columnas)
+        codigos, vocabularios = [], []
+        for componente in componentes[:-1]:
+            codigo, vocabulario = pd.factorize(np.array(componente, dtype=object))
+            codigos.append(codigo)
+            vocabularios.append(vocabulario.tolist())
+        codigos = np.column_stack(codigos) if claves else np.empty((0, len(columnas) - 1))
+        return cls(columnas, vocabularios, codigos, list(componentes[-1]), valores)
+
+    def seleccionar(self, mascara):
+        """Nueva familia con las entradas marcadas en 'mascara' (mismos vocabularios)."""
+        return FamiliaDispersa(self.columnas, self.vocabularios, self.codigos[mascara], self.dias[mascara],
+                               self.valores[mascara])
+
+    def posiciones_dia(self, t):
+        """Posiciones de las entradas del día t, en su orden original."""
+        i = int(t) - self._dia_min
+        if i < 0 or i >= len(self._inicios) - 1:
+            return self._orden[:0]
+        return self._orden[self._inicios[i]:self._inicios[i + 1]]
+
+    def sumar_dia(self, t, columna):
+        """
+        {valor de 'columna': suma} de las entradas del día t, en orden de primera aparición
+        (el mismo que daría recorrer el diccionario acumulando).
+        """
+        posiciones = self.posiciones_dia(t)
+        if not len(posiciones):
+            return {}
+        j = self.columnas.index(columna)
+        codigos = self.codigos[posiciones, j]
+        unicos, primera = np.unique(codigos, return_index=True)
+        unicos = unicos[np.argsort(primera)]
+        sumas = np.bincount(codigos, weights=self.valores[posiciones])[unicos]
+        vocabulario = self.vocabularios[j]
+        return {vocabulario[c]: s for c, s in zip(unicos.tolist(), sumas.tolist())}
+
+    def columna(self, nombre):
+        """Valores de un índice para todas las entradas, como arreglo."""
+        if nombre == self.columnas[-1]:
+            return self.dias
+        j = self.columnas.index(nombre)
+        return np.array(self.vocabularios[j], dtype=object)[self.codigos[:, j]]
+
+    def tabla(self):
+        """DataFrame con una columna por índice más 'Valor', en el orden original."""
+        if not len(self.valores):
+            tabla = pd.DataFrame(columns=list(self.columnas))
+            tabla['Valor'] = []
+            return tabla
+        tabla = pd.DataFrame({nombre: self.columna(nombre) for nombre in self.columnas})
+        tabla['Valor'] = self.valores
+        return tabla
+
+    def claves(self):
+        if len(self.columnas) == 1:
+            return self.dias.tolist()
+        componentes = [self.columna(nombre).tolist() for nombre in self.columnas[:-1]]
+        return list(zip(*componentes, self.dias.tolist()))
+
+    # --- Interfaz compatible con el diccionario {clave: valor} ---
+    def __getitem__(self, clave):
+        if self._posiciones is None:
+            self._posiciones = {c: i for i, c in enumerate(self.claves())}
+        return self.valores[self._posiciones[clave]].item()
+
+    def __iter__(self):
+        return iter(self.claves())
+
+    def __len__(self):
+        return len(self.valores)
+
+    def items(self):
+        return list(zip(self.claves(), self.valores.tolist()))
+
+    def values(self):
+        return self.valores.tolist()
+
+    def __getstate__(self):
+        return (self.columnas, self.vocabularios, self.codigos, self.dias, self.valores)
+
+    def __setstate__(self, estado):
+        self.__init__(*estado)
+
+
+class ResultadosFase1(MutableMapping):
+    """
+    Resultados de Fase 1 ('results') guardados como familias dispersas indexadas por día
+    (ver FamiliaDispersa), con cortes diarios directos: demanda_dia, compras_dia e
+    inventario_dia.
+
+    Se comporta como el diccionario de siempre: results['y'] es una vista {(s, g, t): valor}
+    y las claves que no son familias de variables (métricas, estadísticas del solver,
+    arranque en caliente) se guardan tal cual.
+    """
+
+    __slots__ = ('familias', '_extras')
+
+    def __init__(self, familias=None, extras=None):
+        self.familias = dict(familias or {})
+        self._extras = dict(extras or {})
+
+    @classmethod
+    def desde_solver(cls, solver, v, umbral=0.1, dias=None, valores=None):
+        """
+        Extrae de una vez las variables de v con valor > umbral. Los valores se leen en
+        bloque (valores_solucion) y sólo se arman claves para las entradas no nulas. Con
+        'dias' se conservan sólo las entradas de esos días (horizonte rodante).
+        """
+        if valores is None:
+            valores = valores_solucion(solver)
+        familias = {}
+        for nombre, variables in v.items():
+            if not isinstance(variables, dict):
+                continue
+            indices = np.fromiter((var.index() for var in variables.values()), dtype=np.intp, count=len(variables))
+            valores_familia = valores[indices]
+            no_nulas = np.flatnonzero(valores_familia > umbral)
+            claves = list(variables)
+            columnas = INDICES_FAMILIAS.get(nombre) or _columnas_genericas(claves)
+            familia = FamiliaDispersa.desde_claves(columnas, [claves[i] for i in no_nulas.tolist()],
+                                                   valores_familia[no_nulas])
+            if dias is not None:
+                familia = familia.seleccionar(np.isin(familia.dias, list(dias)))
+            familias[nombre] = familia
+        return cls(familias)
+
+    @classmethod
+    def desde_diccionarios(cls, results):
+        """Convierte un 'results' de diccionarios (p. ej. un plan previo en .pkl) a ResultadosFase1."""
+        if isinstance(results, ResultadosFase1):
+            return results
+        resultados = cls()
+        for clave, valor in results.items():
+            resultados[clave] = valor
+        return resultados
+
+    @classmethod
+    def concatenar(cls, partes):
+        """Une resultados de días disjuntos (p. ej. las ventanas del horizonte rodante)."""
+        familias = {}
+        for nombre in dict.fromkeys(n for parte in partes for n in parte.familias):
+            presentes = [parte.familias[nombre] for parte in partes if nombre in parte.familias]
+            claves = [c for familia in presentes for c in familia.claves()]
+            valores = np.concatenate([familia.valores for familia in presentes])
+            familias[nombre] = FamiliaDispersa.desde_claves(presentes[0].columnas, claves, valores)
+        return cls(familias)
+
+    # --- Cortes por día ---
+    def demanda_dia(self, t):
+        """{polígono: plantas a entregar} del día t."""
+        return self.familias['y'].sumar_dia(t, 'Poligono') if 'y' in self.familias else {}
+
+    def compras_dia(self, t):
+        """{proveedor: plantas compradas} del día t."""
+        return self.familias['x'].sumar_dia(t, 'Proveedor') if 'x' in self.familias else {}
+
+    def inventario_dia(self, t):
+        """{especie: inventario al cierre} del día t (sólo especies con inventario no nulo)."""
+        return self.familias['XI'].sumar_dia(t, 'Especie') if 'XI' in self.familias else {}
+
+    def tabla(self, familia):
+        """DataFrame de la familia: una columna por índice más 'Valor'."""
+        return self.familias[familia].tabla()
+
+    # --- Interfaz de diccionario ---
+    def __getitem__(self, clave):
+        if clave in self.familias:
+            return self.familias[clave]
+        return self._extras[clave]
+
+    def __setitem__(self, clave, valor):
+        if isinstance(valor, FamiliaDispersa):
+            self.familias[clave] = valor
+        elif clave in INDICES_FAMILIAS and isinstance(valor, Mapping):
+            self.familias[clave] = FamiliaDispersa.desde_claves(INDICES_FAMILIAS[clave], list(valor.keys()),
+                                                                list(valor.values()))
+        else:
+            self.familias.pop(clave, None)
+            self._extras[clave] = valor
+
+    def __delitem__(self, clave):
+        if clave in self.familias:
+            del self.familias[clave]
+        else:
+            del self._extras[clave]
+
+    def __iter__(self):
+        yield from self.familias
+        yield from self._extras
+
+    def __len__(self):
+        return len(self.familias) + len(self._extras)
+
+    def __contains__(self, clave):
+        return clave in self.familias or clave in self._extras
+
+    def __getstate__(self):
+        return (self.familias, self._extras)
+
+    def __setstate__(self, estado):
+        self.__init__(*estado)
+
+
+def _columnas_genericas(claves):
+    """Nombres de índice para una familia no registrada en INDICES_FAMILIAS."""
+    aridad = len(claves[0]) if claves and isinstance(claves[0], tuple) else 1
+    return tuple(f"Indice_{i + 1}" for i in range(aridad - 1)) + ('Dia',)
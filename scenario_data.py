@@ -0,0 +1,171 @@
+# scenario_data.py
+
+from collections.abc import Mapping, MutableMapping
+
+import numpy as np
+
+
+class _VistaVector(Mapping):
+    """Vista de solo lectura {nombre: valor} sobre un vector indexado por un vocabulario."""
+
+    __slots__ = ('_indice', 'valores')
+
+    def __init__(self, indice, valores):
+        self._indice = indice
+        self.valores = valores
+
+    def __getitem__(self, clave):
+        return self.valores[self._indice[clave]].item()
+
+    def __iter__(self):
+        return iter(self._indice)
+
+    def __len__(self):
+        return len(self._indice)
+
+
+class _VistaMatriz(Mapping):
+    """Vista de solo lectura {(fila, columna): valor} sobre una matriz densa."""
+
+    __slots__ = ('_indice_filas', '_indice_columnas', 'valores')
+
+    def __init__(self, indice_filas, indice_columnas, valores):
+        self._indice_filas = indice_filas
+        self._indice_columnas = indice_columnas
+        self.valores = valores
+
+    def __getitem__(self, clave):
+        fila, columna = clave
+        return self.valores[self._indice_filas[fila], self._indice_columnas[columna]].item()
+
+    def __iter__(self):
+        return ((f, c) for f in self._indice_filas for c in self._indice_columnas)
+
+    def __len__(self):
+        return len(self._indice_filas) * len(self._indice_columnas)
+
+    def __contains__(self, clave):
+        try:
+            fila, columna = clave
+        except (TypeError, ValueError):
+            return False
+        return fila in self._indice_filas and columna in self._indice_columnas
+
+
+class ScenarioData(MutableMapping):
+    """
+    Datos de un escenario en forma compacta: vocabularios de especies, proveedores y
+    polígonos con su índice entero, y arreglos NumPy densos (costos S×P, máscara de
+    disponibilidad S×P, densidad/área/tratamiento por especie, hectáreas por polígono,
+    capacidades de la flota).
+
+    Durante la migración se comporta como el diccionario 'params' de siempre:
+    params['C_sp'][s, p], params['Dens_s'][s], params.get('PC_U'), etc. Las claves
+    indexadas por tuplas se sirven con vistas sobre los arreglos, armadas una vez al
+    construir el objeto y sin materializar diccionarios. Los escalares del archivo de parámetros generales y
+    cualquier clave nueva que se asigne viven en un diccionario aparte.
+    """
+
+    __slots__ = ('especies', 'proveedores', 'poligonos',
+                 'indice_especie', 'indice_proveedor', 'indice_poligono',
+                 'costo_sp', 'disponible_sp', 'dens_s', 'area_s', 'trat_s', 'ha_g',
+                 'vehiculos', 'capacidad_k', 'pares_admisibles', '_escalares', '_vistas')
+
+    # Claves de 'params' respaldadas por los arreglos; el resto va a _escalares.
+    CLAVES_ESTRUCTURADAS = ('S_especies', 'P_proveedores', 'G_poligonos', 'Dens_s', 'Area_s', 'Trat_s',
+                            'Disponibilidad_{sp}', 'C_sp', 'SP_admisibles', 'Ha_g_total',
+                            'K_vehiculos_nombres', 'cap_k_vehiculos_vrp')
+
+    def __init__(self, especies, proveedores, poligonos, costo_sp, disponible_sp, dens_s, area_s, trat_s,
+                 ha_g, vehiculos, capacidad_k, escalares=None):
+        self.especies = list(especies)
+        self.proveedores = list(proveedores)
+        self.poligonos = list(poligonos)
+        self.indice_especie = {s: i for i, s in enumerate(self.especies)}
+        self.indice_proveedor = {p: i for i, p in enumerate(self.proveedores)}
+        self.indice_poligono = {g: i for i, g in enumerate(self.poligonos)}
+        self.costo_sp = np.asarray(costo_sp, dtype=float)
+        self.disponible_sp = np.asarray(disponible_sp, dtype=bool)
+        self.dens_s = np.asarray(dens_s, dtype=float)
+        self.area_s = np.asarray(area_s, dtype=float)
+        self.trat_s = np.asarray(trat_s, dtype=float)
+        self.ha_g = np.asarray(ha_g, dtype=float)
+        self.vehiculos = list(vehiculos)
+        self.capacidad_k = np.asarray(capacidad_k)
+        # Pares comprables: disponibles y con costo finito (mismo criterio que construir_pares_admisibles).
+        self.pares_admisibles = np.nonzero(self.disponible_sp & np.isfinite(self.costo_sp))
+        self._escalares = dict(escalares or {})
+        # Las vistas (y la máscara int8 de disponibilidad) se arman aquí una sola vez: los
+        # modelos consultan params[...] dentro de sus bucles.
+        self._vistas = self._armar_vistas()
+
+    @classmethod
+    def desde_params(cls, params):
+        """Convierte un diccionario 'params' (data_loader.cargar_params_escenario) a ScenarioData."""
+        S, P, G = params['S_especies'], params['P_proveedores'], params['G_poligonos']
+        costo_sp = np.array([[params['C_sp'].get((s, p), np.inf) for p in P] for s in S], dtype=float)
+        disponible_sp = np.array([[params['Disponibilidad_{sp}'].get((s, p), 0) == 1 for p in P] for s in S], dtype=bool)
+        escalares = {k: v for k, v in params.items() if k not in cls.CLAVES_ESTRUCTURADAS}
+        return cls(S, P, G, costo_sp, disponible_sp,
+                   [params['Dens_s'][s] for s in S], [params['Area_s'][s] for s in S],
+                   [params['Trat_s'][s] for s in S], [params['Ha_g_total'][g] for g in G],
+                   params['K_vehiculos_nombres'], params['cap_k_vehiculos_vrp'], escalares)
+
+    def _armar_vistas(self):
+        """Vistas compatibles con el diccionario original, una por clave estructurada."""
+        filas, columnas = self.pares_admisibles
+        return {
+            'S_especies': self.especies,
+            'P_proveedores': self.proveedores,
+            'G_poligonos': self.poligonos,
+            'Dens_s': _VistaVector(self.indice_especie, self.dens_s),
+            'Area_s': _VistaVector(self.indice_especie, self.area_s),
+            'Trat_s': _VistaVector(self.indice_especie, self.trat_s),
+            'Ha_g_total': _VistaVector(self.indice_poligono, self.ha_g),
+            'C_sp': _VistaMatriz(self.indice_especie, self.indice_proveedor, self.costo_sp),
+            'Disponibilidad_{sp}': _VistaMatriz(self.indice_especie, self.indice_proveedor,
+                                                self.disponible_sp.astype(np.int8)),
+            'SP_admisibles': [(self.especies[i], self.proveedores[j])
+                              for i, j in zip(filas.tolist(), columnas.tolist())],
+            'K_vehiculos_nombres': self.vehiculos,
+            'cap_k_vehiculos_vrp': self.capacidad_k.tolist(),
+        }
+
+    def vista(self, clave):
+        """Vista compatible con el diccionario original para una clave estructurada (armada una vez)."""
+        return self._vistas[clave]
+
+    # --- Interfaz de diccionario ---
+    def __getitem__(self, clave):
+        if clave in self._escalares:
+            return self._escalares[clave]
+        if clave in self.CLAVES_ESTRUCTURADAS:
+            return self.vista(clave)
+        raise KeyError(clave)
+
+    def __setitem__(self, clave, valor):
+        if clave in self.CLAVES_ESTRUCTURADAS:
+            raise KeyError(f"'{clave}' está respaldada por arreglos; modifique el atributo correspondiente.")
+        self._escalares[clave] = valor
+
+    def __delitem__(self, clave):
+        del self._escalares[clave]
+
+    def __iter__(self):
+        yield from self.CLAVES_ESTRUCTURADAS
+        yield from self._escalares
+
+    def __len__(self):
+        return len(self.CLAVES_ESTRUCTURADAS) + len(self._escalares)
+
+    def __contains__(self, clave):
+        return clave in self._escalares or clave in self.CLAVES_ESTRUCTURADAS
+
+    def __getstate__(self):
+        # Los índices se reconstruyen al cargar; sólo se guardan vocabularios y arreglos.
+        return (self.especies, self.proveedores, self.poligonos, self.costo_sp, self.disponible_sp,
+                self.dens_s, self.area_s, self.trat_s, self.ha_g, self.vehiculos, self.capacidad_k,
+                self._escalares)
+
+    def __setstate__(self, estado):
+        self.__init__(*estado)
@@ -0,0 +1,136 @@
+# telemetria.py
+
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+import psutil
+
+try:
+    import resource
+except ImportError:  # Windows: el pico se lee del working set que reporta psutil.
+    resource = None
+
+MB = 1024 * 1024
+
+
+def memoria_pico_mb(hijos=False):
+    """
+    Pico real de memoria residente en MB: del proceso actual o, con hijos=True, del
+    mayor de sus procesos hijos ya terminados (p. ej. los workers de un pool). Devuelve
+    None si la plataforma no lo reporta.
+    """
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_CHILDREN if hijos else resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss está en bytes en macOS y en KB en Linux.
+        return pico / MB if sys.platform == 'darwin' else pico / 1024
+    if hijos:
+        return None
+    memoria = psutil.Process(os.getpid()).memory_info()
+    return getattr(memoria, 'peak_wset', memoria.rss) / MB
+
+
+def _a_json(valor):
+    """Convierte escalares de NumPy y otros objetos no serializables para json.dumps."""
+    if hasattr(valor, 'item'):
+        return valor.item()
+    return str(valor)
+
+
+class Telemetria:
+    """
+    Métricas de rendimiento de una corrida, escritas como JSONL (un objeto por línea) a
+    medida que se generan, para que una corrida interrumpida conserve lo ya medido.
+
+    Cada etapa (iniciar_etapa/terminar_etapa, o el context manager etapa) registra tiempo
+    de pared, tiempo de CPU y el pico de memoria residente del proceso al terminar, junto
+    con cuánto lo elevó la etapa. Con rastrear_asignaciones se agrega el pico de memoria
+    Python de la etapa según tracemalloc (sólo del proceso actual, no de los workers).
+    Con etapa_perfil, esa etapa se perfila con cProfile y el .prof queda junto al JSONL.
+    registrar() agrega eventos sueltos (estadísticas de un solver, un día de VRP, ...).
+    """
+
+    def __init__(self, ruta_jsonl=None, contexto=None, etapa_perfil=None, rastrear_asignaciones=False):
+        self.ruta_jsonl = ruta_jsonl
+        self.contexto = dict(contexto or {})
+        self.etapa_perfil = etapa_perfil
+        self.rastrear_asignaciones = rastrear_asignaciones
+        self.registros = []
+        self._etapas = {}
+        self._candado = threading.Lock()
+        if ruta_jsonl:
+            os.makedirs(os.path.dirname(os.path.abspath(ruta_jsonl)), exist_ok=True)
+            open(ruta_jsonl, 'w', encoding='utf-8').close()
+        if rastrear_asignaciones and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def registrar(self, tipo, **datos):
+        """Agrega un registro {'tipo', 'marca_tiempo', contexto..., datos...} y lo escribe al JSONL."""
+        registro = {'tipo': tipo, 'marca_tiempo': time.time(), **self.contexto, **datos}
+        with self._candado:
+            self.registros.append(registro)
+            if self.ruta_jsonl:
+                with open(self.ruta_jsonl, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(registro, ensure_ascii=False, default=_a_json) + '\n')
+        return registro
+
+    def iniciar_etapa(self, nombre):
+        """Empieza a medir una etapa. Las etapas no deben anidarse si se rastrean asignaciones."""
+        if self.rastrear_asignaciones:
+            tracemalloc.reset_peak()
+        perfil = None
+        if nombre == self.etapa_perfil:
+            perfil = cProfile.Profile()
+            perfil.enable()
+        self._etapas[nombre] = (time.perf_counter(), time.process_time(), memoria_pico_mb(), perfil)
+
+    def terminar_etapa(self, nombre, **datos):
+        """Cierra la etapa, registra sus métricas y las devuelve (incluye 'tiempo_s')."""
+        inicio, inicio_cpu, pico_inicial, perfil = self._etapas.pop(nombre)
+        tiempo_s = time.perf_counter() - inicio
+        cpu_s = time.process_time() - inicio_cpu
+        if perfil is not None:
+            perfil.disable()
+            datos['perfil'] = self._guardar_perfil(nombre, perfil)
+        pico = memoria_pico_mb()
+        metricas = {'etapa': nombre, 'tiempo_s': tiempo_s, 'cpu_s': cpu_s, 'rss_pico_mb': pico,
+                    'rss_pico_incremento_mb': None if pico is None else pico - pico_inicial,
+                    'rss_pico_hijos_mb': memoria_pico_mb(hijos=True)}
+        if self.rastrear_asignaciones:
+            metricas['python_pico_mb'] = tracemalloc.get_traced_memory()[1] / MB
+        return self.registrar('etapa', **metricas, **datos)
+
+    @contextlib.contextmanager
+    def etapa(self, nombre, **datos):
+        """
+        Mide el bloque como la etapa 'nombre'. El dict entregado permite agregar datos al
+        registro y, al salir del bloque, trae las métricas registradas (p. ej. 'tiempo_s').
+        Si el bloque lanza una excepción, la etapa se registra igual, con su 'error'.
+        """
+        registro = dict(datos)
+        self.iniciar_etapa(nombre)
+        try:
+            yield registro
+        except BaseException as e:
+            registro['error'] = repr(e)
+            raise
+        finally:
+            registro.update(self.terminar_etapa(nombre, **registro))
+
+    def _guardar_perfil(self, nombre, perfil):
+        """Guarda el .prof de la etapa y muestra sus funciones más costosas."""
+        directorio = os.path.dirname(os.path.abspath(self.ruta_jsonl)) if self.ruta_jsonl else os.getcwd()
+        ruta = os.path.join(directorio, f"perfil_{nombre}.prof")
+        perfil.dump_stats(ruta)
+        salida = io.StringIO()
+        pstats.Stats(perfil, stream=salida).sort_stats('cumulative').print_stats(15)
+        print(f"\n[Telemetría] Perfil de la etapa '{nombre}' guardado en: {ruta}")
+        print(salida.getvalue())
+        return ruta
@@ -0,0 +1,37 @@
+# tests/conftest.py
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Los módulos del proyecto viven en la raíz del repositorio (no es un paquete instalable).
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config_paths
+import data_loader
+from scenario_data import ScenarioData
+
+
+@pytest.fixture(scope='session')
+def params_demanda_baja():
+    """Parámetros del escenario DemandaBaja como los arma run_complete_optimization."""
+    paths = {**config_paths.rutas_comunes, **config_paths.rutas_escenarios['DemandaBaja']}
+    return ScenarioData.desde_params(data_loader.cargar_params_escenario(paths))
+
+
+def instancia_vrp(num_clientes=5, semilla=0, capacidad=120, num_vehiculos=3):
+    """
+    VRP pequeño con el depósito '18' y clientes '1'..'n' en coordenadas aleatorias:
+    (demandas, matriz {(i, j): minutos}, vehículos, params).
+    """
+    rng = np.random.default_rng(semilla)
+    nodos = ['18'] + [str(i) for i in range(1, num_clientes + 1)]
+    coordenadas = dict(zip(nodos, rng.uniform(0, 60, size=(len(nodos), 2))))
+    matriz = {(i, j): float(np.hypot(*(coordenadas[i] - coordenadas[j])))
+              for i in nodos for j in nodos if i != j}
+    demandas = {n: float(rng.integers(10, 50)) for n in nodos[1:]}
+    vehiculos = [{'id': f'K{k + 1}', 'capacidad': capacidad} for k in range(num_vehiculos)]
+    params = {'Tiempo_Descarga_LD_min': 10, 'Jornada_Laboral_JL_min': 480}
+    return demandas, matriz, vehiculos, params
@@ -0,0 +1,48 @@
+# tests/test_almacen_resultados.py
+
+import pandas as pd
+import pytest
+
+import almacen_resultados
+from almacen_resultados import AlmacenResultados
+
+FORMATOS = ['columnas'] + (['arrow'] if almacen_resultados.pa is not None else [])
+
+
+@pytest.fixture(params=FORMATOS)
+def almacen(request, tmp_path, monkeypatch):
+    if request.param == 'columnas':
+        monkeypatch.setattr(almacen_resultados, 'pa', None)
+    return AlmacenResultados(str(tmp_path), 'Prueba')
+
+
+def _tabla_dia(dia, filas):
+    return pd.DataFrame({'Día': [dia] * filas, 'Vehículo': [f'K{i}' for i in range(filas)],
+                         'Carga_Plantas': [10.0 * i for i in range(filas)],
+                         'Ruta_Nodos_Str': ['18 -> 1 -> 18'] * (filas - 1) + [None]})
+
+
+def test_agregar_y_leer_por_dia(almacen):
+    almacen.agregar('vrp', 3, _tabla_dia(3, 2))
+    almacen.agregar('vrp', 1, _tabla_dia(1, 3))
+    assert almacen.dias('vrp') == [1, 3]
+
+    df = almacen.leer('vrp')
+    esperado = pd.concat([_tabla_dia(1, 3), _tabla_dia(3, 2)], ignore_index=True)
+    assert df['Día'].tolist() == esperado['Día'].tolist()
+    assert df['Carga_Plantas'].tolist() == esperado['Carga_Plantas'].tolist()
+    assert df['Ruta_Nodos_Str'].isna().tolist() == esperado['Ruta_Nodos_Str'].isna().tolist()
+    assert almacen.leer('vrp', dias=[3])['Día'].tolist() == [3, 3]
+
+
+def test_reemplazar_dia_y_limpiar(almacen, tmp_path):
+    almacen.agregar('vrp', 1, _tabla_dia(1, 3))
+    almacen.agregar('vrp', 1, _tabla_dia(1, 2))
+    assert len(almacen.leer('vrp')) == 2
+
+    ruta_csv = almacen.exportar_csv('vrp', str(tmp_path / 'rutas.csv'), columnas=['Día', 'Vehículo'])
+    assert list(pd.read_csv(ruta_csv).columns) == ['Día', 'Vehículo']
+
+    almacen.limpiar()
+    assert almacen.dias('vrp') == []
+    assert almacen.leer('vrp').empty
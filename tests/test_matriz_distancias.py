@@ -0,0 +1,75 @@
+# tests/test_matriz_distancias.py
+
+import pickle
+
+import numpy as np
+import pytest
+
+import config_paths
+import data_loader
+from matriz_distancias import MatrizDistancias, mascara_vecinos, matriz_a_arreglo
+
+
+@pytest.fixture(scope='module')
+def ruta_csv():
+    return config_paths.rutas_escenarios['DemandaBaja']['Matriz de Distancia VRP']
+
+
+def test_binario_responde_igual_que_el_diccionario(ruta_csv, tmp_path):
+    matriz = MatrizDistancias.desde_csv(ruta_csv, str(tmp_path))
+    valores, nodos = data_loader.cargar_matriz_tiempos_vrp(ruta_csv)
+    assert matriz.nodos == [str(n) for n in nodos]
+    assert matriz.nodos[0] == '18'
+    for a, i in [(0, 1), (1, 0), (1, 2), (len(nodos) - 1, 0)]:
+        assert matriz[nodos[a], nodos[i]] == pytest.approx(valores[a][i])
+    assert matriz.get(('18', 'no_existe'), 1e6) == 1e6
+    assert ('18', 'no_existe') not in matriz
+
+
+def test_submatriz_y_serializacion(ruta_csv, tmp_path):
+    matriz = MatrizDistancias.desde_csv(ruta_csv, str(tmp_path))
+    nodos = matriz.nodos[::-1] + ['no_existe']
+    sub = matriz.submatriz(nodos)
+    for a, i in enumerate(nodos[:-1]):
+        for b, j in enumerate(nodos[:-1]):
+            assert sub[a, b] == matriz[i, j]
+    assert (sub[-1, :] == 1e6).all() and (sub[:, -1] == 1e6).all()
+
+    copia = pickle.loads(pickle.dumps(matriz))
+    assert np.array_equal(copia.submatriz(nodos), sub)
+    # Sólo viaja la ruta del archivo, no el arreglo.
+    assert set(matriz.__getstate__()) == {'ruta_npy', 'nodos'}
+
+
+def test_desde_coordenadas_reutiliza_el_binario(tmp_path):
+    coordenadas = {'18': (0.0, 0.0), '1': (3.0, 4.0), '2': (6.0, 8.0)}
+    matriz = MatrizDistancias.desde_coordenadas(coordenadas, str(tmp_path), velocidad=0.5)
+    assert matriz['18', '1'] == pytest.approx(10.0)
+    assert matriz['1', '2'] == pytest.approx(10.0)
+    assert matriz['18', '2'] == pytest.approx(20.0)
+    otra = MatrizDistancias.desde_coordenadas(coordenadas, str(tmp_path), velocidad=0.5)
+    assert otra.ruta_npy == matriz.ruta_npy
+
+
+def test_matriz_a_arreglo_igual_para_diccionario_y_binario(tmp_path):
+    coordenadas = {'18': (0.0, 0.0), '1': (3.0, 4.0), '2': (6.0, 8.0), '3': (1.0, 1.0)}
+    matriz = MatrizDistancias.desde_coordenadas(coordenadas, str(tmp_path))
+    como_diccionario = {(i, j): matriz[i, j] for i in matriz.nodos for j in matriz.nodos}
+    N = ['18', '3', '1']
+    assert np.allclose(matriz_a_arreglo(matriz, N), matriz_a_arreglo(como_diccionario, N))
+    assert (np.diag(matriz_a_arreglo(matriz, N)) == 0).all()
+
+
+def test_mascara_vecinos():
+    rng = np.random.default_rng(0)
+    puntos = rng.uniform(0, 10, size=(9, 2))
+    tiempos = np.hypot(*(puntos[:, None, :] - puntos[None, :, :]).transpose(2, 0, 1))
+    assert mascara_vecinos(tiempos, None).all()
+
+    mascara = mascara_vecinos(tiempos, 2)
+    assert (mascara == mascara.T).all()
+    assert mascara[0, :].all() and mascara[:, 0].all()
+    vecinos = data_loader.construir_indice_vecinos(tiempos[1:, 1:], 2) + 1
+    for a, fila in zip(range(1, 9), vecinos):
+        assert mascara[a, fila].all()
+    assert not mascara[1:, 1:].all()
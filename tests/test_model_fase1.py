@@ -0,0 +1,77 @@
+# tests/test_model_fase1.py
+
+import pytest
+
+import model_fase1_ortools as model_fase1
+from resultados_fase1 import ResultadosFase1
+
+
+def _construir(params, constructor):
+    solver = model_fase1.crear_solver({})
+    T = list(range(1, params['T_dias_planificacion'] + 1))
+    v = model_fase1.CONSTRUCTORES_FASE1[constructor](solver, params, T)
+    return solver, v
+
+
+def test_constructores_generan_el_mismo_modelo(params_demanda_baja):
+    modelos = {c: _construir(params_demanda_baja, c) for c in ('clasico', 'arreglos')}
+    tamanos = {c: (s.NumVariables(), s.NumConstraints()) for c, (s, _) in modelos.items()}
+    assert tamanos['clasico'] == tamanos['arreglos'] == (702, 353)
+
+    for constructor, (solver, _) in modelos.items():
+        assert solver.Solve() == solver.OPTIMAL, constructor
+    assert modelos['clasico'][0].Objective().Value() == pytest.approx(9937)
+    assert modelos['arreglos'][0].Objective().Value() == pytest.approx(9937)
+
+
+def test_constructor_arreglos_conserva_claves_y_filas_nombradas(params_demanda_baja):
+    solver_clasico, v_clasico = _construir(params_demanda_baja, 'clasico')
+    solver, v = _construir(params_demanda_baja, 'arreglos')
+    for familia in ('x', 'y', 'z1', 'z2', 'XI'):
+        assert list(v[familia]) == list(v_clasico[familia]), familia
+    for t in range(1, params_demanda_baja['T_dias_planificacion'] + 1):
+        assert solver.LookupConstraint(f"CapCompra_{t}") is not None
+        assert solver.LookupConstraint(f"Almacen_{t}") is not None
+
+
+@pytest.fixture(scope='module')
+def rodante(params_demanda_baja):
+    # Ventanas de 15 días (4 en DemandaBaja): con otras, CBC puede tardar decenas de segundos en una.
+    return model_fase1.solve_supply_model_rolling(params_demanda_baja, 'DemandaBaja', ventana=15, traslape=5)
+
+
+def test_horizonte_rodante_devuelve_la_forma_del_modelo_completo(params_demanda_baja, rodante):
+    completo = model_fase1.solve_supply_model_gurobi(params_demanda_baja, 'DemandaBaja')
+    assert isinstance(rodante, ResultadosFase1)
+    assert set(rodante) == set(completo)
+    assert set(rodante['metricas_modelo']) == set(completo['metricas_modelo']) | {'ventanas'}
+    assert set(rodante['estadisticas_solver']) == set(completo['estadisticas_solver'])
+
+    T = params_demanda_baja['T_dias_planificacion']
+    assert {t for (_, _, t) in rodante['y']} <= set(range(1, T + 1))
+    ha_plantadas = sum(valor / params_demanda_baja['Dens_s'][s] for (s, g, t), valor in rodante['y'].items())
+    assert ha_plantadas >= sum(params_demanda_baja['Ha_g_total'].values()) - 1e-3
+
+
+def test_horizonte_rodante_agrega_estadisticas_de_todas_las_ventanas(rodante):
+    metricas, estadisticas = rodante['metricas_modelo'], rodante['estadisticas_solver']
+    assert metricas['ventanas'] > 1
+    assert metricas['memoria_construccion_mb'] >= 0
+    assert estadisticas['estado'] in model_fase1.ORDEN_ESTADOS
+    assert estadisticas['tiempo_pared_s'] > 0
+    assert estadisticas['objetivo'] is None
+
+
+def test_estadisticas_ventanas_toma_el_peor_estado_y_suma_el_esfuerzo():
+    ventanas = [
+        {'solver': 'CBC', 'estado': 'OPTIMAL', 'num_variables': 180, 'num_restricciones': 90, 'objetivo': 1.0,
+         'cota': 1.0, 'gap_relativo': 0.0, 'nodos': 3, 'iteraciones': 40, 'tiempo_pared_s': 0.5},
+        {'solver': 'CBC', 'estado': 'FEASIBLE', 'num_variables': 126, 'num_restricciones': 60, 'objetivo': 2.0,
+         'cota': 1.5, 'gap_relativo': 0.25, 'nodos': 7, 'iteraciones': 10, 'tiempo_pared_s': 1.0},
+    ]
+    estadisticas = model_fase1._estadisticas_ventanas(ventanas)
+    assert estadisticas['estado'] == 'FEASIBLE'
+    assert estadisticas['gap_relativo'] == 0.25
+    assert (estadisticas['num_variables'], estadisticas['num_restricciones']) == (180, 90)
+    assert (estadisticas['nodos'], estadisticas['iteraciones']) == (10, 50)
+    assert estadisticas['tiempo_pared_s'] == pytest.approx(1.5)
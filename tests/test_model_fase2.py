@@ -0,0 +1,83 @@
+# tests/test_model_fase2.py
+
+import pytest
+
+import model_fase2_heuristico
+import model_fase2_ortools_milp
+import model_fase2_ortools_routing
+from conftest import instancia_vrp
+
+
+def _verificar_rutas(solucion, demandas, matriz, vehiculos, params):
+    """Cada cliente se visita una vez y cada ruta respeta la capacidad de su vehículo y la jornada."""
+    capacidades = {v['id']: v['capacidad'] for v in vehiculos}
+    visitados = []
+    for ruta_info in solucion['rutas']:
+        ruta = ruta_info['ruta']
+        assert ruta[0] == ruta[-1] == '18'
+        clientes = ruta[1:-1]
+        visitados.extend(clientes)
+        assert sum(demandas[n] for n in clientes) <= capacidades[ruta_info['vehiculo']] + 1e-9
+        duracion = sum(matriz[i, j] for i, j in zip(ruta[:-1], ruta[1:])) + params['Tiempo_Descarga_LD_min'] * len(clientes)
+        assert duracion <= params['Jornada_Laboral_JL_min'] + 1e-6
+    assert sorted(visitados) == sorted(demandas)
+    assert len({r['vehiculo'] for r in solucion['rutas']}) == len(solucion['rutas'])
+
+
+@pytest.mark.parametrize('semilla', range(5))
+def test_heuristico_visita_cada_cliente_una_vez_y_respeta_capacidad_y_jornada(semilla):
+    demandas, matriz, vehiculos, params = instancia_vrp(num_clientes=9, semilla=semilla)
+    solucion = model_fase2_heuristico.solve_vrp_heuristico(1, demandas, matriz, vehiculos, params)
+    _verificar_rutas(solucion, demandas, matriz, vehiculos, params)
+    assert len(solucion['rutas']) > 1
+
+
+def test_heuristico_con_vecinos_sigue_siendo_factible():
+    demandas, matriz, vehiculos, params = instancia_vrp(num_clientes=9, semilla=7)
+    solucion = model_fase2_heuristico.solve_vrp_heuristico(1, demandas, matriz, vehiculos, params, vecinos_k=3)
+    _verificar_rutas(solucion, demandas, matriz, vehiculos, params)
+
+
+def test_heuristico_devuelve_none_si_la_flota_no_alcanza():
+    demandas, matriz, vehiculos, params = instancia_vrp(num_clientes=6, capacidad=50, num_vehiculos=1)
+    assert model_fase2_heuristico.solve_vrp_heuristico(1, demandas, matriz, vehiculos, params) is None
+
+
+@pytest.mark.parametrize('semilla', range(3))
+def test_formulaciones_milp_tienen_el_mismo_optimo(semilla):
+    demandas, matriz, vehiculos, params = instancia_vrp(num_clientes=5, semilla=semilla, capacidad=100, num_vehiculos=2)
+    tres_indices = model_fase2_ortools_milp.solve_vrp_analytically(1, demandas, matriz, vehiculos, params)
+    dos_indices = model_fase2_ortools_milp.solve_vrp_dos_indices(1, demandas, matriz, vehiculos, params)
+    simetria = model_fase2_ortools_milp.solve_vrp_analytically(1, demandas, matriz, vehiculos, params,
+                                                               romper_simetria=True)
+    cortes = model_fase2_ortools_milp.solve_vrp_analytically(1, demandas, matriz, vehiculos, params,
+                                                             cortes_perezosos=True)
+    for solucion in (tres_indices, dos_indices, simetria, cortes):
+        _verificar_rutas(solucion, demandas, matriz, vehiculos, params)
+        assert solucion['tiempo_total'] == pytest.approx(tres_indices['tiempo_total'], abs=1e-4)
+
+    heuristico = model_fase2_heuristico.solve_vrp_heuristico(1, demandas, matriz, vehiculos, params)
+    assert heuristico['tiempo_total'] >= tres_indices['tiempo_total'] - 1e-4
+
+
+def test_milp_con_arranque_en_caliente_no_empeora_el_optimo():
+    demandas, matriz, vehiculos, params = instancia_vrp(num_clientes=5, semilla=3, capacidad=100, num_vehiculos=2)
+    frio = model_fase2_ortools_milp.solve_vrp_analytically(1, demandas, matriz, vehiculos, params)
+    inicial = model_fase2_heuristico.solve_vrp_heuristico(1, demandas, matriz, vehiculos, params)
+    caliente = model_fase2_ortools_milp.solve_vrp_analytically(1, demandas, matriz, vehiculos, params,
+                                                               solucion_inicial=inicial)
+    _verificar_rutas(caliente, demandas, matriz, vehiculos, params)
+    assert caliente['tiempo_total'] == pytest.approx(frio['tiempo_total'], abs=1e-4)
+
+
+def test_routing_devuelve_rutas_factibles():
+    demandas, matriz, vehiculos, params = instancia_vrp(num_clientes=8, semilla=4)
+    solucion = model_fase2_ortools_routing.solve_vrp_routing(1, demandas, matriz, vehiculos, params, limite_tiempo_s=1)
+    _verificar_rutas(solucion, demandas, matriz, vehiculos, params)
+
+
+def test_dia_sin_demanda():
+    _, matriz, vehiculos, params = instancia_vrp()
+    for motor in (model_fase2_heuristico.solve_vrp_heuristico, model_fase2_ortools_milp.solve_vrp_analytically,
+                  model_fase2_ortools_milp.solve_vrp_dos_indices, model_fase2_ortools_routing.solve_vrp_routing):
+        assert motor(1, {}, matriz, vehiculos, params) == {'rutas': [], 'tiempo_total': 0, 'status': 'Sin Demanda'}
@@ -0,0 +1,41 @@
+# tests/test_pipeline.py
+
+import threading
+
+import pytest
+
+from pipeline import EtapaAsincrona
+
+
+def test_ejecuta_las_tareas_en_orden_en_otro_hilo():
+    hechas, hilos = [], set()
+
+    def tarea(i):
+        hechas.append(i)
+        hilos.add(threading.current_thread().name)
+
+    etapa = EtapaAsincrona('prueba', max_pendientes=2)
+    for i in range(20):
+        etapa.enviar(tarea, i)
+    etapa.cerrar()
+    assert hechas == list(range(20))
+    assert hilos == {'prueba'}
+
+
+def test_un_error_descarta_lo_pendiente_y_se_relanza_al_cerrar():
+    hechas = []
+
+    def tarea(i):
+        if i == 2:
+            raise ValueError('falla')
+        hechas.append(i)
+
+    etapa = EtapaAsincrona('prueba')
+    for i in range(5):
+        try:
+            etapa.enviar(tarea, i)
+        except ValueError:
+            break
+    with pytest.raises(ValueError, match='falla'):
+        etapa.cerrar()
+    assert hechas == [0, 1]
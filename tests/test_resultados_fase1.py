@@ -0,0 +1,43 @@
+# tests/test_resultados_fase1.py
+
+import pickle
+
+import pytest
+
+from resultados_fase1 import ResultadosFase1
+
+RESULTS = {
+    'x': {('S1', 'P1', 1): 100.0, ('S2', 'P1', 2): 50.0, ('S1', 'P2', 2): 20.0},
+    'y': {('S1', 'G1', 1): 60.0, ('S1', 'G2', 1): 40.0, ('S2', 'G1', 2): 50.0, ('S1', 'G1', 2): 20.0},
+    'z1': {1: 1.0, 2: 1.0},
+    'XI': {('S1', 1): 0.0},
+    'metricas_modelo': {'solver': 'CBC'},
+}
+
+
+def test_conserva_la_interfaz_de_diccionario():
+    resultados = ResultadosFase1.desde_diccionarios(RESULTS)
+    for familia in ('x', 'y', 'z1', 'XI'):
+        assert dict(resultados[familia].items()) == RESULTS[familia], familia
+    assert resultados['metricas_modelo'] == {'solver': 'CBC'}
+    assert set(resultados) == set(RESULTS)
+    assert resultados.get('no_existe') is None
+
+
+def test_cortes_diarios():
+    resultados = ResultadosFase1.desde_diccionarios(RESULTS)
+    assert resultados.demanda_dia(1) == pytest.approx({'G1': 60.0, 'G2': 40.0})
+    assert resultados.demanda_dia(2) == pytest.approx({'G1': 70.0})
+    assert resultados.compras_dia(2) == pytest.approx({'P1': 50.0, 'P2': 20.0})
+    assert resultados.demanda_dia(3) == {}
+
+
+def test_concatenar_ventanas_y_pickle():
+    dia_1 = ResultadosFase1.desde_diccionarios({'y': {k: v for k, v in RESULTS['y'].items() if k[2] == 1}})
+    dia_2 = ResultadosFase1.desde_diccionarios({'y': {k: v for k, v in RESULTS['y'].items() if k[2] == 2}})
+    unidos = ResultadosFase1.concatenar([dia_1, dia_2])
+    assert dict(unidos['y'].items()) == RESULTS['y']
+
+    copia = pickle.loads(pickle.dumps(unidos))
+    assert dict(copia['y'].items()) == RESULTS['y']
+    assert list(copia.tabla('y').columns) == ['Especie', 'Poligono', 'Dia', 'Valor']
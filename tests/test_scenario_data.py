@@ -0,0 +1,49 @@
+# tests/test_scenario_data.py
+
+import pickle
+
+import numpy as np
+import pytest
+
+import config_paths
+import data_loader
+from scenario_data import ScenarioData
+
+
+@pytest.fixture(scope='module')
+def params_dict():
+    paths = {**config_paths.rutas_comunes, **config_paths.rutas_escenarios['DemandaBaja']}
+    return data_loader.cargar_params_escenario(paths)
+
+
+def test_se_comporta_como_el_diccionario_params(params_dict):
+    datos = ScenarioData.desde_params(params_dict)
+    S, P, G = params_dict['S_especies'], params_dict['P_proveedores'], params_dict['G_poligonos']
+    assert datos['S_especies'] == S and datos['P_proveedores'] == P and datos['G_poligonos'] == G
+    for clave in ('Dens_s', 'Area_s', 'Trat_s'):
+        assert {s: datos[clave][s] for s in S} == pytest.approx({s: params_dict[clave][s] for s in S})
+    assert {g: datos['Ha_g_total'][g] for g in G} == pytest.approx(dict(params_dict['Ha_g_total']))
+    for (s, p), costo in params_dict['C_sp'].items():
+        assert datos['C_sp'][s, p] == pytest.approx(costo)
+    for (s, p), disponible in params_dict['Disponibilidad_{sp}'].items():
+        assert datos['Disponibilidad_{sp}'][s, p] == disponible
+    assert set(datos['SP_admisibles']) == set(data_loader.construir_pares_admisibles(
+        S, P, params_dict['Disponibilidad_{sp}'], params_dict['C_sp']))
+    assert datos['T_dias_planificacion'] == params_dict['T_dias_planificacion']
+    assert datos.get('no_existe', 7) == 7
+
+
+def test_claves_estructuradas_no_se_reemplazan(params_dict):
+    datos = ScenarioData.desde_params(params_dict)
+    datos['PC_U'] = 3
+    assert datos['PC_U'] == 3
+    with pytest.raises(KeyError):
+        datos['C_sp'] = {}
+
+
+def test_pickle_reconstruye_arreglos_y_vistas(params_dict):
+    datos = ScenarioData.desde_params(params_dict)
+    copia = pickle.loads(pickle.dumps(datos))
+    assert np.array_equal(copia.costo_sp, datos.costo_sp)
+    assert copia['SP_admisibles'] == datos['SP_admisibles']
+    assert dict(copia.items()).keys() == dict(datos.items()).keys()
@@ -0,0 +1,39 @@
+# tests/test_telemetria.py
+
+import json
+
+import pytest
+
+from telemetria import Telemetria
+
+
+def _leer(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        return [json.loads(linea) for linea in f]
+
+
+def test_etapa_registra_metricas_y_las_entrega(tmp_path):
+    ruta = tmp_path / 'telemetria.jsonl'
+    telemetria = Telemetria(str(ruta), contexto={'escenario': 'Prueba'})
+    with telemetria.etapa('carga', filas=10) as etapa:
+        etapa['extra'] = 'ok'
+    telemetria.registrar('evento', dia=1)
+
+    assert etapa['tiempo_s'] >= 0
+    registros = _leer(ruta)
+    assert [r['tipo'] for r in registros] == ['etapa', 'evento']
+    assert registros[0]['etapa'] == 'carga'
+    assert registros[0]['escenario'] == 'Prueba'
+    assert (registros[0]['filas'], registros[0]['extra']) == (10, 'ok')
+    assert {'tiempo_s', 'cpu_s', 'rss_pico_mb'} <= set(registros[0])
+
+
+def test_etapa_que_falla_queda_registrada_con_su_error(tmp_path):
+    ruta = tmp_path / 'telemetria.jsonl'
+    telemetria = Telemetria(str(ruta))
+    with pytest.raises(RuntimeError):
+        with telemetria.etapa('vrp'):
+            raise RuntimeError('sin solución')
+    (registro,) = _leer(ruta)
+    assert registro['etapa'] == 'vrp'
+    assert 'sin solución' in registro['error']
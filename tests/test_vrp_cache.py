@@ -0,0 +1,62 @@
+# tests/test_vrp_cache.py
+
+from conftest import instancia_vrp
+from vrp_cache import CacheVRP
+
+
+def test_clave_es_estable_e_independiente_del_orden_de_los_clientes():
+    demandas, matriz, vehiculos, params = instancia_vrp()
+    invertidas = dict(reversed(list(demandas.items())))
+    assert CacheVRP.clave(demandas, matriz, vehiculos, params) == CacheVRP.clave(invertidas, matriz, vehiculos, params)
+
+
+def test_clave_cambia_con_cada_parte_de_la_firma():
+    demandas, matriz, vehiculos, params = instancia_vrp()
+    base = CacheVRP.clave(demandas, matriz, vehiculos, params, extra='milp')
+
+    otra_matriz = dict(matriz)
+    otra_matriz['18', '1'] += 1.0
+    otros_vehiculos = [dict(v) for v in vehiculos]
+    otros_vehiculos[0]['capacidad'] += 10
+    otras_demandas = {**demandas, '1': demandas['1'] + 1}
+    variantes = {
+        'matriz': CacheVRP.clave(demandas, otra_matriz, vehiculos, params, extra='milp'),
+        'capacidades': CacheVRP.clave(demandas, matriz, otros_vehiculos, params, extra='milp'),
+        'demandas': CacheVRP.clave(otras_demandas, matriz, vehiculos, params, extra='milp'),
+        'descarga': CacheVRP.clave(demandas, matriz, vehiculos, {**params, 'Tiempo_Descarga_LD_min': 12}, extra='milp'),
+        'jornada': CacheVRP.clave(demandas, matriz, vehiculos, {**params, 'Jornada_Laboral_JL_min': 400}, extra='milp'),
+        'extra': CacheVRP.clave(demandas, matriz, vehiculos, params, extra=('milp', 'warm_start', True)),
+    }
+    for parte, clave in variantes.items():
+        assert clave != base, parte
+    assert len(set(variantes.values())) == len(variantes)
+
+
+def test_clave_ignora_arcos_de_nodos_que_el_dia_no_visita():
+    demandas, matriz, vehiculos, params = instancia_vrp()
+    con_otro_nodo = {**matriz, ('18', '99'): 5.0, ('99', '18'): 5.0}
+    assert CacheVRP.clave(demandas, matriz, vehiculos, params) == CacheVRP.clave(demandas, con_otro_nodo, vehiculos, params)
+
+
+def test_guardar_y_obtener_en_memoria_y_disco(tmp_path):
+    solucion = {'rutas': [{'vehiculo': 'K1', 'ruta': ['18', '1', '18']}], 'tiempo_total': 12.0, 'status': 'Óptimo'}
+    cache = CacheVRP(str(tmp_path))
+    assert cache.obtener('abc') is None
+    cache.guardar('abc', solucion)
+
+    copia = cache.obtener('abc')
+    assert copia == solucion
+    copia['rutas'].clear()
+    assert cache.obtener('abc') == solucion
+
+    # Otra instancia (otra corrida) la encuentra en disco.
+    nueva = CacheVRP(str(tmp_path))
+    assert nueva.obtener('abc') == solucion
+    assert nueva.estadisticas()['aciertos_disco'] == 1
+    assert cache.estadisticas() == {'aciertos_memoria': 2, 'aciertos_disco': 0, 'fallos': 1, 'tasa_aciertos': 2 / 3}
+
+
+def test_no_guarda_soluciones_vacias(tmp_path):
+    cache = CacheVRP(str(tmp_path))
+    cache.guardar('abc', None)
+    assert cache.obtener('abc') is None
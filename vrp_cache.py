@@ -0,0 +1,110 @@
+# vrp_cache.py
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+
+# Incrementar si cambia la formulación del VRP para invalidar soluciones guardadas.
+VERSION_CACHE = 1
+
+
+class CacheVRP:
+    """
+    Memoización de soluciones VRP en dos niveles: un LRU en memoria para el proceso
+    actual y un directorio en disco que sobrevive entre corridas y escenarios.
+
+    La clave es una firma canónica del día: conjunto de nodos, demandas, capacidades de
+    los vehículos, huella de la matriz de tiempos restringida a esos nodos, tiempo de
+    descarga y jornada laboral. Dos días con la misma firma tienen exactamente el mismo MILP.
+    """
+
+    def __init__(self, directorio, max_entradas_memoria=512):
+        self.directorio = directorio
+        self.max_entradas_memoria = max_entradas_memoria
+        self._memoria = OrderedDict()
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        if self.directorio:
+            os.makedirs(self.directorio, exist_ok=True)
+
+    @staticmethod
+    def clave(demandas_diarias, matriz_tiempos, vehiculos, params, depot='18', extra=None):
+        """Calcula la firma SHA-256 canónica del VRP de un día."""
+        nodos = [depot] + sorted(demandas_diarias, key=str)
+        if hasattr(matriz_tiempos, 'submatriz'):
+            submatriz = matriz_tiempos.submatriz(nodos).tolist()
+        else:
+            submatriz = [[matriz_tiempos.get((i, j), 1e6) for j in nodos] for i in nodos]
+        huella_matriz = hashlib.sha256(json.dumps(submatriz).encode('utf-8')).hexdigest()
+        firma = {
+            'version': VERSION_CACHE,
+            'nodos': nodos,
+            'demandas': [round(float(demandas_diarias[n]), 6) for n in nodos[1:]],
+            'capacidades': [(v['id'], v['capacidad']) for v in vehiculos],
+            'matriz': huella_matriz,
+            'tiempo_descarga': params.get('Tiempo_Descarga_LD_min', 0),
+            'jornada': params.get('Jornada_Laboral_JL_min', 480),
+            'extra': extra,
+        }
+        return hashlib.sha256(json.dumps(firma, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def _ruta_archivo(self, clave):
+        return os.path.join(self.directorio, clave[:2], f"{clave}.pkl")
+
+    def obtener(self, clave):
+        """Devuelve una copia de la solución guardada para la clave, o None si no existe."""
+        if clave in self._memoria:
+            self._memoria.move_to_end(clave)
+            self.aciertos_memoria += 1
+            return copy.deepcopy(self._memoria[clave])
+
+        if self.directorio:
+            ruta = self._ruta_archivo(clave)
+            if os.path.exists(ruta):
+                try:
+                    with open(ruta, 'rb') as f:
+                        solucion = pickle.load(f)
+                except (OSError, pickle.UnpicklingError, EOFError) as e:
+                    print(f"[CacheVRP] Advertencia: no se pudo leer '{ruta}' ({e}). Se ignora la entrada.")
+                else:
+                    self._guardar_en_memoria(clave, solucion)
+                    self.aciertos_disco += 1
+                    return copy.deepcopy(solucion)
+
+        self.fallos += 1
+        return None
+
+    def guardar(self, clave, solucion):
+        """Guarda una solución en ambos niveles. Las soluciones vacías (None) no se guardan."""
+        if solucion is None:
+            return
+        self._guardar_en_memoria(clave, copy.deepcopy(solucion))
+        if self.directorio:
+            ruta = self._ruta_archivo(clave)
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            # Escritura atómica: varios procesos pueden compartir el mismo directorio.
+            ruta_temporal = f"{ruta}.{os.getpid()}.tmp"
+            with open(ruta_temporal, 'wb') as f:
+                pickle.dump(solucion, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(ruta_temporal, ruta)
+
+    def _guardar_en_memoria(self, clave, solucion):
+        self._memoria[clave] = solucion
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.max_entradas_memoria:
+            self._memoria.popitem(last=False)
+
+    def estadisticas(self):
+        """Contadores de aciertos y fallos acumulados por esta instancia."""
+        consultas = self.aciertos_memoria + self.aciertos_disco + self.fallos
+        aciertos = self.aciertos_memoria + self.aciertos_disco
+        return {
+            'aciertos_memoria': self.aciertos_memoria,
+            'aciertos_disco': self.aciertos_disco,
+            'fallos': self.fallos,
+            'tasa_aciertos': aciertos / consultas if consultas else 0.0,
+        }